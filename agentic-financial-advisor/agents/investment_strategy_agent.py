@@ -12,24 +12,76 @@ from autogen import AssistantAgent
 # This ensures all agents use the same model settings for consistency
 from config.llm_config import llm_config
 
+# Import the portfolio optimizer tool and the helper that lets the agent run it
+from tools.agent_tools import register_agent_tool
+from tools.portfolio_optimizer import optimize_portfolio_tool
+
+# Import the strategy schema and the structured (JSON) reply
+from tools.structured_output import STRATEGY_SCHEMA, register_structured_output, schema_instructions
+
 # ============================================================================
-# Create the Investment Strategy Agent instance
+# Factory for the Investment Strategy Agent
 # This agent is configured specifically for developing investment strategies
 # ============================================================================
-investment_strategy_agent = AssistantAgent(
-    # Agent name: Used to identify this agent in group conversations
-    # This name will appear in logs and chat histories
-    name="InvestmentStrategyAgent",
+def create_investment_strategy_agent():
+    """
+    Create a new, independent Investment Strategy Agent instance.
     
-    # LLM configuration: Pass the shared configuration dictionary
-    # Contains model type, API endpoint, temperature, and authentication details
-    llm_config=llm_config,
+    Every call returns a fresh agent with its own chat history, so separate
+    orchestrator instances (e.g. in the batch runner) never share state.
     
-    # System message: Defines the agent's role and expertise
-    # This instruction shapes the agent's behavior and response style
-    # The agent will focus on investment advisory as per this message
-    system_message=(
-        "You are an investment advisor. "  # Role definition
-        "Suggest short-term and long-term investments with justification."  # Primary responsibility
+    The agent has an `optimize_portfolio` tool (min-variance, risk-parity,
+    max-Sharpe and per-risk-profile allocations), so allocations are computed
+    numerically and the LLM only explains them. The agent replies with JSON
+    allocations (STRATEGY_SCHEMA).
+    
+    Returns:
+        AssistantAgent: The configured investment strategy agent.
+    """
+    agent = AssistantAgent(
+        # Agent name: Used to identify this agent in group conversations
+        # This name will appear in logs and chat histories
+        name="InvestmentStrategyAgent",
+        
+        # LLM configuration: Pass the shared configuration dictionary
+        # Contains model type, API endpoint, temperature, and authentication details
+        # A copy is passed because AutoGen adds the tool schema to this dict
+        llm_config=dict(llm_config),
+        
+        # System message: Defines the agent's role and expertise
+        # This instruction shapes the agent's behavior and response style
+        # The agent will focus on investment advisory as per this message
+        system_message=(
+            "You are an investment advisor. "  # Role definition
+            "Suggest short-term and long-term investments with justification. "  # Primary responsibility
+            "Call optimize_portfolio for allocation weights instead of inventing them, "  # Numbers come from the tool
+            "then explain the allocations. "  # The LLM explains the computed numbers
+            + schema_instructions(STRATEGY_SCHEMA)  # Compact structured output
+        )
     )
-)
+    
+    # Register the portfolio optimizer as a tool the agent calls within its own turn
+    register_agent_tool(
+        agent,
+        optimize_portfolio_tool,
+        name="optimize_portfolio",
+        description=(
+            "Compute min-variance, risk-parity, max-Sharpe and risk-profile "
+            "(conservative/moderate/aggressive) allocations and the efficient "
+            "frontier from historical returns."
+        ),
+    )
+    
+    # Reply with validated allocations (schema-constrained JSON after any tool calls)
+    # Adds a schema check to the agent's tool loop (one loop for both)
+    register_structured_output(agent, STRATEGY_SCHEMA)
+    return agent
+
+# Shared default instance for a single interactive run
+# Built on first attribute access (PEP 562), not at import time, so importing
+# the module (e.g. for its factory) does not create an unused agent
+def __getattr__(name):
+    if name == "investment_strategy_agent":
+        globals()[name] = create_investment_strategy_agent()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -12,24 +12,54 @@ from autogen import AssistantAgent
 # This ensures all agents use the same model settings for consistency
 from config.llm_config import llm_config
 
+# Import the market view schema and the structured (JSON) reply
+from tools.structured_output import MARKET_VIEW_SCHEMA, register_structured_output, schema_instructions
+
 # ============================================================================
-# Create the Market Analysis Agent instance
+# Factory for the Market Analysis Agent
 # This agent is configured specifically for financial market analysis
 # ============================================================================
-market_analysis_agent = AssistantAgent(
-    # Agent name: Used to identify this agent in group conversations
-    # This name will appear in logs and chat histories
-    name="MarketAnalysisAgent",
+def create_market_analysis_agent():
+    """
+    Create a new, independent Market Analysis Agent instance.
+    
+    Every call returns a fresh agent with its own chat history, so separate
+    orchestrator instances (e.g. in the batch runner) never share state.
     
-    # LLM configuration: Pass the shared configuration dictionary
-    # Contains model type, API endpoint, temperature, and authentication details
-    llm_config=llm_config,
+    The agent replies with a JSON market view (MARKET_VIEW_SCHEMA).
     
-    # System message: Defines the agent's role and expertise
-    # This instruction shapes the agent's behavior and response style
-    # The agent will focus on financial market analysis as per this message
-    system_message=(
-        "You are a financial market analyst. "  # Role definition
-        "Analyze current market trends and macroeconomic conditions."  # Primary responsibility
+    Returns:
+        AssistantAgent: The configured market analysis agent.
+    """
+    agent = AssistantAgent(
+        # Agent name: Used to identify this agent in group conversations
+        # This name will appear in logs and chat histories
+        name="MarketAnalysisAgent",
+        
+        # LLM configuration: Pass the shared configuration dictionary
+        # Contains model type, API endpoint, temperature, and authentication details
+        llm_config=llm_config,
+        
+        # System message: Defines the agent's role and expertise
+        # This instruction shapes the agent's behavior and response style
+        # The agent will focus on financial market analysis as per this message
+        system_message=(
+            "You are a financial market analyst. "  # Role definition
+            "Analyze current market trends and macroeconomic conditions. "  # Primary responsibility
+            "Ground your analysis in the precomputed market signals when provided. "  # Use numeric context
+            + schema_instructions(MARKET_VIEW_SCHEMA)  # Compact structured output
+        )
     )
-)
+    
+    # Reply with a validated market view payload (schema-constrained JSON)
+    register_structured_output(agent, MARKET_VIEW_SCHEMA)
+    return agent
+
+# Shared default instance for a single interactive run
+# Built on first attribute access (PEP 562), not at import time, so importing
+# the module (e.g. for its factory) does not create an unused agent
+def __getattr__(name):
+    if name == "market_analysis_agent":
+        globals()[name] = create_market_analysis_agent()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,79 @@
+# ============================================================================
+# registry.py
+# Registry of the specialized agents and factory building them on demand
+# Agent modules (and AutoGen, pandas, ...) are only imported when requested
+# ============================================================================
+
+# Import importlib to load an agent module the first time it is needed
+import importlib
+
+# Registered agents, in the order they speak in the group chat
+# Maps the agent name to (module path, factory function name); modules are
+# imported lazily, so listing the agents costs nothing at startup
+AGENT_REGISTRY = {
+    "MarketAnalysisAgent": ("agents.market_analysis_agent", "create_market_analysis_agent"),
+    "RiskAssessmentAgent": ("agents.risk_assessment_agent", "create_risk_assessment_agent"),
+    "InvestmentStrategyAgent": ("agents.investment_strategy_agent", "create_investment_strategy_agent"),
+    "ReportGenerationAgent": ("agents.report_generation_agent", "create_report_generation_agent"),
+}
+
+
+def register_agent(name, module, factory):
+    """
+    Add (or replace) an agent in the registry.
+
+    Args:
+        name (str): Agent name, as used in the group chat.
+        module (str): Import path of the module defining the factory.
+        factory (str): Name of a function in `module` returning a new agent.
+
+    Example:
+        >>> register_agent("TaxAgent", "agents.tax_agent", "create_tax_agent")
+    """
+    AGENT_REGISTRY[name] = (module, factory)
+
+
+def get_agent_factory(name):
+    """
+    Import the module of a registered agent and return its factory function.
+
+    Args:
+        name (str): Registered agent name.
+
+    Returns:
+        callable: Function creating a new, independent agent instance.
+
+    Raises:
+        KeyError: If no agent with this name is registered.
+    """
+    if name not in AGENT_REGISTRY:
+        raise KeyError(f"Unknown agent {name!r}; registered: {', '.join(AGENT_REGISTRY)}")
+    module, factory = AGENT_REGISTRY[name]
+    return getattr(importlib.import_module(module), factory)
+
+
+def create_agent(name):
+    """
+    Create a new instance of a registered agent.
+
+    Args:
+        name (str): Registered agent name (e.g. 'RiskAssessmentAgent').
+
+    Returns:
+        ConversableAgent: A fresh agent with its own chat history.
+    """
+    return get_agent_factory(name)()
+
+
+def create_agents(names=None):
+    """
+    Create fresh instances of several registered agents.
+
+    Args:
+        names (list | None): Agent names; default: every registered agent in
+                             registry order.
+
+    Returns:
+        list: The new agents, in the requested order.
+    """
+    return [create_agent(name) for name in (names or list(AGENT_REGISTRY))]
@@ -6,30 +6,65 @@
 
 # Import the AssistantAgent class from AutoGen for creating an AI agent
 # AssistantAgent is a specialized agent type designed for handling tasks
-from autogen import AssistantAgent
+from autogen import Agent, AssistantAgent
 
 # Import the shared LLM configuration from central config file
 # This ensures all agents use the same model settings for consistency
 from config.llm_config import llm_config
 
+# Import the report template rendered from the specialists' structured payloads
+from tools.structured_output import report_template_reply
+
 # ============================================================================
-# Create the Report Generation Agent instance
+# Factory for the Report Generation Agent
 # This agent is configured specifically for creating structured financial reports
 # ============================================================================
-report_generation_agent = AssistantAgent(
-    # Agent name: Used to identify this agent in group conversations
-    # This name will appear in logs and chat histories
-    name="ReportGenerationAgent",
+def create_report_generation_agent():
+    """
+    Create a new, independent Report Generation Agent instance.
+    
+    Every call returns a fresh agent with its own chat history, so separate
+    orchestrator instances (e.g. in the batch runner) never share state.
     
-    # LLM configuration: Pass the shared configuration dictionary
-    # Contains model type, API endpoint, temperature, and authentication details
-    llm_config=llm_config,
+    When every specialist delivered a structured payload, the report is
+    rendered from a template without an LLM call.
     
-    # System message: Defines the agent's role and expertise
-    # This instruction shapes the agent's behavior and response style
-    # The agent will focus on report generation as per this message
-    system_message=(
-        "Generate a structured investment report including "  # Main task
-        "market overview, risk analysis, strategies, and conclusion."  # Report sections to include
+    Returns:
+        AssistantAgent: The configured report generation agent.
+    """
+    agent = AssistantAgent(
+        # Agent name: Used to identify this agent in group conversations
+        # This name will appear in logs and chat histories
+        name="ReportGenerationAgent",
+        
+        # LLM configuration: Pass the shared configuration dictionary
+        # Contains model type, API endpoint, temperature, and authentication details
+        llm_config=llm_config,
+        
+        # System message: Defines the agent's role and expertise
+        # This instruction shapes the agent's behavior and response style
+        # The agent will focus on report generation as per this message
+        system_message=(
+            "Generate a structured investment report including "  # Main task
+            "market overview, risk analysis, strategies, and conclusion."  # Report sections to include
+        )
     )
-)
+    
+    # Register the template-rendered report
+    # Runs after the termination checks and before the LLM reply; falls back to
+    # the LLM when a specialist replied in free text instead of a valid payload
+    agent.register_reply(
+        trigger=[Agent, None],
+        reply_func=report_template_reply,
+        position=2
+    )
+    return agent
+
+# Shared default instance for a single interactive run
+# Built on first attribute access (PEP 562), not at import time, so importing
+# the module (e.g. for its factory) does not create an unused agent
+def __getattr__(name):
+    if name == "report_generation_agent":
+        globals()[name] = create_report_generation_agent()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
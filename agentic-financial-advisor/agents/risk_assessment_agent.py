@@ -6,30 +6,95 @@
 
 # Import the AssistantAgent class from AutoGen for creating an AI agent
 # AssistantAgent is a specialized agent type designed for handling tasks
-from autogen import AssistantAgent
+from autogen import Agent, AssistantAgent
+
+# Import the deterministic risk scorer used as a fast path before the LLM
+from tools.risk_scoring import risk_fast_path_reply
+
+# Import the scenario simulator tool and the helper that lets the agent run it
+from tools.agent_tools import register_agent_tool
+from tools.scenario_engine import simulate_risk_tool
+
+# Import the risk schema and the structured (JSON) reply
+from tools.structured_output import RISK_ASSESSMENT_SCHEMA, register_structured_output, schema_instructions
 
 # Import the shared LLM configuration from central config file
 # This ensures all agents use the same model settings for consistency
 from config.llm_config import llm_config
 
 # ============================================================================
-# Create the Risk Assessment Agent instance
+# Factory for the Risk Assessment Agent
 # This agent is configured specifically for risk evaluation and analysis
 # ============================================================================
-risk_assessment_agent = AssistantAgent(
-    # Agent name: Used to identify this agent in group conversations
-    # This name will appear in logs and chat histories
-    name="RiskAssessmentAgent",
+def create_risk_assessment_agent():
+    """
+    Create a new, independent Risk Assessment Agent instance.
+    
+    Every call returns a fresh agent with its own chat history, so separate
+    orchestrator instances (e.g. in the batch runner) never share state.
+    
+    The agent has a `simulate_risk` tool (Monte Carlo / bootstrap scenarios
+    with VaR, CVaR, drawdown distribution and probability of loss), and
+    replies with JSON risk tiers (RISK_ASSESSMENT_SCHEMA).
     
-    # LLM configuration: Pass the shared configuration dictionary
-    # Contains model type, API endpoint, temperature, and authentication details
-    llm_config=llm_config,
+    Returns:
+        AssistantAgent: The configured risk assessment agent.
+    """
+    agent = AssistantAgent(
+        # Agent name: Used to identify this agent in group conversations
+        # This name will appear in logs and chat histories
+        name="RiskAssessmentAgent",
+        
+        # LLM configuration: Pass the shared configuration dictionary
+        # Contains model type, API endpoint, temperature, and authentication details
+        # A copy is passed because AutoGen adds the tool schema to this dict
+        llm_config=dict(llm_config),
+        
+        # System message: Defines the agent's role and expertise
+        # This instruction shapes the agent's behavior and response style
+        # The agent will focus on risk management and assessment as per this message
+        system_message=(
+            "You are a risk management expert. "  # Role definition
+            "Assess market and investment risks as Low, Medium, or High. "  # Risk classification task
+            "Base the tiers on the precomputed volatility, drawdown and VaR signals when provided. "  # Use numeric context
+            "Call simulate_risk for forward-looking VaR, CVaR and drawdown scenarios. "  # Numbers come from the tool
+            + schema_instructions(RISK_ASSESSMENT_SCHEMA)  # Compact structured output
+        )
+    )
     
-    # System message: Defines the agent's role and expertise
-    # This instruction shapes the agent's behavior and response style
-    # The agent will focus on risk management and assessment as per this message
-    system_message=(
-        "You are a risk management expert. "  # Role definition
-        "Assess market and investment risks as Low, Medium, or High."  # Risk classification task
+    # Register the scenario simulator as a tool the agent calls within its own turn
+    # Registered before the fast path, so the fast path still runs first
+    register_agent_tool(
+        agent,
+        simulate_risk_tool,
+        name="simulate_risk",
+        description=(
+            "Simulate 100,000 future price paths (block bootstrap or correlated GBM) "
+            "and return VaR/CVaR, probability of loss and drawdown percentiles per "
+            "ticker and for the portfolio."
+        ),
     )
-)
+    
+    # Reply with a validated risk payload (schema-constrained JSON after any tool calls)
+    # Registered before the fast path, so the fast path still runs first
+    register_structured_output(agent, RISK_ASSESSMENT_SCHEMA)
+    
+    # Register the deterministic risk-scoring fast path
+    # Runs right after the (async and sync) termination checks and before the LLM reply,
+    # so clear-cut Low/Medium/High tiers are answered in microseconds; ambiguous scores
+    # and narrative requests fall through to the LLM as before
+    agent.register_reply(
+        trigger=[Agent, None],
+        reply_func=risk_fast_path_reply,
+        position=2
+    )
+    return agent
+
+# Shared default instance for a single interactive run
+# Built on first attribute access (PEP 562), not at import time, so importing
+# the module (e.g. for its factory) does not create an unused agent
+def __getattr__(name):
+    if name == "risk_assessment_agent":
+        globals()[name] = create_risk_assessment_agent()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
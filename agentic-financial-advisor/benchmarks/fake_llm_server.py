@@ -0,0 +1,214 @@
+# ============================================================================
+# fake_llm_server.py
+# Deterministic stub of an OpenAI-compatible chat completions server
+# Stands in for Ollama in benchmarks, with configurable latency and token rate
+# ============================================================================
+
+# Import json to parse requests and encode responses
+import json
+
+# Import threading to serve in the background and count requests safely
+import threading
+
+# Import time to simulate time to first token and generation speed
+import time
+
+# Import the HTTP server used for the stub endpoint
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Canned reply per agent role, chosen by a keyword of the agent's system message
+# The report covers every required section, so the pipeline ends after it
+ROLE_REPLIES = (
+    ("structured investment report",
+     "## Market Overview\nEquities trend higher with moderate volatility.\n"
+     "## Risk Analysis\nOverall risk: Medium. Drawdowns remain contained.\n"
+     "## Strategies\nShort term: quality large caps. Long term: diversified index funds.\n"
+     "## Conclusion\nStay diversified and rebalance quarterly."),
+    ("risk management", "Risk tier: Medium. Volatility and drawdown are moderate; VaR is within limits."),
+    ("investment advisor", "Short-term: large-cap technology. Long-term: broad index funds and bonds."),
+    ("market analyst", "Markets trend upward; momentum is positive and volatility is moderate."),
+)
+
+# Reply for system messages without a known role (e.g. the group chat manager)
+DEFAULT_REPLY = "Acknowledged."
+
+# Structured payload per agent role, used when JSON output is requested
+# (schema in response_format or JSON instructions in the system message)
+ROLE_PAYLOADS = (
+    ("risk management",
+     {"overall": "Medium", "summary": "Volatility and drawdown are moderate; VaR is within limits.",
+      "assets": [{"ticker": "^GSPC", "tier": "Medium", "reason": "moderate volatility"}]}),
+    ("investment advisor",
+     {"risk_profile": "moderate",
+      "short_term": [{"asset": "Large-cap technology", "weight": 0.4, "rationale": "positive momentum"}],
+      "long_term": [{"asset": "Broad index funds", "weight": 0.6, "rationale": "diversification"}],
+      "summary": "Balance momentum exposure with diversified index holdings."}),
+    ("market analyst",
+     {"outlook": "bullish", "summary": "Markets trend upward with moderate volatility.",
+      "drivers": ["Positive momentum", "Stable rates"]}),
+)
+
+
+class _QuietHTTPServer(ThreadingHTTPServer):
+    # Clients closing idle keep-alive connections are not errors
+    def handle_error(self, request, client_address):
+        return None
+
+
+class FakeLLMServer:
+    """
+    Stub OpenAI-compatible server answering /v1/chat/completions.
+
+    Replies are deterministic per agent role and padded to
+    `completion_tokens` words. Every response waits `latency_s` (time to
+    first token) plus `completion_tokens / tokens_per_second`; streamed
+    responses spread the tokens over that time, like a real server.
+
+    Attributes:
+        url (str): Base URL to use as the LLM backend (".../v1")
+        requests (int): Completion requests served so far
+        completion_tokens (int): Words per reply
+
+    Example:
+        >>> with FakeLLMServer(latency_s=0.05) as server:
+        ...     os.environ["LLM_BASE_URLS"] = server.url
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency_s=0.05, tokens_per_second=2000.0,
+                 completion_tokens=64):
+        self.latency_s = latency_s
+        self.tokens_per_second = tokens_per_second
+        self.completion_tokens = completion_tokens
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = _QuietHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self.url = f"http://{host}:{self._server.server_address[1]}/v1"
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def reset_count(self):
+        """
+        Reset the request counter and return its previous value.
+        """
+        with self._lock:
+            count, self.requests = self.requests, 0
+            return count
+
+    def reply_for(self, messages, structured=False):
+        """
+        Return the deterministic reply for a conversation, as a list of words.
+
+        Structured requests get the role's JSON payload, without padding.
+        """
+        system = " ".join(m.get("content") or "" for m in messages if m.get("role") == "system").lower()
+        if structured or "json object" in system:
+            payload = next((payload for keyword, payload in ROLE_PAYLOADS if keyword in system), None)
+            if payload is not None:
+                return json.dumps(payload).split(" ")
+        text = next((reply for keyword, reply in ROLE_REPLIES if keyword in system), DEFAULT_REPLY)
+        words = text.replace("\n", " \n ").split(" ")
+        padding = max(0, self.completion_tokens - len(words))
+        return words + ["detail"] * padding
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive, so the client's connection pool is exercised
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                return None
+
+            def _send(self, status, body, content_type="application/json"):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    request = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    self._send(400, b'{"error": "invalid JSON"}')
+                    return
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._send(404, b'{"error": "not found"}')
+                    return
+                with server._lock:
+                    server.requests += 1
+                server.respond(self, request)
+
+        return Handler
+
+    def respond(self, handler, request):
+        # Step 1: Build the reply and simulate the time to first token
+        words = self.reply_for(request.get("messages", []), structured=bool(request.get("response_format")))
+        model = request.get("model", "fake")
+        prompt_tokens = sum(len(str(m.get("content") or "").split()) for m in request.get("messages", []))
+        time.sleep(self.latency_s)
+        per_token = 1.0 / self.tokens_per_second if self.tokens_per_second else 0.0
+
+        # Step 2: Plain response after the whole generation time
+        if not request.get("stream"):
+            time.sleep(per_token * len(words))
+            body = {
+                "id": "chatcmpl-fake", "object": "chat.completion", "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": " ".join(words)}}],
+                "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(words),
+                          "total_tokens": prompt_tokens + len(words)},
+            }
+            handler._send(200, json.dumps(body).encode("utf-8"))
+            return
+
+        # Step 3: Server-sent events, one chunk per token (chunked transfer)
+        handler.send_response(200)
+        handler.send_header("Content-Type", "text/event-stream")
+        handler.send_header("Transfer-Encoding", "chunked")
+        handler.end_headers()
+
+        def chunk(delta, finish_reason=None):
+            event = {"id": "chatcmpl-fake", "object": "chat.completion.chunk",
+                     "created": int(time.time()), "model": model,
+                     "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+            write(f"data: {json.dumps(event)}\n\n")
+
+        def write(text):
+            data = text.encode("utf-8")
+            handler.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+
+        for position, word in enumerate(words):
+            time.sleep(per_token)
+            delta = {"content": word if position == 0 else " " + word}
+            if position == 0:
+                delta["role"] = "assistant"
+            chunk(delta)
+        chunk({}, finish_reason="stop")
+        # Usage is reported in a last chunk without choices when requested
+        if (request.get("stream_options") or {}).get("include_usage"):
+            event = {"id": "chatcmpl-fake", "object": "chat.completion.chunk",
+                     "created": int(time.time()), "model": model, "choices": [],
+                     "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(words),
+                               "total_tokens": prompt_tokens + len(words)}}
+            write(f"data: {json.dumps(event)}\n\n")
+        write("data: [DONE]\n\n")
+        handler.wfile.write(b"0\r\n\r\n")
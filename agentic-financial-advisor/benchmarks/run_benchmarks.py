@@ -0,0 +1,280 @@
+# ============================================================================
+# run_benchmarks.py
+# Offline benchmark harness for the orchestrator and main.py
+# Runs scripted workloads against a stub LLM server and synthetic market data
+# and reports latency percentiles, throughput, LLM calls and peak RSS as JSON
+#
+# Usage (from the agentic-financial-advisor directory):
+#     python -m benchmarks.run_benchmarks --output benchmark_results.json
+# ============================================================================
+
+# Import argparse for the command line options
+import argparse
+
+# Import io and redirect_stdout to silence main.py's own output
+import io
+from contextlib import redirect_stdout
+
+# Import json for the machine-readable report
+import json
+
+# Import os and tempfile for the isolated per-workload caches
+import os
+import tempfile
+
+# Import resource to read the peak resident set size of a workload
+import resource
+
+# Import subprocess and sys to run every workload in a fresh interpreter
+import subprocess
+import sys
+
+# Import time for timestamps
+import time
+
+# Import the stub LLM server that stands in for Ollama
+from benchmarks.fake_llm_server import FakeLLMServer
+
+# Workloads in the order they run
+# - single: one query at a time through FinancialAdvisorOrchestrator.run
+# - batch: many concurrent queries through the BatchRunner
+# - universe: single queries with market signals for a large ticker universe
+# - cli: a batch file through main.py, exactly as from the command line
+WORKLOADS = ("single", "batch", "universe", "cli")
+
+# Query sent by every workload; a request number keeps the prompts distinct
+QUERY = "Analyze current market scenario and suggest short-term and long-term investments with risk analysis."
+
+# Directory containing main.py (the working directory of every workload)
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_args(argv=None):
+    """
+    Parse the command line options.
+    """
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the financial advisor")
+    parser.add_argument("--workloads", default=",".join(WORKLOADS),
+                        help=f"Comma-separated workloads to run (default: {','.join(WORKLOADS)})")
+    parser.add_argument("--output", default="benchmark_results.json",
+                        help="JSON file receiving the report (default: benchmark_results.json)")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="Queries of the single and universe workloads (default: 5)")
+    parser.add_argument("--queries", type=int, default=1000,
+                        help="Queries of the batch workload (default: 1000)")
+    parser.add_argument("--cli-queries", type=int, default=50,
+                        help="Queries of the cli workload (default: 50)")
+    parser.add_argument("--workers", type=int, default=8,
+                        help="Concurrent requests in the batch and cli workloads (default: 8)")
+    parser.add_argument("--tickers", type=int, default=500,
+                        help="Ticker universe size of the universe workload (default: 500)")
+    parser.add_argument("--llm-latency", type=float, default=0.05,
+                        help="Stub LLM time to first token in seconds (default: 0.05)")
+    parser.add_argument("--tokens-per-second", type=float, default=2000.0,
+                        help="Stub LLM generation speed (default: 2000)")
+    parser.add_argument("--completion-tokens", type=int, default=64,
+                        help="Stub LLM words per reply (default: 64)")
+    parser.add_argument("--llm-parallel", type=int, default=8,
+                        help="Concurrent LLM requests allowed by the client pool (default: 8)")
+    parser.add_argument("--data-latency", type=float, default=0.0,
+                        help="Synthetic market data round trip in seconds (default: 0)")
+    parser.add_argument("--child", choices=WORKLOADS, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def peak_rss_mb():
+    """
+    Return the peak resident set size of this process in MB.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+# ============================================================================
+# Workloads (run inside the child process)
+# ============================================================================
+
+def run_single(args):
+    # Sequential queries on one orchestrator, reset between queries
+    from main import BENCHMARK, WATCHLIST
+    from orchestrator.batch_runner import RunStats, create_orchestrator
+
+    orchestrator = create_orchestrator(silent=True, tickers=WATCHLIST, benchmark=BENCHMARK)
+    stats = RunStats()
+    for number in range(args.repeat):
+        orchestrator.reset()
+        started = time.perf_counter()
+        orchestrator.run(f"{QUERY} (request {number})")
+        stats.record(time.perf_counter() - started, 0.0, True)
+    return dict(stats.summary(), queries=args.repeat)
+
+
+def run_batch(args):
+    # Concurrent queries through the pooled batch runner
+    from main import BENCHMARK, WATCHLIST
+    from orchestrator.batch_runner import BatchRunner
+
+    runner = BatchRunner(pool_size=args.workers, tickers=WATCHLIST, benchmark=BENCHMARK)
+    futures = [runner.submit(number, f"{QUERY} (request {number})") for number in range(args.queries)]
+    failed = sum(future.result()["status"] != "ok" for future in futures)
+    runner.shutdown()
+    return dict(runner.stats.summary(), queries=args.queries, failed=failed)
+
+
+def run_universe(args):
+    # Sequential queries with signals for a large universe attached
+    from orchestrator.batch_runner import RunStats, create_orchestrator
+
+    tickers = [f"SYN{number:05d}" for number in range(args.tickers)]
+    orchestrator = create_orchestrator(silent=True, tickers=tickers, benchmark=tickers[0])
+    stats = RunStats()
+    context_seconds = []
+    for number in range(args.repeat):
+        orchestrator.reset()
+        started = time.perf_counter()
+        orchestrator.market_context()
+        context_seconds.append(time.perf_counter() - started)
+        started = time.perf_counter()
+        orchestrator.run(f"{QUERY} (request {number})")
+        stats.record(time.perf_counter() - started, 0.0, True)
+    return dict(
+        stats.summary(), queries=args.repeat, tickers=args.tickers,
+        market_context_cold_s=round(context_seconds[0], 3),
+        market_context_warm_s=round(min(context_seconds[1:] or context_seconds), 3),
+    )
+
+
+def run_cli(args):
+    # A batch file through main.py's own entry point
+    import main
+    from orchestrator.batch_runner import RunStats
+
+    workdir = tempfile.mkdtemp(prefix="advisor-cli-")
+    input_path = os.path.join(workdir, "queries.jsonl")
+    output_path = os.path.join(workdir, "results.jsonl")
+    with open(input_path, "w", encoding="utf-8") as queries:
+        for number in range(args.cli_queries):
+            queries.write(json.dumps({"id": number, "query": f"{QUERY} (request {number})"}) + "\n")
+
+    stats = RunStats()
+    with redirect_stdout(io.StringIO()):
+        main.main(["--batch", input_path, "--output", output_path, "--workers", str(args.workers)])
+    with open(output_path, encoding="utf-8") as results:
+        for line in results:
+            record = json.loads(line)
+            stats.record(record.get("latency_s", 0.0), record.get("queue_wait_s", 0.0), record["status"] == "ok")
+    return dict(stats.summary(), queries=args.cli_queries)
+
+
+WORKLOAD_RUNNERS = {
+    "single": run_single,
+    "batch": run_batch,
+    "universe": run_universe,
+    "cli": run_cli,
+}
+
+
+def run_child(args):
+    """
+    Run one workload in this (fresh) process and print its result as JSON.
+
+    The LLM backend and cache locations come from the environment set by
+    the parent; market data is served by the synthetic provider.
+    """
+    from benchmarks.synthetic_market_data import SyntheticOHLCVProvider
+    from tools.market_data_cache import OHLCVCache
+    from tools.market_data_tool import set_default_cache
+
+    set_default_cache(OHLCVCache(SyntheticOHLCVProvider(latency_s=args.data_latency),
+                                 cache_dir=os.environ["MARKET_DATA_CACHE_DIR"]))
+    started = time.perf_counter()
+    result = WORKLOAD_RUNNERS[args.child](args)
+    result["wall_s"] = round(time.perf_counter() - started, 3)
+    result["peak_rss_mb"] = peak_rss_mb()
+    print(json.dumps(result))
+
+
+# ============================================================================
+# Parent process: stub server, isolation and the report
+# ============================================================================
+
+def run_workload(name, args, argv, server, workdir):
+    """
+    Run one workload in a child interpreter and add the LLM call counts.
+
+    The child gets the parent's options (`argv`), so it runs the workload
+    with the same settings.
+    """
+    env = dict(
+        os.environ,
+        LLM_BASE_URLS=server.url,
+        OLLAMA_NUM_PARALLEL=str(args.llm_parallel),
+        LLM_CACHE_PATH=os.path.join(workdir, name, "llm_cache.sqlite"),
+        MARKET_DATA_CACHE_DIR=os.path.join(workdir, name, "market_data"),
+    )
+    command = [sys.executable, "-m", "benchmarks.run_benchmarks", "--child", name] + argv
+    server.reset_count()
+    process = subprocess.run(command, cwd=APP_DIR, env=env, capture_output=True, text=True)
+    calls = server.reset_count()
+    if process.returncode != 0:
+        return {"error": process.stderr.strip().splitlines()[-1] if process.stderr.strip() else "failed"}
+
+    result = json.loads(process.stdout.strip().splitlines()[-1])
+    result["llm_calls"] = calls
+    result["llm_calls_per_query"] = round(calls / result["queries"], 3) if result.get("queries") else None
+    return result
+
+
+def git_revision():
+    # Commit being measured, so reports from different runs can be compared
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=APP_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    """
+    Run the selected workloads and write the JSON report.
+
+    This function:
+    1. Starts the stub LLM server with the configured latency and token rate
+    2. Runs every workload in its own interpreter, with its own LLM
+       completion cache and market data cache, so results are independent
+       and peak RSS is measured per workload
+    3. Counts the LLM requests the server received during each workload
+    4. Writes the report (config, revision and per-workload metrics)
+    """
+    argv = sys.argv[1:] if argv is None else list(argv)
+    args = parse_args(argv)
+    if args.child:
+        run_child(args)
+        return
+
+    workloads = [name.strip() for name in args.workloads.split(",") if name.strip()]
+    unknown = sorted(set(workloads) - set(WORKLOADS))
+    if unknown:
+        raise SystemExit(f"Unknown workloads: {', '.join(unknown)}")
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "revision": git_revision(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("child", "output")},
+        "workloads": {},
+    }
+    with FakeLLMServer(latency_s=args.llm_latency, tokens_per_second=args.tokens_per_second,
+                       completion_tokens=args.completion_tokens) as server:
+        with tempfile.TemporaryDirectory(prefix="advisor-bench-") as workdir:
+            for name in workloads:
+                print(f"Running {name} ...", file=sys.stderr)
+                report["workloads"][name] = run_workload(name, args, argv, server, workdir)
+
+    with open(args.output, "w", encoding="utf-8") as output:
+        json.dump(report, output, indent=2)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
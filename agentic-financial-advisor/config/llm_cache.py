@@ -0,0 +1,261 @@
+# ============================================================================
+# llm_cache.py
+# Content-addressed, SQLite-backed cache for LLM completions
+# Shared by all agents and the GroupChatManager to skip repeated generations
+# ============================================================================
+
+# Import hashlib to turn cache keys into fixed-size content addresses
+import hashlib
+
+# Import os to create the cache directory
+import os
+
+# Import pickle to store the completion response objects returned by AutoGen
+import pickle
+
+# Import sqlite3 for a single-file, process-safe cache store
+import sqlite3
+
+# Import threading to serialize access to the shared connection
+import threading
+
+# Import time for TTL expiry and LRU bookkeeping
+import time
+
+# Import the cache settings from the central LLM configuration
+from config.llm_config import llm_cache_config
+
+
+class SQLiteCompletionCache:
+    """
+    Completion cache implementing AutoGen's `AbstractCache` protocol.
+
+    AutoGen builds the lookup key from the full request (model, temperature,
+    messages including each agent's system message, ...). This cache adds the
+    agent name as a namespace and stores the SHA-256 of both, so the same
+    prompt sent by two different agents never shares an entry.
+
+    The cache:
+    - Expires entries older than `ttl_seconds`
+    - Evicts least-recently-used entries once the total size exceeds `max_bytes`
+    - Counts hits and misses overall and per agent
+
+    Attributes:
+        path (str): Location of the SQLite database file
+        max_bytes (int): Upper bound for the total size of stored responses
+        ttl_seconds (float | None): Entry lifetime (None = never expires)
+        hits (int): Number of cache hits across all agents
+        misses (int): Number of cache misses across all agents
+    """
+
+    def __init__(self, path, max_bytes, ttl_seconds=None):
+        """
+        Initialize the cache and create the database schema if needed.
+
+        Args:
+            path (str): SQLite database file (created on first use).
+            max_bytes (int): Maximum total size of the cached responses.
+            ttl_seconds (float | None): Entry lifetime in seconds.
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._agent_stats = {}
+        self._lock = threading.Lock()
+        self._connection = None
+
+    # ------------------------------------------------------------------
+    # AbstractCache protocol
+    # ------------------------------------------------------------------
+
+    def get(self, key, default=None, namespace=""):
+        """
+        Return the cached response for `key`, or `default` on a miss.
+        """
+        digest = self._digest(namespace, key)
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(
+                "SELECT value, created FROM completions WHERE key = ?", (digest,)
+            ).fetchone()
+
+            # Expired entries count as misses and are removed right away
+            if row is not None and self.ttl_seconds is not None and now - row[1] > self.ttl_seconds:
+                connection.execute("DELETE FROM completions WHERE key = ?", (digest,))
+                row = None
+
+            if row is None:
+                self._count(namespace, hit=False)
+                return default
+
+            connection.execute(
+                "UPDATE completions SET accessed = ? WHERE key = ?", (now, digest)
+            )
+            self._count(namespace, hit=True)
+        return pickle.loads(row[0])
+
+    def set(self, key, value, namespace=""):
+        """
+        Store a response and evict old entries if the cache grew too large.
+        """
+        digest = self._digest(namespace, key)
+        blob = pickle.dumps(value)
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                "INSERT OR REPLACE INTO completions (key, value, size, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (digest, blob, len(blob), now, now),
+            )
+            self._evict(connection)
+
+    def close(self):
+        """
+        Close the database connection (it is reopened on the next access).
+        """
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # AutoGen enters and exits the cache around every single completion,
+        # so the connection is kept open here and only closed by close()
+        return None
+
+    # ------------------------------------------------------------------
+    # Per-agent views and statistics
+    # ------------------------------------------------------------------
+
+    def for_agent(self, agent_name):
+        """
+        Return a view of this cache that namespaces keys with `agent_name`.
+
+        Assign the view to `agent.client_cache` so the agent's completions
+        are stored in the shared database under its own name.
+        """
+        return AgentCompletionCache(self, agent_name)
+
+    def stats(self):
+        """
+        Return hit/miss counters overall and per agent.
+
+        Returns:
+            dict: {"hits", "misses", "hit_rate", "agents": {name: {"hits", "misses"}}}
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "agents": {name: dict(counts) for name, counts in self._agent_stats.items()},
+            }
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _connect(self):
+        # Open the database lazily and make sure the schema exists
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._connection = sqlite3.connect(
+                self.path, check_same_thread=False, isolation_level=None
+            )
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS completions ("
+                "key TEXT PRIMARY KEY, value BLOB, size INTEGER, "
+                "created REAL, accessed REAL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS completions_accessed ON completions (accessed)"
+            )
+        return self._connection
+
+    @staticmethod
+    def _digest(namespace, key):
+        # Content address of the agent name plus AutoGen's request key
+        return hashlib.sha256(f"{namespace}\x00{key}".encode("utf-8")).hexdigest()
+
+    def _count(self, namespace, hit):
+        counts = self._agent_stats.setdefault(namespace or "<shared>", {"hits": 0, "misses": 0})
+        if hit:
+            self.hits += 1
+            counts["hits"] += 1
+        else:
+            self.misses += 1
+            counts["misses"] += 1
+
+    def _evict(self, connection):
+        # Drop least-recently-used entries until the total size fits again
+        total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM completions").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = connection.execute(
+            "SELECT key, size FROM completions ORDER BY accessed ASC"
+        ).fetchall()
+        stale = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        connection.executemany("DELETE FROM completions WHERE key = ?", stale)
+
+
+class AgentCompletionCache:
+    """
+    Per-agent view of a `SQLiteCompletionCache` (also an `AbstractCache`).
+
+    All views share the parent's database, size limit and counters; the view
+    only adds its agent name to every key.
+    """
+
+    def __init__(self, parent, agent_name):
+        self.parent = parent
+        self.agent_name = agent_name
+
+    def get(self, key, default=None):
+        return self.parent.get(key, default, namespace=self.agent_name)
+
+    def set(self, key, value):
+        self.parent.set(key, value, namespace=self.agent_name)
+
+    def close(self):
+        # The shared database outlives any single agent
+        return None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return None
+
+
+# Process-wide cache instance, created on first use
+_llm_cache = None
+
+
+def get_llm_cache():
+    """
+    Return the process-wide completion cache configured in `llm_cache_config`.
+    """
+    global _llm_cache
+    if _llm_cache is None:
+        _llm_cache = SQLiteCompletionCache(
+            path=llm_cache_config["path"],
+            max_bytes=llm_cache_config["max_bytes"],
+            ttl_seconds=llm_cache_config["ttl_seconds"],
+        )
+    return _llm_cache
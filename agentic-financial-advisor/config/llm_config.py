@@ -4,6 +4,9 @@
 # This configuration is used by all AutoGen agents in the application
 # ============================================================================
 
+# Import os to read optional overrides from environment variables
+import os
+
 # Define the LLM configuration dictionary that will be shared across all agents
 # This ensures consistent model behavior and settings throughout the application
 llm_config = {
@@ -27,5 +30,68 @@ llm_config = {
     # 0.3: Low temperature = more deterministic, focused, consistent responses
     #      Good for financial analysis where we need reliable, predictable outputs
     # Higher values (>0.7): More creative but less reliable responses
-    "temperature": 0.3
+    "temperature": 0.3,
+    
+    # Disable AutoGen's legacy, unbounded disk cache (.cache/<seed>)
+    # Completions are cached by the shared SQLite cache configured below instead
+    "cache_seed": None,
+    
+    # Send requests through the shared, connection-pooled client (config/llm_pool.py)
+    # The backends, concurrency and retries are set in llm_pool_config below
+    "model_client_cls": "PooledLLMClient"
+}
+
+# ============================================================================
+# LLM client pool settings
+# Used by config/llm_pool.py for the client shared by all agents and the manager
+# ============================================================================
+llm_pool_config = {
+    # Backend servers; requests go to the least-loaded one
+    # Several local Ollama instances can be listed in the LLM_BASE_URLS
+    # environment variable, separated by commas
+    "base_urls": [
+        url.strip()
+        for url in os.environ.get("LLM_BASE_URLS", llm_config["base_url"]).split(",")
+        if url.strip()
+    ],
+    
+    # API key sent to every backend
+    "api_key": llm_config["api_key"],
+    
+    # Requests running at once per backend; match the server's parallel
+    # slots (OLLAMA_NUM_PARALLEL) so excess requests queue here, not there
+    "max_concurrency": int(os.environ.get("OLLAMA_NUM_PARALLEL", 4)),
+    
+    # Keep-alive connection pool shared by all backends
+    "max_connections": 32,
+    "max_keepalive": 16,
+    "keepalive_expiry": 30.0,
+    
+    # Bounded timeouts (seconds) and retries; a failed backend is skipped
+    # for the cool-down period while other backends are available
+    "connect_timeout": 5.0,
+    "timeout": 120.0,
+    "max_retries": 2,
+    "backoff_seconds": 0.5,
+    "cooldown_seconds": 10.0,
+    
+    # Send identical concurrent requests upstream only once
+    "coalesce": True
+}
+
+# ============================================================================
+# LLM completion cache settings
+# Used by config/llm_cache.py for the cache shared by all agents and the manager
+# ============================================================================
+llm_cache_config = {
+    # SQLite database file holding the cached completions
+    # Can be overridden with the LLM_CACHE_PATH environment variable
+    "path": os.environ.get("LLM_CACHE_PATH", os.path.join(".cache", "llm_cache.sqlite")),
+    
+    # Maximum total size of cached responses (least recently used evicted first)
+    "max_bytes": 256 * 1024 * 1024,
+    
+    # Entry lifetime in seconds (1 day); daily queries are answered from cache
+    # within the same day and regenerated once market conditions may have changed
+    "ttl_seconds": 24 * 60 * 60
 }
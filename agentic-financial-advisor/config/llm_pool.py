@@ -0,0 +1,405 @@
+# ============================================================================
+# llm_pool.py
+# Shared, connection-pooled LLM client for all agents and the GroupChatManager
+# Bounds concurrency per backend, coalesces identical in-flight requests and
+# routes every request to the least-loaded Ollama (OpenAI-compatible) backend
+# ============================================================================
+
+# Import copy to hand every coalesced caller its own response object
+import copy
+
+# Import hashlib and json to build the coalescing key of a request
+import hashlib
+import json
+
+# Import random and time for jittered retry backoff and backend cool-down
+import random
+import time
+
+# Import threading for the per-backend semaphores and the in-flight table
+import threading
+
+# Import Future so coalesced callers can wait for the leading request
+from concurrent.futures import Future
+
+# Import contextmanager and ContextVar to enable streaming for one conversation
+# only; the setting follows it into every thread that runs its agents
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Import httpx for the keep-alive connection pool shared by every backend
+import httpx
+
+# Import the OpenAI SDK (Ollama serves an OpenAI-compatible API) and its
+# transient errors, which are retried on another backend
+from openai import APIConnectionError, APITimeoutError, InternalServerError, OpenAI, RateLimitError
+
+# Import the response types a streamed completion is assembled into
+from openai.types.chat import ChatCompletion
+from openai.types.chat.chat_completion import ChatCompletionMessage, Choice
+from openai.types.completion_usage import CompletionUsage
+
+# Import AutoGen's OpenAI client, which implements tool calls, usage and cost
+from autogen.oai.client import OpenAIClient, OpenAIWrapper, PlaceHolderClient
+
+# Import IOStream, the channel streamed text is printed to (and replayed
+# for coalesced callers)
+from autogen.io.base import IOStream
+
+# Import the pool settings from the central LLM configuration
+from config.llm_config import llm_pool_config
+
+# Import span tracing to record the backend, queue wait and retries per request
+from tools.tracing import span
+
+# Errors worth retrying: the backend was unreachable, slow or overloaded
+TRANSIENT_ERRORS = (APIConnectionError, APITimeoutError, InternalServerError, RateLimitError)
+
+# Rough number of characters per token, for servers that report no usage
+# for streamed completions
+CHARS_PER_TOKEN = 4
+
+# Whether completions requested in this context are streamed (see streaming_completions)
+_streaming = ContextVar("llm_streaming", default=False)
+
+
+@contextmanager
+def streaming_completions(enabled=True):
+    """
+    Stream the completions of the pooled client within this block.
+
+    Streaming is not part of llm_config: only conversations consumed through
+    orchestrator.stream()/astream() need tokens as they are generated, and
+    every other run gets plain completions.
+
+    Args:
+        enabled (bool): Whether to stream (default: True).
+
+    Example:
+        >>> with streaming_completions():
+        ...     orchestrator.run(query)   # tokens go to the current IOStream
+    """
+    token = _streaming.set(enabled)
+    try:
+        yield
+    finally:
+        _streaming.reset(token)
+
+
+class _BackendClient(OpenAIClient):
+    """
+    AutoGen's OpenAI client, with the token usage of streamed completions
+    taken from the server.
+
+    AutoGen counts the prompt tokens of a streamed reply itself, with a
+    tokenizer that only knows OpenAI models, and raises NotImplementedError
+    for Ollama models such as llama3.2. Streamed requests here ask the server
+    to report the usage in the last chunk (stream_options.include_usage), so
+    traced token counts are the same as for plain completions. Servers that
+    report no usage get a 4 characters per token estimate.
+    """
+
+    def create(self, params):
+        if not (params.get("stream") and "messages" in params):
+            return super().create(params)
+
+        # Step 1: Stream the chunks; text goes to the current IOStream as it arrives
+        iostream = IOStream.get_default()
+        params = dict(params, stream_options={"include_usage": True})
+        count = params.get("n", 1)
+        contents = [""] * count
+        finish_reasons = ["stop"] * count
+        tool_calls = [None] * count
+        usage, last = None, None
+        for chunk in self._oai_client.chat.completions.create(**params):
+            last = chunk
+            usage = chunk.usage or usage
+            for choice in chunk.choices:
+                if choice.finish_reason:
+                    finish_reasons[choice.index] = choice.finish_reason
+                for call in choice.delta.tool_calls or []:
+                    calls = tool_calls[choice.index] = tool_calls[choice.index] or []
+                    calls.extend([None] * (call.index + 1 - len(calls)))
+                    calls[call.index], _ = OpenAIWrapper._update_tool_calls_from_chunk(
+                        call, calls[call.index], 0
+                    )
+                if choice.delta.content:
+                    iostream.print(choice.delta.content, end="", flush=True)
+                    contents[choice.index] += choice.delta.content
+        iostream.print()
+
+        # Step 2: Assemble the chunks into one completion
+        if usage is None:
+            prompt = sum(len(str(message.get("content") or "")) for message in params["messages"])
+            completion = sum(len(content) for content in contents)
+            usage = CompletionUsage(
+                prompt_tokens=prompt // CHARS_PER_TOKEN,
+                completion_tokens=completion // CHARS_PER_TOKEN,
+                total_tokens=(prompt + completion) // CHARS_PER_TOKEN,
+            )
+        return ChatCompletion(
+            id=last.id if last else "",
+            model=last.model if last else params.get("model", ""),
+            created=last.created if last else int(time.time()),
+            object="chat.completion",
+            usage=usage,
+            choices=[
+                Choice(
+                    index=index,
+                    finish_reason=finish_reasons[index],
+                    message=ChatCompletionMessage(
+                        role="assistant", content=contents[index], tool_calls=tool_calls[index] or None
+                    ),
+                    logprobs=None,
+                )
+                for index in range(count)
+            ],
+        )
+
+class _Backend:
+    """
+    One LLM server: its OpenAI client, concurrency slots and load counters.
+    """
+
+    def __init__(self, base_url, client, max_concurrency):
+        self.base_url = base_url
+        self.client = client
+        self.slots = threading.BoundedSemaphore(max_concurrency)
+        self.in_flight = 0
+        self.requests = 0
+        self.failures = 0
+        self.down_until = 0.0
+
+
+class LLMBackendPool:
+    """
+    Process-wide pool of LLM backends behind one keep-alive connection pool.
+
+    Every request:
+    1. Is coalesced with an identical request already in flight (same model,
+       messages, tools and sampling settings): only the first one goes
+       upstream, the others wait for and share its response
+    2. Is routed to the least-loaded backend (requests running or waiting),
+       skipping backends that failed recently
+    3. Waits for one of the backend's `max_concurrency` slots, matched to the
+       server's parallel request slots (OLLAMA_NUM_PARALLEL)
+    4. Is retried on transient errors with jittered backoff, on the next
+       least-loaded backend, at most `max_retries` times
+
+    Attributes:
+        backends (list): One _Backend per configured base URL
+        coalesced (int): Requests answered by another caller's upstream call
+    """
+
+    def __init__(self, base_urls, api_key="ollama", max_concurrency=4, max_connections=32,
+                 max_keepalive=16, keepalive_expiry=30.0, connect_timeout=5.0, timeout=120.0,
+                 max_retries=2, backoff_seconds=0.5, cooldown_seconds=10.0, coalesce=True):
+        # Step 1: One connection pool shared by every backend client
+        self.http_client = httpx.Client(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+        )
+
+        # Step 2: One OpenAI client per backend; retries are done by the pool
+        # so that a failing request can move to another backend
+        self.backends = [
+            _Backend(
+                base_url,
+                _BackendClient(OpenAI(base_url=base_url, api_key=api_key, http_client=self.http_client,
+                                    max_retries=0, timeout=httpx.Timeout(timeout, connect=connect_timeout))),
+                max_concurrency,
+            )
+            for base_url in base_urls
+        ]
+        if not self.backends:
+            raise ValueError("At least one LLM backend base URL is required")
+
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.cooldown_seconds = cooldown_seconds
+        self.coalesce = coalesce
+        self.coalesced = 0
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._next = 0
+
+    def _acquire_backend(self, exclude=None):
+        # Least-loaded healthy backend; ties rotate so idle backends share load
+        with self._lock:
+            now = time.monotonic()
+            count = len(self.backends)
+            order = [self.backends[(self._next + offset) % count] for offset in range(count)]
+            self._next = (self._next + 1) % count
+            healthy = [b for b in order if b.down_until <= now and b is not exclude] or order
+            backend = min(healthy, key=lambda b: b.in_flight)
+            backend.in_flight += 1
+            backend.requests += 1
+            return backend
+
+    def _release_backend(self, backend, failed=False):
+        with self._lock:
+            backend.in_flight -= 1
+            if failed:
+                backend.failures += 1
+                backend.down_until = time.monotonic() + self.cooldown_seconds
+
+    def _send(self, params):
+        # Steps 2-4: route, wait for a slot, call and retry on transient errors
+        with span("llm.request") as current:
+            backend = None
+            for attempt in range(self.max_retries + 1):
+                backend = self._acquire_backend(exclude=backend)
+                current.set("backend", backend.base_url)
+                waited = time.perf_counter()
+                try:
+                    with backend.slots:
+                        current.add("queue_wait_s", time.perf_counter() - waited)
+                        response = backend.client.create(dict(params))
+                except TRANSIENT_ERRORS:
+                    self._release_backend(backend, failed=True)
+                    if attempt == self.max_retries:
+                        raise
+                    current.add("retries")
+                    time.sleep(random.uniform(0, self.backoff_seconds * 2 ** attempt))
+                    continue
+                except BaseException:
+                    self._release_backend(backend)
+                    raise
+                self._release_backend(backend)
+                return response
+
+    def create(self, params):
+        """
+        Send a chat completion request through the pool.
+
+        Args:
+            params (dict): Create parameters built by AutoGen's OpenAIWrapper.
+
+        Returns:
+            ChatCompletion: The response (a private copy for coalesced callers).
+        """
+        if not self.coalesce:
+            return self._send(params)
+
+        # Step 1: Join an identical request that is already in flight
+        key = hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+        with self._lock:
+            leader = self._in_flight.get(key)
+            if leader is None:
+                future = self._in_flight[key] = Future()
+            else:
+                self.coalesced += 1
+        if leader is not None:
+            response = copy.deepcopy(leader.result())
+            # The leader streamed its tokens to its own output; replay them here
+            if params.get("stream"):
+                iostream = IOStream.get_default()
+                for choice in response.choices:
+                    if choice.message.content:
+                        iostream.print(choice.message.content, end="", flush=True)
+                iostream.print()
+            return response
+
+        try:
+            response = self._send(params)
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        else:
+            future.set_result(response)
+            return response
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def stats(self):
+        """
+        Return the load counters of every backend and the coalescing count.
+        """
+        with self._lock:
+            return {
+                "coalesced": self.coalesced,
+                "backends": [
+                    {"base_url": b.base_url, "requests": b.requests, "in_flight": b.in_flight,
+                     "failures": b.failures}
+                    for b in self.backends
+                ],
+            }
+
+    def close(self):
+        """
+        Close the pooled connections.
+        """
+        self.http_client.close()
+
+
+# Process-wide pool instance, created on first use
+_llm_pool = None
+_llm_pool_guard = threading.Lock()
+
+
+def get_llm_pool():
+    """
+    Return the process-wide backend pool configured in `llm_pool_config`.
+    """
+    global _llm_pool
+    with _llm_pool_guard:
+        if _llm_pool is None:
+            _llm_pool = LLMBackendPool(**llm_pool_config)
+        return _llm_pool
+
+
+class PooledLLMClient:
+    """
+    AutoGen model client sending every completion through the shared pool.
+
+    Selected with `"model_client_cls": "PooledLLMClient"` in the LLM
+    configuration and activated per agent with `use_pooled_client`.
+    Completions are streamed inside `streaming_completions()` only. Tool
+    calls, usage and cost are handled by the OpenAI client of the backend
+    that served the request.
+    """
+
+    def __init__(self, config, pool=None, **kwargs):
+        self.config = config
+        self.pool = pool if pool is not None else get_llm_pool()
+
+    def create(self, params):
+        # The client selector is not an OpenAI create parameter
+        params = {key: value for key, value in params.items() if key != "model_client_cls"}
+        if _streaming.get():
+            params["stream"] = True
+        return self.pool.create(params)
+
+    def message_retrieval(self, response):
+        return self.pool.backends[0].client.message_retrieval(response)
+
+    def cost(self, response):
+        return self.pool.backends[0].client.cost(response)
+
+    @staticmethod
+    def get_usage(response):
+        return OpenAIClient.get_usage(response)
+
+
+def use_pooled_client(agent, pool=None):
+    """
+    Activate the pooled client on an agent whose LLM configuration selects it.
+
+    Agents without an LLM, with another client or already activated are left
+    unchanged, so this is safe to call on every agent of an orchestrator.
+
+    Args:
+        agent (ConversableAgent): The agent (or GroupChatManager).
+        pool (LLMBackendPool | None): Pool to use; default: the shared pool.
+    """
+    client = getattr(agent, "client", None)
+    if client is None:
+        return
+    if any(isinstance(entry, PlaceHolderClient) and entry.config.get("model_client_cls") == "PooledLLMClient"
+           for entry in getattr(client, "_clients", [])):
+        agent.register_model_client(PooledLLMClient, pool=pool)
@@ -4,42 +4,143 @@
 # Coordinates multiple specialized AI agents to provide comprehensive financial analysis
 # ============================================================================
 
-# Import all specialized financial advisor agents from their respective modules
-from agents.market_analysis_agent import market_analysis_agent  # Agent for market trend analysis
-from agents.risk_assessment_agent import risk_assessment_agent  # Agent for risk evaluation
-from agents.investment_strategy_agent import investment_strategy_agent  # Agent for investment recommendations
-from agents.report_generation_agent import report_generation_agent  # Agent for structured report generation
-from orchestrator.financial_advisor_orchestrator import FinancialAdvisorOrchestrator  # Orchestrator class to manage agent interactions
-
-def main():
+# Import argparse to select between the single-query, batch and service modes
+import argparse
+
+# Import json to print the batch run statistics
+import json
+
+# Import the agent registry; agents (and AutoGen) are only loaded when created
+from agents.registry import create_agents
+
+# The orchestrator, batch runner and tracing modules import AutoGen and are
+# imported inside the functions that use them, so `--help` and argument
+# errors return immediately
+
+# Watchlist whose precomputed market signals are attached to every query
+# The benchmark index is included so the signals can report beta against it
+WATCHLIST = ["^GSPC", "^NSEI", "AAPL", "MSFT", "GOOGL", "BTC-USD"]
+BENCHMARK = "^GSPC"
+
+def parse_args(argv=None):
+    """
+    Parse the command line options (`argv`, default: sys.argv[1:]).
+    
+    Modes:
+    - No options: run the predefined query once and print the conversation
+    - --report FILE: also write the report into a Markdown file (section by
+      section) or a .docx file (when the run ends)
+    - --batch FILE: run every query of a JSONL file through a pool of orchestrators
+    - --serve: accept queries over a local HTTP endpoint
+    - --trace FILE: record spans of any mode, write them as an OTLP JSON trace
+      file and print a summary table at the end
+    - --profile-startup: print how long each startup stage and each imported
+      package takes, then exit
+    """
+    parser = argparse.ArgumentParser(description="Agentic Financial Advisor")
+    parser.add_argument("--report", metavar="FILE",
+                        help="Write the report to FILE (.md section by section, .docx at the end)")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="JSONL file with one {\"id\": ..., \"query\": ...} object per line")
+    parser.add_argument("--output", default="batch_results.jsonl",
+                        help="JSONL file for batch results (default: batch_results.jsonl)")
+    parser.add_argument("--serve", action="store_true",
+                        help="Serve queries over HTTP (POST /advise, GET /stats)")
+    parser.add_argument("--host", default="127.0.0.1", help="Service host (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000, help="Service port (default: 8000)")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="Requests processed concurrently in batch/service mode (default: 4)")
+    parser.add_argument("--max-pending", type=int, default=None,
+                        help="Requests allowed to wait for a worker (default: 2 x workers)")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="Write an OTLP JSON trace to FILE and print a timing summary")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Print an import-time and agent-construction breakdown, then exit")
+    parser.add_argument("--mode", choices=["group_chat", "fanout"], default="group_chat",
+                        help="Orchestrator execution mode (default: group_chat)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """
     Main entry point for the Agentic Financial Advisor application.
-    This function:
+    
+    Parses the command line (or the given `argv` list), runs the selected mode (see `run_mode`) and, with
+    --trace, exports the recorded spans and prints a timing summary table.
+    """
+    args = parse_args(argv)
+    
+    # Startup profile: measure the startup itself instead of running a query
+    if args.profile_startup:
+        from tools.startup_profile import startup_report
+        print(startup_report())
+        return
+    
+    # Optional tracer shared by every orchestrator of this process
+    tracer = None
+    if args.trace:
+        from tools.tracing import Tracer
+        tracer = Tracer()
+    try:
+        run_mode(args, tracer)
+    finally:
+        # Export the trace and print the summary even if the run failed
+        if tracer is not None:
+            tracer.export(args.trace)
+            print("\n" + tracer.summary_table())
+            print(f"\nTrace written to {args.trace}")
+
+def run_mode(args, tracer):
+    """
+    Run the mode selected on the command line.
+    
+    In the default mode this function:
     1. Initializes all specialized financial advisor agents
     2. Creates an orchestrator to manage agent interactions
     3. Runs the financial analysis workflow with a predefined query
     4. The agents collaborate to provide comprehensive financial insights
+    
+    With --batch or --serve, queries are instead run through a pool of
+    isolated orchestrator instances (see orchestrator/batch_runner.py).
     """
-    # Step 1: Create a list of all specialized agents for financial analysis
-    # Each agent has a specific role:
-    # - market_analysis_agent: Analyzes market trends and macroeconomic conditions
-    # - risk_assessment_agent: Evaluates investment and market risks
-    # - investment_strategy_agent: Suggests appropriate investment strategies
-    # - report_generation_agent: Compiles all analysis into a structured report
-    agents = [
-        market_analysis_agent,
-        risk_assessment_agent,
-        investment_strategy_agent,
-        report_generation_agent
-    ]
+    # Batch and service modes: many requests, each on its own orchestrator
+    if args.batch or args.serve:
+        from orchestrator.batch_runner import BatchRunner, serve
+        runner = BatchRunner(
+            pool_size=args.workers,
+            max_pending=args.max_pending,
+            tickers=WATCHLIST,
+            benchmark=BENCHMARK,
+            execution_mode=args.mode,
+            tracer=tracer
+        )
+        if args.serve:
+            serve(runner, host=args.host, port=args.port)
+        else:
+            stats = runner.run_jsonl(args.batch, args.output)
+            runner.shutdown()
+            print(json.dumps(stats, indent=2))
+        return
+    
+    # Step 1: Create all specialized agents for financial analysis
+    # The registry builds them on demand, in speaking order:
+    # - MarketAnalysisAgent: Analyzes market trends and macroeconomic conditions
+    # - RiskAssessmentAgent: Evaluates investment and market risks
+    # - InvestmentStrategyAgent: Suggests appropriate investment strategies
+    # - ReportGenerationAgent: Compiles all analysis into a structured report
+    agents = create_agents()
+    from orchestrator.financial_advisor_orchestrator import FinancialAdvisorOrchestrator
 
     # Step 2: Create an orchestrator instance to manage the group chat
     # The orchestrator handles:
     # - Agent registration and initialization
-    # - Group chat setup with round-robin speaker selection
+    # - Group chat setup with code-driven speaker selection (no LLM routing)
     # - Communication coordination between agents
-    # - Maximum of 5 rounds of conversation for focused analysis
-    orchestrator = FinancialAdvisorOrchestrator(agents)
+    # - Ending the conversation as soon as the report is complete
+    # - Precomputed market signals for the watchlist attached to the query
+    orchestrator = FinancialAdvisorOrchestrator(
+        agents, tickers=WATCHLIST, benchmark=BENCHMARK, execution_mode=args.mode,
+        tracer=tracer
+    )
 
     # Step 3: Execute the financial analysis workflow
     # Send the analysis query to all agents through the orchestrator
@@ -47,10 +148,24 @@ def main():
     # - Current market scenario analysis
     # - Short-term and long-term investment suggestions
     # - Comprehensive risk analysis and assessment
-    orchestrator.run(
+    query = (
         "Analyze current market scenario and suggest "
         "short-term and long-term investments with risk analysis."
     )
+    if not args.report:
+        orchestrator.run(query)
+        return
+
+    # With --report, stream the run: tokens are printed as they arrive and
+    # every report section is reported as soon as it is complete (a Markdown
+    # file receives it right away, a .docx file is saved when the run ends)
+    for event in orchestrator.stream(query, report_path=args.report):
+        if event["type"] == "token":
+            print(event["text"], end="", flush=True)
+        elif event["type"] == "section_completed" and event["agent"] == "ReportGenerationAgent":
+            print(f"\n[Report section completed: {event['title'] or 'Introduction'}]")
+        elif event["type"] == "error":
+            print(f"\nError: {event['error']}")
 
 # Program entry point - ensures main() only runs when script is executed directly
 if __name__ == "__main__":
@@ -0,0 +1,357 @@
+# ============================================================================
+# batch_runner.py
+# Runs many client queries through a pool of isolated orchestrator instances
+# Provides a JSONL batch mode and a local HTTP service mode
+# ============================================================================
+
+# Import json for JSONL input/output and the HTTP request/response bodies
+import json
+
+# Import queue to hand out idle orchestrator instances to worker threads
+import queue
+
+# Import threading for admission control (backpressure) and shared statistics
+import threading
+
+# Import time to measure queue wait, latency and throughput
+import time
+
+# Import the thread pool that bounds how many requests run at the same time
+from concurrent.futures import ThreadPoolExecutor
+
+# Import nullcontext for runs without a tracer
+from contextlib import nullcontext
+
+# Import the HTTP server used by the service mode
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Import the agent registry so every orchestrator gets its own agents
+from agents.registry import create_agents
+
+# Import the orchestrator that runs a single request
+from orchestrator.financial_advisor_orchestrator import FinancialAdvisorOrchestrator
+
+# Import the structured payloads of the specialists for the result records
+from tools.structured_output import collect_payloads
+
+# Import span tracing to record the queue wait of every request
+from tools.tracing import span
+
+
+def create_orchestrator(**options):
+    """
+    Create an orchestrator with a fresh set of agents.
+
+    Args:
+        **options: Keyword arguments for FinancialAdvisorOrchestrator
+                   (tickers, benchmark, execution_mode, ...).
+
+    Returns:
+        FinancialAdvisorOrchestrator: An orchestrator that shares no chat
+                                      state with any other instance.
+    """
+    return FinancialAdvisorOrchestrator(create_agents(), **options)
+
+
+def final_output(result):
+    """
+    Extract the final report text from an orchestrator result.
+
+    Works for both execution modes: the per-agent dictionary of the fan-out
+    mode and the ChatResult of the group chat mode.
+    """
+    if isinstance(result, dict):
+        if "ReportGenerationAgent" in result:
+            return result["ReportGenerationAgent"]
+        return list(result.values())[-1] if result else None
+    return getattr(result, "summary", None)
+
+
+def _percentile(values, fraction):
+    # Nearest-rank percentile of an unsorted list, in rounded seconds (None when empty)
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))], 3)
+
+
+class OrchestratorPool:
+    """
+    Fixed-size pool of orchestrator instances.
+
+    Each request borrows one instance exclusively and the instance is reset
+    before use, so requests never see each other's `GroupChat.messages`.
+    Instances are created lazily, up to `size`, and reused afterwards.
+    They run silently, since many requests execute at the same time.
+
+    Attributes:
+        size (int): Maximum number of orchestrator instances
+        options (dict): Keyword arguments used to create each orchestrator
+    """
+
+    def __init__(self, size, **options):
+        self.size = size
+        self.options = options
+        self._idle = queue.Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _acquire(self):
+        # Prefer an idle instance, create a new one while below the limit,
+        # otherwise wait until another request hands one back
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                return create_orchestrator(**{**self.options, "silent": True})
+        return self._idle.get()
+
+    def run(self, query):
+        """
+        Run one query on an exclusively borrowed, freshly reset orchestrator.
+        """
+        orchestrator = self._acquire()
+        try:
+            orchestrator.reset()
+            return orchestrator.run(query)
+        finally:
+            self._idle.put(orchestrator)
+
+
+class RunStats:
+    """
+    Thread-safe latency and throughput statistics for a batch or service run.
+
+    Invalid requests (unparseable input) count as completed and failed, and
+    separately as invalid; they have no latency sample.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.completed = 0
+        self.failed = 0
+        self.invalid = 0
+        self.latencies = []
+        self.queue_waits = []
+        self._lock = threading.Lock()
+
+    def record(self, latency, queue_wait, ok):
+        with self._lock:
+            self.completed += 1
+            self.failed += 0 if ok else 1
+            self.latencies.append(latency)
+            self.queue_waits.append(queue_wait)
+
+    def record_invalid(self):
+        with self._lock:
+            self.completed += 1
+            self.failed += 1
+            self.invalid += 1
+
+    def summary(self):
+        """
+        Return the statistics as a JSON-serializable dictionary.
+        """
+        with self._lock:
+            elapsed = time.perf_counter() - self.started
+            return {
+                "completed": self.completed,
+                "failed": self.failed,
+                "invalid": self.invalid,
+                "elapsed_s": round(elapsed, 3),
+                "throughput_rps": round(self.completed / elapsed, 3) if elapsed else 0.0,
+                "latency_p50_s": _percentile(self.latencies, 0.50),
+                "latency_p95_s": _percentile(self.latencies, 0.95),
+                "latency_max_s": _percentile(self.latencies, 1.0),
+                "queue_wait_p95_s": _percentile(self.queue_waits, 0.95),
+            }
+
+
+class BatchRunner:
+    """
+    Runs many queries concurrently with bounded concurrency and backpressure.
+
+    This class:
+    - Executes at most `pool_size` requests at the same time, each on its own
+      isolated orchestrator instance
+    - Admits at most `max_pending` further requests into the queue; beyond
+      that, `submit` blocks (batch mode) or refuses the request (service mode)
+    - Records per-request queue wait and latency, plus overall throughput
+
+    Attributes:
+        pool (OrchestratorPool): Pool of isolated orchestrator instances
+        stats (RunStats): Latency and throughput statistics
+    """
+
+    def __init__(self, pool_size=4, max_pending=None, **options):
+        """
+        Initialize the runner.
+
+        Args:
+            pool_size (int): Number of requests processed concurrently.
+            max_pending (int | None): Requests allowed to wait in the queue
+                                      (default: 2 x pool_size).
+            **options: Keyword arguments for every FinancialAdvisorOrchestrator.
+        """
+        max_pending = pool_size * 2 if max_pending is None else max_pending
+        self.pool = OrchestratorPool(pool_size, **options)
+        self.tracer = options.get("tracer")
+        self.stats = RunStats()
+        self._slots = threading.BoundedSemaphore(pool_size + max_pending)
+        self._executor = ThreadPoolExecutor(max_workers=pool_size)
+
+    def submit(self, request_id, query, block=True, on_complete=None):
+        """
+        Queue a query for processing.
+
+        Args:
+            request_id: Identifier echoed back in the result record.
+            query (str): The financial analysis query.
+            block (bool): Wait for a free slot when the runner is saturated.
+            on_complete (callable | None): Called with the result record in the
+                                      worker thread, before the future resolves.
+
+        Returns:
+            Future | None: Future resolving to the result record, or None if
+                           `block` is False and the runner is saturated.
+        """
+        if not self._slots.acquire(blocking=block):
+            return None
+        enqueued = time.perf_counter()
+        future = self._executor.submit(self._process, request_id, query, enqueued, on_complete)
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _process(self, request_id, query, enqueued, on_complete):
+        # Run one request and build its result record
+        started = time.perf_counter()
+        tracing = self.tracer.activate() if self.tracer is not None else nullcontext()
+        with tracing, span("batch.request", request_id=str(request_id),
+                           queue_wait_s=started - enqueued):
+            try:
+                result = self.pool.run(query)
+                record = {"id": request_id, "status": "ok", "report": final_output(result),
+                          "analysis": collect_payloads(result)}
+            except Exception as error:
+                record = {"id": request_id, "status": "error", "error": str(error)}
+        finished = time.perf_counter()
+
+        record["queue_wait_s"] = round(started - enqueued, 3)
+        record["latency_s"] = round(finished - started, 3)
+        self.stats.record(finished - started, started - enqueued, record["status"] == "ok")
+        if on_complete is not None:
+            on_complete(record)
+        return record
+
+    def run_jsonl(self, input_path, output_path):
+        """
+        Process every query of a JSONL file and write one result line per query.
+
+        Each input line is a JSON object with a "query" field and an optional
+        "id" (the line number is used otherwise). Results are written as soon
+        as they complete, so their order may differ from the input.
+
+        Args:
+            input_path (str): JSONL file with one request per line.
+            output_path (str): JSONL file receiving one result per request.
+
+        Returns:
+            dict: Run statistics (see RunStats.summary).
+        """
+        write_lock = threading.Lock()
+        futures = []
+
+        with open(output_path, "w", encoding="utf-8") as output:
+            def write(record):
+                with write_lock:
+                    output.write(json.dumps(record) + "\n")
+                    output.flush()
+
+            with open(input_path, encoding="utf-8") as requests:
+                for line_number, line in enumerate(requests, start=1):
+                    if not line.strip():
+                        continue
+                    try:
+                        request = json.loads(line)
+                        request_id, query = request.get("id", line_number), request["query"]
+                    except (ValueError, KeyError, AttributeError) as error:
+                        self.stats.record_invalid()
+                        write({"id": line_number, "status": "error",
+                               "error": f"Invalid request: {error}"})
+                        continue
+
+                    # Blocks while the runner is saturated (backpressure)
+                    futures.append(self.submit(request_id, query, on_complete=write))
+
+            for future in futures:
+                future.result()
+
+        return self.stats.summary()
+
+    def shutdown(self):
+        """
+        Wait for running requests and stop the worker threads.
+        """
+        self._executor.shutdown(wait=True)
+
+
+def serve(runner, host="127.0.0.1", port=8000):
+    """
+    Serve the advisor over a local HTTP endpoint.
+
+    Endpoints:
+        POST /advise  Body {"query": "...", "id": optional}; returns the result record.
+                      Responds 503 with Retry-After when the runner is saturated.
+        GET  /stats   Returns the run statistics.
+
+    Args:
+        runner (BatchRunner): Runner that executes the requests.
+        host (str): Interface to bind (default: localhost only).
+        port (int): Port to listen on.
+    """
+
+    class AdvisorRequestHandler(BaseHTTPRequestHandler):
+        def _respond(self, status, payload, headers=None):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path != "/stats":
+                return self._respond(404, {"error": "Not found"})
+            self._respond(200, runner.stats.summary())
+
+        def do_POST(self):
+            if self.path != "/advise":
+                return self._respond(404, {"error": "Not found"})
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                query = request["query"]
+            except (ValueError, KeyError, TypeError) as error:
+                runner.stats.record_invalid()
+                return self._respond(400, {"error": f"Invalid request: {error}"})
+
+            # Refuse instead of queueing without bound when saturated
+            future = runner.submit(request.get("id"), query, block=False)
+            if future is None:
+                return self._respond(503, {"error": "Server busy"}, {"Retry-After": "1"})
+            self._respond(200, future.result())
+
+    server = ThreadingHTTPServer((host, port), AdvisorRequestHandler)
+    print(f"Financial advisor service listening on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        runner.shutdown()
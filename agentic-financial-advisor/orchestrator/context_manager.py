@@ -0,0 +1,247 @@
+# ============================================================================
+# context_manager.py
+# Token-budgeted context compaction for the agents of the group chat
+# Keeps prompts small as the conversation grows, so max_round can be raised
+# ============================================================================
+
+# Import json to recognise structured (JSON) payloads, which are never condensed
+import json
+
+# The compactor is registered directly as the agent's
+# "process_all_messages_before_reply" hook. AutoGen's TransformMessages
+# capability is not used: importing it creates a disk cache (.cache/42)
+# in the working directory.
+
+# Rough number of characters per token for Llama-style tokenizers
+# A cheap estimate is enough here; budgets are soft limits, not hard API limits
+CHARS_PER_TOKEN = 4
+
+# Default context settings per agent role:
+# - budget: token budget for the conversation history (system message excluded)
+# - sources: agents whose messages the role needs (None = everyone)
+# - latest_only: keep only the most recent message of every source
+# The original query (first message) is always kept verbatim
+DEFAULT_CONTEXT_POLICIES = {
+    "MarketAnalysisAgent": {
+        "budget": 1500,
+        "sources": ["UserProxy", "MarketAnalysisAgent"],
+        "latest_only": True,
+    },
+    "RiskAssessmentAgent": {
+        "budget": 1500,
+        "sources": ["UserProxy", "MarketAnalysisAgent", "RiskAssessmentAgent"],
+        "latest_only": True,
+    },
+    "InvestmentStrategyAgent": {
+        "budget": 2000,
+        "sources": ["UserProxy", "MarketAnalysisAgent", "RiskAssessmentAgent", "InvestmentStrategyAgent"],
+        "latest_only": True,
+    },
+    # The report only needs the final findings of each specialist
+    "ReportGenerationAgent": {
+        "budget": 2500,
+        "sources": ["UserProxy", "MarketAnalysisAgent", "RiskAssessmentAgent", "InvestmentStrategyAgent"],
+        "latest_only": True,
+    },
+}
+
+# Policy for agents without an entry above
+DEFAULT_POLICY = {"budget": 2000, "sources": None, "latest_only": False}
+
+# Smallest extract kept for an older message, in tokens
+MIN_EXTRACT_TOKENS = 40
+
+
+def estimate_tokens(text):
+    """
+    Estimate the number of tokens in `text` (about 4 characters per token).
+    """
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN if text else 0
+
+
+def is_structured(text):
+    """
+    Return True if `text` is a JSON payload (optionally in a ```json fence).
+
+    Structured agent replies are read back by code (`collect_payloads`,
+    the report template); a truncated payload would no longer parse.
+    """
+    body = text.strip()
+    if body.startswith("```"):
+        body = body.strip("`").strip()
+        body = (body[4:] if body.startswith("json") else body).strip()
+    if not body.startswith(("{", "[")):
+        return False
+    try:
+        json.loads(body)
+    except ValueError:
+        return False
+    return True
+
+
+def extract_key_lines(text, max_tokens):
+    """
+    Reduce a verbose message to its most informative lines within `max_tokens`.
+
+    Headings, bullet points and lines containing figures or risk tiers are picked
+    first, then other lines while the budget allows; the original order is kept.
+
+    Args:
+        text (str): The message content.
+        max_tokens (int): Token budget for the extract.
+
+    Returns:
+        str: The extract (the original text if it already fits or is a JSON
+             payload, see `is_structured`).
+    """
+    if estimate_tokens(text) <= max_tokens or is_structured(text):
+        return text
+
+    def is_key(line):
+        stripped = line.strip()
+        return (
+            stripped.startswith(("#", "-", "*", "•"))
+            or stripped[:1].isdigit()
+            or any(char.isdigit() for char in stripped)
+            or any(tier in stripped for tier in ("Low", "Medium", "High"))
+        )
+
+    lines = [line for line in text.splitlines() if line.strip()]
+    ranked = [i for i, line in enumerate(lines) if is_key(line)]
+    ranked += [i for i, line in enumerate(lines) if not is_key(line)]
+
+    # Fill the budget with key lines first, then other lines; keep original order
+    budget = max_tokens * CHARS_PER_TOKEN
+    chosen, used = set(), 0
+    for index in ranked:
+        if used + len(lines[index]) + 1 > budget:
+            continue
+        chosen.add(index)
+        used += len(lines[index]) + 1
+    if not chosen:
+        return lines[ranked[0]][:budget - 3] + "...\n[earlier output condensed]"
+    kept = [lines[index] for index in sorted(chosen)]
+    return "\n".join(kept) + "\n[earlier output condensed]"
+
+
+class ContextCompactor:
+    """
+    Message hook that fits an agent's history into a token budget.
+
+    Registered as the agent's "process_all_messages_before_reply" hook
+    (the instance is called with the history). For every reply it:
+    1. Keeps the original query (the first message) verbatim
+    2. Drops messages from agents the role does not need
+    3. Optionally keeps only the latest message per source agent
+    4. Keeps the newest messages in full while they fit the budget and
+       replaces older ones by key-line extracts
+    Tool calls and tool results are always kept verbatim, since the LLM API
+    requires them in pairs. Structured (JSON) payloads are kept verbatim too:
+    code parses them downstream, and a cut payload would no longer parse.
+
+    Attributes:
+        agent_name (str): Name of the agent the transform is attached to
+        budget (int): Token budget for the history
+        sources (list | None): Agents whose messages are forwarded (None = all)
+        latest_only (bool): Keep only the most recent message per source
+    """
+
+    def __init__(self, agent_name, budget, sources=None, latest_only=False):
+        self.agent_name = agent_name
+        self.budget = budget
+        self.sources = None if sources is None else set(sources)
+        self.latest_only = latest_only
+
+    def _source(self, message):
+        # The agent's own earlier replies carry the role "assistant"
+        if message.get("role") == "assistant" and not message.get("name"):
+            return self.agent_name
+        return message.get("name")
+
+    @staticmethod
+    def _is_tool_message(message):
+        return message.get("role") == "tool" or bool(message.get("tool_calls"))
+
+    def __call__(self, messages):
+        """
+        Hook entry point: compact the history, keeping a system message in front.
+        """
+        if messages and messages[0].get("role") == "system":
+            return messages[:1] + self.apply_transform(messages[1:])
+        return self.apply_transform(messages)
+
+    def apply_transform(self, messages):
+        """
+        Return a compacted copy of `messages` that fits the token budget.
+
+        The input messages are never modified; condensed messages are copies.
+        """
+        if not messages:
+            return messages
+        query, history = messages[0], messages[1:]
+
+        # Step 1: Forward only the sources this role needs
+        if self.sources is not None:
+            history = [
+                message for message in history
+                if self._is_tool_message(message) or self._source(message) in self.sources
+            ]
+
+        # Step 2: Keep only the latest message of every source
+        if self.latest_only:
+            seen = set()
+            latest = []
+            for message in reversed(history):
+                source = self._source(message)
+                if self._is_tool_message(message) or source not in seen:
+                    latest.append(message)
+                    seen.add(source)
+            history = latest[::-1]
+
+        # Step 3: Newest messages stay verbatim while they fit; older ones are condensed
+        # (JSON payloads never are, see `is_structured`)
+        remaining = self.budget - estimate_tokens(query.get("content") or "")
+        compacted = []
+        for message in reversed(history):
+            content = message.get("content")
+            if self._is_tool_message(message) or not isinstance(content, str):
+                compacted.append(message)
+                continue
+            tokens = estimate_tokens(content)
+            if tokens > remaining:
+                message = dict(message, content=extract_key_lines(
+                    content, max(remaining, MIN_EXTRACT_TOKENS)
+                ))
+                tokens = estimate_tokens(message["content"])
+            remaining -= tokens
+            compacted.append(message)
+        return [query] + compacted[::-1]
+
+
+def attach_context_manager(agent, policy=None):
+    """
+    Attach (or update) token-budgeted context compaction on an agent.
+
+    Agents may be shared by several orchestrators, so the compactor is
+    registered only once per agent; later calls just update its policy.
+
+    Args:
+        agent (ConversableAgent): The agent to manage.
+        policy (dict | None): {"budget", "sources", "latest_only"}; defaults to
+                              the agent's entry in DEFAULT_CONTEXT_POLICIES.
+
+    Returns:
+        ContextCompactor: The compactor attached to the agent.
+    """
+    policy = dict(DEFAULT_POLICY, **(policy or DEFAULT_CONTEXT_POLICIES.get(agent.name, {})))
+
+    compactor = getattr(agent, "context_compactor", None)
+    if compactor is None:
+        compactor = ContextCompactor(agent.name, policy["budget"])
+        agent.register_hook("process_all_messages_before_reply", compactor)
+        agent.context_compactor = compactor
+
+    compactor.budget = policy["budget"]
+    compactor.sources = None if policy["sources"] is None else set(policy["sources"])
+    compactor.latest_only = policy["latest_only"]
+    return compactor
@@ -4,6 +4,18 @@
 # Uses AutoGen's GroupChat to manage collaborative agent communication
 # ============================================================================
 
+# Import the thread pool used to run independent agents concurrently (fan-out mode)
+from concurrent.futures import ThreadPoolExecutor
+
+# Import nullcontext to leave console output untouched when not silent
+from contextlib import nullcontext
+
+# Import copy_context so fan-out workers inherit the caller's output stream
+from contextvars import copy_context
+
+# Import time to measure how long fan-out agents wait for a worker
+import time
+
 # Import GroupChat class for managing multi-agent conversations
 from autogen import GroupChat
 
@@ -14,9 +26,52 @@ from autogen import GroupChatManager
 # Acts as a user interface agent for initiating and managing queries
 from autogen import UserProxyAgent
 
+# Import IOStream, the channel AutoGen prints (and streams tokens) to
+from autogen.io.base import IOStream
+
 # Import the shared LLM configuration used across all agents
 from config.llm_config import llm_config
 
+# Import the shared completion cache used by every agent and the manager
+from config.llm_cache import get_llm_cache
+
+# Import the activation of the shared, connection-pooled LLM client
+from config.llm_pool import use_pooled_client
+
+# Import the code-driven speaker selection used instead of LLM routing
+from orchestrator.speaker_selection import default_speaker_selector
+
+# Import the token-budgeted context compaction attached to every agent
+from orchestrator.context_manager import attach_context_manager
+
+# Import the streaming API (typed events and incremental report rendering)
+from orchestrator.report_stream import (
+    ReportStream,
+    StreamIOStream,
+    attach_stream_hooks,
+    create_report_writer,
+    is_streaming,
+    notify_agent_completed,
+)
+
+# Import the span tracing used to time runs, agent replies and LLM calls
+from tools.tracing import instrument_agent, span
+
+# Execution modes supported by the orchestrator
+# - "group_chat": AutoGen GroupChat, agents speak one after another (fixed pipeline)
+# - "fanout": agents run as a dependency graph; independent agents run concurrently
+EXECUTION_MODES = ("group_chat", "fanout")
+
+# Dependencies between the specialist agents, used by the fan-out mode
+# An agent runs in the first wave after all agents it depends on have answered
+# Agents not listed here have no dependencies and start immediately
+AGENT_DEPENDENCIES = {
+    "MarketAnalysisAgent": [],
+    "RiskAssessmentAgent": [],
+    "InvestmentStrategyAgent": ["MarketAnalysisAgent", "RiskAssessmentAgent"],
+    "ReportGenerationAgent": ["MarketAnalysisAgent", "RiskAssessmentAgent", "InvestmentStrategyAgent"],
+}
+
 class FinancialAdvisorOrchestrator:
     """
     Orchestrator class that manages a collaborative group of financial advisor agents.
@@ -31,9 +86,21 @@ class FinancialAdvisorOrchestrator:
         user_proxy (UserProxyAgent): Agent representing the user in conversations
         group_chat (GroupChat): Multi-agent conversation environment
         manager (GroupChatManager): Manager for coordinating group chat interactions
+        tickers (list): Symbols whose precomputed signals are added to every query
+        period (str): History window used for the signals
+        benchmark (str | None): Ticker used as the beta benchmark
+        llm_cache (SQLiteCompletionCache): Completion cache shared by all agents
+        execution_mode (str): "group_chat" or "fanout"
+        dependencies (dict): Agent name -> names it depends on (fan-out mode)
+        silent (bool): Whether printing of the conversation is suppressed
+        max_round (int): Maximum number of group chat rounds
+        speaker_selection: Speaker-selection policy of the group chat
+        tracer (Tracer | None): Tracer recording the spans of every run
     """
 
-    def __init__(self, agents):
+    def __init__(self, agents, tickers=None, period="6mo", benchmark=None, llm_cache=None,
+                 execution_mode="group_chat", dependencies=None, silent=False,
+                 max_round=8, context_policies=None, speaker_selection=None, tracer=None):
         """
         Initialize the orchestrator with a list of agents.
         
@@ -45,14 +112,70 @@ class FinancialAdvisorOrchestrator:
         Args:
             agents (list): List of AutoGen AssistantAgent instances for financial analysis.
                           Examples: market_analysis_agent, risk_assessment_agent, etc.
+            tickers (list | None): Symbols to compute market signals for.
+                          When given, a compact indicator summary is attached to
+                          the query so agents reason over real numbers.
+            period (str): History window for the signals (default: '6mo').
+            benchmark (str | None): Ticker for beta (should also be in tickers).
+            llm_cache (SQLiteCompletionCache | None): Completion cache to share
+                          between all agents and the manager. Defaults to the
+                          process-wide cache from config/llm_cache.py.
+            execution_mode (str): "group_chat" (default) runs the pipeline
+                          GroupChat; "fanout" runs independent agents concurrently
+                          and feeds their joined output to dependent agents.
+            dependencies (dict | None): Dependency graph for the fan-out mode
+                          (default: AGENT_DEPENDENCIES).
+            silent (bool): Suppress printing the conversation (default: False).
+                          Used by the batch runner, where many requests run at once.
+            max_round (int): Upper bound on group chat rounds (default: 8). The
+                          default speaker selection ends the chat as soon as
+                          the report is complete, usually after 5 rounds.
+            context_policies (dict | bool | None): Per-agent context budgets, keyed
+                          by agent name (see orchestrator/context_manager.py).
+                          None uses DEFAULT_CONTEXT_POLICIES; False disables
+                          context compaction.
+            speaker_selection (callable | str | None): GroupChat speaker-selection
+                          method. None uses a fixed pipeline in agent order that
+                          ends once the report is complete (see
+                          orchestrator/speaker_selection.py); "auto" lets the
+                          manager's LLM pick speakers.
+            tracer (Tracer | None): Records wall time, tokens, cache hits,
+                          retries and queue wait of every run, agent reply,
+                          LLM call and market data fetch (see tools/tracing.py).
+        
+        Raises:
+            ValueError: If the execution mode is unknown.
         
         Workflow:
             - Creates UserProxyAgent that doesn't require human input
             - Combines UserProxyAgent with all provided agents
-            - Configures group chat with round-robin speaker selection
-            - Sets max conversation rounds to 5 for focused analysis
+            - Configures group chat with code-driven speaker selection
+            - Caps the conversation at max_round rounds (8 by default)
+            - Attaches token-budgeted context compaction to every agent
         """
         
+        if execution_mode not in EXECUTION_MODES:
+            raise ValueError(
+                f"Unknown execution mode {execution_mode!r}; expected one of {EXECUTION_MODES}"
+            )
+
+        # Store the market signal settings used when a query is run
+        self.tickers = list(tickers or [])
+        self.period = period
+        self.benchmark = benchmark
+
+        # Store the execution settings and the specialist agents
+        self.execution_mode = execution_mode
+        self.dependencies = AGENT_DEPENDENCIES if dependencies is None else dependencies
+        self.agents = list(agents)
+        self.silent = silent
+        self.max_round = max_round
+        self.speaker_selection = (
+            speaker_selection if speaker_selection is not None
+            else default_speaker_selector([agent.name for agent in agents])
+        )
+        self.tracer = tracer
+
         # Step 1: Create a UserProxyAgent instance
         # This agent represents the user in the group chat conversation
         # It initiates the chat and manages the overall flow
@@ -83,14 +206,14 @@ class FinancialAdvisorOrchestrator:
             messages=[],
             
             # Maximum number of conversation rounds
-            # Set to 5 to keep the conversation focused and finite
-            # After 5 rounds, the conversation will terminate
-            max_round=5,
+            # Only a safety cap: the speaker selection ends the chat once the
+            # report is complete; context compaction keeps prompts bounded
+            max_round=max_round,
             
             # Speaker selection method for agent turns
-            # "round_robin" means agents take turns in order
-            # Ensures all agents get equal opportunity to contribute
-            speaker_selection_method="round_robin"
+            # A code-driven policy: agents speak in pipeline order, tool calls
+            # go to their executor, and no LLM call is spent on routing
+            speaker_selection_method=self.speaker_selection
         )
 
         # Step 3: Create the GroupChatManager
@@ -101,10 +224,79 @@ class FinancialAdvisorOrchestrator:
             groupchat=self.group_chat,
             
             # LLM configuration for the manager
-            # Uses the same configuration as all agents for consistency
-            llm_config=llm_config
+            # Only needed when the LLM picks the speakers ("auto"); otherwise
+            # the manager never calls the LLM and gets no client at all
+            llm_config=llm_config if self.speaker_selection == "auto" else False,
+            
+            # Whether the manager prints each turn of the conversation
+            silent=silent
         )
 
+        # Step 4: Attach token-budgeted context compaction
+        # Each agent only sees the messages its role needs, and older turns
+        # are condensed, so prompt size stays flat as the chat grows
+        if context_policies is not False:
+            for agent in agents:
+                attach_context_manager(agent, (context_policies or {}).get(agent.name))
+
+        # Step 5: Attach the streaming hooks (inactive unless stream() is used)
+        for agent in agents:
+            attach_stream_hooks(agent)
+
+        # Step 6: Instrument every agent for tracing (inactive without a tracer)
+        # The manager's reply is the whole chat, so only its LLM calls are timed
+        for agent in agents:
+            instrument_agent(agent)
+        instrument_agent(self.manager, reply_spans=False)
+
+        # Step 7: Attach the shared completion cache
+        # Every agent gets a view namespaced by its name, so identical prompts
+        # from the same agent are served from cache on later runs
+        self.llm_cache = llm_cache if llm_cache is not None else get_llm_cache()
+        for agent in [self.user_proxy, self.manager] + agents:
+            agent.client_cache = self.llm_cache.for_agent(agent.name)
+
+        # Step 8: Route every LLM call through the shared client pool
+        # (keep-alive connections, bounded concurrency, coalescing, routing)
+        for agent in [self.manager] + agents:
+            use_pooled_client(agent)
+
+    def market_context(self):
+        """
+        Build the precomputed market signal block for the configured tickers.
+        
+        Fetches all tickers in one batched call, computes every indicator with
+        the vectorized engine, and renders a compact block for the prompt.
+        
+        Returns:
+            str | None: The context block, or None if no tickers are configured
+                        or no data could be fetched.
+        """
+        if not self.tickers:
+            return None
+        # Import the batched market data fetcher and the vectorized indicator
+        # engine on first use; they pull in pandas and yfinance
+        from tools.market_data_tool import fetch_market_data_many
+        from tools.indicators import compute_signals, format_signal_context
+        
+        with span("orchestrator.market_context", tickers=len(self.tickers)):
+            data, errors = fetch_market_data_many(self.tickers, period=self.period)
+            if data.empty:
+                return None
+            signals = compute_signals(data, benchmark=self.benchmark)
+            return format_signal_context(signals, period=self.period, unavailable=sorted(errors))
+
+    def reset(self):
+        """
+        Clear all conversation state so the orchestrator can serve a new request.
+        
+        Empties `GroupChat.messages` and every agent's chat history, so one
+        request can never leak into the next one handled by this instance.
+        """
+        self.group_chat.reset()
+        for agent in [self.user_proxy, self.manager] + self.agents:
+            agent.reset()
+
     def run(self, query):
         """
         Initiate and run the group chat with the given financial analysis query.
@@ -120,25 +312,176 @@ class FinancialAdvisorOrchestrator:
                         Example: "Analyze current market scenario and suggest 
                                 short-term and long-term investments with risk analysis."
         
+        Returns:
+            dict | ChatResult: In fan-out mode, the output of every agent keyed by name.
+                         In group chat mode, AutoGen's ChatResult (its `summary`
+                         is the last message, i.e. the final report).
+        
         Workflow:
-            - UserProxy initiates chat with the GroupChatManager
+            - Precomputed market signals (if tickers are configured) are appended to the query
+            - In fan-out mode the agents run as a dependency graph (see `run_fanout`)
+            - Otherwise UserProxy initiates chat with the GroupChatManager
             - Query is broadcast to all agents in the group
-            - Each agent (in round-robin order) provides their expert perspective:
+            - Each agent (in pipeline order) provides their expert perspective:
               * Market Analysis Agent analyzes market trends
               * Risk Assessment Agent evaluates risks
               * Investment Strategy Agent recommends investments
               * Report Generation Agent compiles results
-            - Conversation continues for up to 5 rounds
+            - The chat ends once the report is complete (at most max_round rounds)
             - Agents collaborate to provide comprehensive financial insights
         """
         
-        # Initiate the group chat conversation
-        # This starts the multi-agent interaction workflow
-        self.user_proxy.initiate_chat(
+        # Record the whole run as one trace when a tracer is configured
+        tracing = self.tracer.activate() if self.tracer is not None else nullcontext()
+        with tracing, span("orchestrator.run", execution_mode=self.execution_mode):
+            return self._run(query)
+
+    def _run(self, query):
+        """
+        Run the query (see `run`) inside the run's trace span.
+        """
+        # Attach the precomputed market signals so agents see real numbers
+        context = self.market_context()
+        if context:
+            query = f"{query}\n\n{context}"
+        
+        # Silent runs also discard what AutoGen prints outside the chat
+        # messages (e.g. tool execution notices)
+        output = StreamIOStream(silent=True) if self.silent and not is_streaming() else None
+        with IOStream.set_default(output) if output else nullcontext():
+            # Fan-out mode: run independent agents concurrently instead of chatting
+            if self.execution_mode == "fanout":
+                return self.run_fanout(query)
+            
+            # Initiate the group chat conversation
+            # This starts the multi-agent interaction workflow
+            return self._initiate_group_chat(query)
+
+    def _initiate_group_chat(self, query):
+        """
+        Start the group chat with the query.
+        """
+        return self.user_proxy.initiate_chat(
             # The manager that will coordinate the conversation
             self.manager,
             
             # The initial query/message to send to all agents
             # This is the financial analysis question that agents will respond to
-            message=query
+            message=query,
+            
+            # Whether to print the messages as the conversation progresses
+            silent=self.silent
         )
+
+    def run_fanout(self, query):
+        """
+        Run the agents as a dependency graph, concurrently where possible.
+        
+        This method:
+        1. Groups the agents into waves: every agent whose dependencies have
+           already answered belongs to the next wave
+        2. Runs all agents of a wave at the same time on a thread pool
+        3. Gives every agent the query plus the joined outputs of the agents it
+           depends on (e.g. the strategy agent sees the market and risk outputs)
+        4. Repeats until every agent has answered
+        
+        With the default graph, market and risk analysis run concurrently, so
+        end-to-end latency follows the critical path instead of the sum of turns.
+        
+        Args:
+            query (str): The financial analysis query (with any market context).
+        
+        Returns:
+            dict: Output of every agent keyed by agent name, in completion order.
+        
+        Raises:
+            ValueError: If the dependency graph contains a cycle.
+        """
+        names = {agent.name for agent in self.agents}
+        pending = list(self.agents)
+        outputs = {}
+        
+        with ThreadPoolExecutor(max_workers=max(1, len(self.agents))) as pool:
+            while pending:
+                # Step 1: Collect every agent whose (present) dependencies are done
+                wave = [
+                    agent for agent in pending
+                    if all(dep in outputs for dep in self.dependencies.get(agent.name, []) if dep in names)
+                ]
+                if not wave:
+                    raise ValueError(
+                        "Cyclic agent dependencies: " + ", ".join(agent.name for agent in pending)
+                    )
+                
+                # Step 2: Run the whole wave concurrently and join the results
+                # Each worker runs in a copy of the caller's context, so output
+                # settings and an active stream follow the agents into the pool
+                futures = {
+                    agent.name: pool.submit(
+                        copy_context().run, self._reply_with_dependencies, agent, query, outputs,
+                        time.perf_counter()
+                    )
+                    for agent in wave
+                }
+                for name, future in futures.items():
+                    outputs[name] = future.result()
+                    if not self.silent:
+                        print(f"\n{name}:\n{outputs[name]}\n")
+                pending = [agent for agent in pending if agent not in wave]
+        
+        return outputs
+
+    def _reply_with_dependencies(self, agent, query, outputs, submitted):
+        """
+        Generate one agent's reply from the query and its dependencies' outputs.
+        """
+        # The span records how long the agent waited for a free worker
+        with span("fanout.task", agent=agent.name, queue_wait_s=time.perf_counter() - submitted):
+            # Earlier outputs are passed like group chat messages from those agents
+            messages = [{"role": "user", "name": self.user_proxy.name, "content": query}]
+            for dep in self.dependencies.get(agent.name, []):
+                if dep in outputs:
+                    messages.append({"role": "user", "name": dep, "content": outputs[dep]})
+            
+            reply = agent.generate_reply(messages=messages, sender=self.user_proxy)
+            content = reply.get("content") if isinstance(reply, dict) else reply
+            notify_agent_completed(agent.name, content)
+            return content
+
+    def stream(self, query, report_path=None):
+        """
+        Run the query and yield typed events while the agents work.
+        
+        This method:
+        1. Runs the conversation (either execution mode) in the background
+        2. Yields events as they happen (see orchestrator/report_stream.py):
+           agent_started, token, section_completed, agent_completed, and
+           finally final_report (or error)
+        3. Writes the report agent's sections to `report_path`: Markdown as
+           soon as each section is complete, .docx (Word) when the run ends
+        
+        Completions are streamed for this run only (other runs get plain
+        completions), through the pooled LLM client; cached, fast-path and
+        template replies arrive as complete sections instead.
+        
+        Args:
+            query (str): The financial analysis query.
+            report_path (str | None): File receiving the report (.md or .docx).
+        
+        Yields:
+            dict: Stream events with "type" and "agent" keys.
+        
+        Example:
+            >>> for event in orchestrator.stream(query, report_path="report.md"):
+            ...     if event["type"] == "section_completed":
+            ...         print(event["agent"], event["title"])
+        """
+        writers = [create_report_writer(report_path)] if report_path else []
+        return ReportStream(writers, silent=self.silent).events(self.run, query)
+
+    def astream(self, query, report_path=None):
+        """
+        Async iterator version of `stream`, for asyncio based servers.
+        """
+        writers = [create_report_writer(report_path)] if report_path else []
+        return ReportStream(writers, silent=self.silent).aevents(self.run, query)
@@ -0,0 +1,420 @@
+# ============================================================================
+# report_stream.py
+# Streaming API for the financial advisor: typed events while agents work
+# Splits agent output into sections and renders the report section by section
+# ============================================================================
+
+# Import asyncio to offer the event stream as an async iterator as well
+import asyncio
+
+# Import queue to hand events from the worker thread to the consumer
+import queue
+
+# Import re to strip the terminal color codes AutoGen adds around streamed tokens
+import re
+
+# Import threading to run the conversation in the background and guard shared state
+import threading
+
+# Import ContextVar so the active stream follows the conversation into every
+# thread that runs agents (the fan-out mode copies the context into its workers)
+from contextvars import ContextVar
+
+# Import Agent to register the streaming reply function for every sender
+from autogen import Agent
+
+# Import IOStream, the output channel AutoGen prints streamed tokens to
+from autogen.io.base import IOStream
+from autogen.io.console import IOConsole
+
+# Import the switch that streams the pooled client's completions for one run
+from config.llm_pool import streaming_completions
+
+# ============================================================================
+# Event types
+# Every event is a JSON-friendly dictionary with a "type" and an "agent" key
+# ============================================================================
+
+# An agent starts generating its reply
+AGENT_STARTED = "agent_started"
+
+# A chunk of text streamed by the LLM ("text" key)
+TOKEN = "token"
+
+# A section of an agent's output is complete ("title", "level", "content" keys)
+SECTION_COMPLETED = "section_completed"
+
+# An agent has finished its reply ("content" key)
+AGENT_COMPLETED = "agent_completed"
+
+# The conversation is over ("content" = final report, "result" = run() result)
+FINAL_REPORT = "final_report"
+
+# The conversation failed ("error" key)
+ERROR = "error"
+
+# Name of the agent whose sections are rendered into the report files
+REPORT_AGENT = "ReportGenerationAgent"
+
+# Stream of the conversation currently running in this context (None = not streaming)
+_active_stream = ContextVar("active_report_stream", default=None)
+
+# Agent currently generating a reply in this context, used to attribute tokens
+_current_agent = ContextVar("current_stream_agent", default=None)
+
+# Terminal color codes printed around streamed completions
+_ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;]*m")
+
+# Markdown headings ("## Risk Analysis") and bold title lines ("**Conclusion**")
+_HEADING = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+_BOLD_HEADING = re.compile(r"^\*\*([^*]+?)\*\*:?\s*$")
+
+# Marker placed on the queue once the conversation is over
+_DONE = object()
+
+
+def make_event(event_type, agent=None, **data):
+    """
+    Build a stream event.
+
+    Args:
+        event_type (str): One of the event type constants of this module.
+        agent (str | None): Name of the agent the event belongs to.
+        **data: Event specific fields.
+
+    Returns:
+        dict: {"type": event_type, "agent": agent, **data}
+    """
+    return dict({"type": event_type, "agent": agent}, **data)
+
+
+def parse_heading(line):
+    """
+    Return (level, title) if `line` is a section heading, otherwise None.
+    """
+    stripped = line.strip()
+    match = _HEADING.match(stripped)
+    if match:
+        return len(match.group(1)), match.group(2).strip("* ")
+    match = _BOLD_HEADING.match(stripped)
+    if match:
+        return 2, match.group(1).strip()
+    return None
+
+
+def is_streaming():
+    """
+    Return True when the calling code runs inside `ReportStream.events`.
+    """
+    return _active_stream.get() is not None
+
+
+class SectionSplitter:
+    """
+    Splits one agent's text into sections while it arrives chunk by chunk.
+
+    Only the current partial line and the current section are buffered; every
+    section is handed to `on_section` as soon as the next heading starts.
+    """
+
+    def __init__(self, on_section):
+        self.on_section = on_section
+        self.received = False
+        self._partial = ""
+        self._title = None
+        self._level = 1
+        self._lines = []
+
+    def feed(self, text):
+        """
+        Add a chunk of text; complete lines are assigned to sections.
+        """
+        self.received = True
+        lines = (self._partial + text).split("\n")
+        self._partial = lines.pop()
+        for line in lines:
+            self._add_line(line)
+
+    def finish(self):
+        """
+        Flush the partial line and emit the last section.
+        """
+        if self._partial:
+            self._add_line(self._partial)
+            self._partial = ""
+        self._emit()
+
+    def _add_line(self, line):
+        heading = parse_heading(line)
+        if heading is None:
+            self._lines.append(line)
+            return
+        self._emit()
+        self._level, self._title = heading
+
+    def _emit(self):
+        # Emit the buffered section unless it is completely empty
+        content = "\n".join(self._lines).strip()
+        if content or self._title:
+            self.on_section(self._title, self._level, content)
+        self._title, self._level, self._lines = None, 1, []
+
+
+class MarkdownReportWriter:
+    """
+    Appends report sections to a Markdown file as they complete.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "w", encoding="utf-8")
+
+    def write_section(self, title, level, content):
+        if title:
+            self._file.write(f"{'#' * level} {title}\n\n")
+        if content:
+            self._file.write(f"{content}\n\n")
+        # Flush so readers of the file see every completed section right away
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class DocxReportWriter:
+    """
+    Collects report sections into a Word document, written when the stream ends.
+
+    Unlike the Markdown writer, this one does not stream. python-docx keeps
+    the whole document in memory and can only write complete files. The
+    document is therefore saved once, by `close`. Requires the optional
+    `python-docx` package.
+    """
+
+    def __init__(self, path, title="Investment Report"):
+        try:
+            import docx
+        except ImportError as error:
+            raise ImportError(
+                "DOCX output requires python-docx: pip install python-docx"
+            ) from error
+        self.path = path
+        self.document = docx.Document()
+        self.document.add_heading(title, level=0)
+
+    def write_section(self, title, level, content):
+        if title:
+            self.document.add_heading(title, level=min(level, 9))
+        for line in content.splitlines():
+            stripped = line.strip()
+            if not stripped:
+                continue
+            # Markdown bullets become Word bullet points
+            if stripped.startswith(("- ", "* ", "• ")):
+                self.document.add_paragraph(stripped[2:].strip(), style="List Bullet")
+            else:
+                self.document.add_paragraph(stripped)
+
+    def close(self):
+        self.document.save(self.path)
+
+
+def create_report_writer(path):
+    """
+    Create the writer matching the file extension (.docx, otherwise Markdown).
+    """
+    if path.lower().endswith(".docx"):
+        return DocxReportWriter(path)
+    return MarkdownReportWriter(path)
+
+
+class StreamIOStream:
+    """
+    AutoGen IOStream that turns streamed LLM tokens into stream events.
+
+    AutoGen prints every streamed chunk with `end=""` and `flush=True`; those
+    chunks are forwarded to the active stream, attributed to the agent that is
+    currently replying. Everything else is printed to the console unless the
+    stream is silent. Without an active stream it simply discards (silent) or
+    prints all output, which lets silent orchestrators suppress streamed tokens.
+    """
+
+    def __init__(self, stream=None, silent=True):
+        self.stream = stream
+        self.silent = silent
+        self._console = IOConsole()
+
+    def print(self, *objects, sep=" ", end="\n", flush=False):
+        if end == "" and flush and self.stream is not None:
+            text = _ANSI_ESCAPE.sub("", sep.join(str(item) for item in objects))
+            if text:
+                self.stream.token(_current_agent.get(), text)
+            return
+        if not self.silent:
+            self._console.print(*objects, sep=sep, end=end, flush=flush)
+
+    def input(self, prompt="", *, password=False):
+        # The advisor never asks for human input (human_input_mode="NEVER")
+        return ""
+
+
+def _agent_started_reply(recipient, messages=None, sender=None, config=None):
+    # Reply function registered first on every agent: announces the agent and
+    # lets the actual reply functions run
+    stream = _active_stream.get()
+    if stream is not None:
+        _current_agent.set(recipient.name)
+        stream.agent_started(recipient.name)
+    return False, None
+
+
+def _agent_completed_hook(sender, message, recipient, silent):
+    # Hook on every message an agent sends (group chat mode)
+    notify_agent_completed(sender.name, message)
+    return message
+
+
+def attach_stream_hooks(agent):
+    """
+    Register the streaming reply function and send hook on an agent (once).
+
+    The hooks do nothing unless a `ReportStream` is active in the calling
+    context, so they are safe on agents shared by several orchestrators.
+    """
+    if getattr(agent, "stream_hooks_attached", False):
+        return
+    agent.register_reply(trigger=[Agent, None], reply_func=_agent_started_reply, position=0)
+    agent.register_hook("process_message_before_send", _agent_completed_hook)
+    agent.stream_hooks_attached = True
+
+
+def notify_agent_completed(agent_name, message):
+    """
+    Report an agent's finished reply to the active stream (no-op otherwise).
+    """
+    stream = _active_stream.get()
+    if stream is None:
+        return
+    content = message.get("content") if isinstance(message, dict) else message
+    stream.agent_completed(agent_name, content if isinstance(content, str) else "")
+
+
+class ReportStream:
+    """
+    Runs one conversation in the background and yields its events.
+
+    This class:
+    1. Runs the conversation on a worker thread with streaming completions
+       and a `StreamIOStream`, so streamed LLM tokens become TOKEN events
+    2. Splits every agent's output into sections (Markdown headings) and emits
+       SECTION_COMPLETED as soon as a section is done
+    3. Hands the sections of the report agent to the report writers right
+       away (Markdown is written section by section, DOCX when the stream ends)
+    4. Ends with a FINAL_REPORT event (or an ERROR event)
+
+    Attributes:
+        writers (list): Report writers receiving the report agent's sections
+        report_agent (str): Name of the agent whose sections are rendered
+    """
+
+    def __init__(self, writers=None, report_agent=REPORT_AGENT, silent=True):
+        self.writers = list(writers or [])
+        self.report_agent = report_agent
+        self.silent = silent
+        self._queue = queue.Queue()
+        self._splitters = {}
+        self._outputs = {}
+        self._last_agent = None
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Callbacks from the conversation (worker threads)
+    # ------------------------------------------------------------------
+
+    def agent_started(self, agent_name):
+        with self._lock:
+            # A new turn of the same agent starts with fresh sections
+            self._splitters[agent_name] = self._new_splitter(agent_name)
+        self._queue.put(make_event(AGENT_STARTED, agent_name))
+
+    def token(self, agent_name, text):
+        self._queue.put(make_event(TOKEN, agent_name, text=text))
+        with self._lock:
+            splitter = self._splitters.setdefault(agent_name, self._new_splitter(agent_name))
+            splitter.feed(text)
+
+    def agent_completed(self, agent_name, content):
+        with self._lock:
+            splitter = self._splitters.pop(agent_name, None) or self._new_splitter(agent_name)
+            # Replies that were not streamed (cache hits, fast paths) are split now
+            if not splitter.received:
+                splitter.feed(content)
+            splitter.finish()
+            self._outputs[agent_name] = content
+            self._last_agent = agent_name
+        self._queue.put(make_event(AGENT_COMPLETED, agent_name, content=content))
+
+    def _new_splitter(self, agent_name):
+        def on_section(title, level, content):
+            self._queue.put(make_event(
+                SECTION_COMPLETED, agent_name, title=title, level=level, content=content
+            ))
+            if agent_name == self.report_agent:
+                for writer in self.writers:
+                    writer.write_section(title, level, content)
+        return SectionSplitter(on_section)
+
+    # ------------------------------------------------------------------
+    # Consumer side
+    # ------------------------------------------------------------------
+
+    def events(self, run, query):
+        """
+        Run `run(query)` in the background and yield its events as they occur.
+
+        Args:
+            run (callable): Function running the conversation (e.g. orchestrator.run).
+            query (str): The financial analysis query.
+
+        Yields:
+            dict: Stream events (see the event type constants).
+        """
+        worker = threading.Thread(target=self._work, args=(run, query), daemon=True)
+        worker.start()
+        try:
+            while True:
+                event = self._queue.get()
+                if event is _DONE:
+                    break
+                yield event
+        finally:
+            worker.join()
+            for writer in self.writers:
+                writer.close()
+
+    async def aevents(self, run, query):
+        """
+        Async iterator version of `events`, for asyncio based servers.
+        """
+        loop = asyncio.get_running_loop()
+        events = self.events(run, query)
+        while True:
+            event = await loop.run_in_executor(None, next, events, _DONE)
+            if event is _DONE:
+                break
+            yield event
+
+    def _work(self, run, query):
+        # Worker thread: run the conversation with this stream active
+        _active_stream.set(self)
+        try:
+            with IOStream.set_default(StreamIOStream(self, silent=self.silent)), streaming_completions():
+                result = run(query)
+            agent = self.report_agent if self.report_agent in self._outputs else self._last_agent
+            self._queue.put(make_event(
+                FINAL_REPORT, agent, content=self._outputs.get(agent), result=result
+            ))
+        except Exception as error:
+            self._queue.put(make_event(ERROR, error=str(error)))
+        finally:
+            self._queue.put(_DONE)
@@ -0,0 +1,174 @@
+# ============================================================================
+# speaker_selection.py
+# Code-driven speaker selection for the group chat (no LLM routing calls)
+# Fixed pipelines and state machines that end the chat once the work is done
+# ============================================================================
+
+# Import the heading parser so reports are split into sections like the stream does
+from orchestrator.report_stream import parse_heading
+
+# Speaking order of the specialist agents in the default pipeline
+DEFAULT_PIPELINE = (
+    "MarketAnalysisAgent",
+    "RiskAssessmentAgent",
+    "InvestmentStrategyAgent",
+    "ReportGenerationAgent",
+)
+
+# Agent whose complete report ends the conversation
+REPORT_AGENT = "ReportGenerationAgent"
+
+# Topics a complete report has a section heading for (matched case-insensitively
+# within the heading titles), following the report agent's system message
+REPORT_SECTIONS = ("market", "risk", "strateg", "conclusion")
+
+
+def is_complete_report(message, sections=REPORT_SECTIONS, agent=REPORT_AGENT):
+    """
+    Return True if the message is the report agent's report with every section.
+
+    Only the report agent's messages count: an advisor mentioning "market",
+    "risk" or "conclusion" in its analysis must not end the chat. A section
+    counts once a heading (Markdown `#` or a `**Bold**` line, as in the report
+    stream) has its topic in the title, so "## Risk Analysis" covers "risk"
+    but a sentence about risk in another section does not.
+
+    Args:
+        message (dict): A group chat message.
+        sections (tuple): Lower-case topics that each need a heading.
+        agent (str): Name of the agent writing the report.
+
+    Returns:
+        bool: True for a complete report
+    """
+    if message.get("name") != agent:
+        return False
+    content = message.get("content")
+    if not isinstance(content, str):
+        return False
+    titles = [heading[1].lower() for heading in map(parse_heading, content.splitlines()) if heading]
+    return all(any(section in title for title in titles) for section in sections)
+
+
+class SpeakerSelector:
+    """
+    Base class of the callable speaker-selection policies.
+
+    An instance is passed as `speaker_selection_method` of AutoGen's
+    GroupChat, which calls it with (last_speaker, groupchat) before every
+    turn. Returning None ends the conversation.
+
+    Before asking the policy (`next_speaker`), every selector:
+    1. Routes a message with tool calls to an agent that can execute them
+    2. Hands tool results back to the agent that requested them
+    """
+
+    def __call__(self, last_speaker, groupchat):
+        messages = groupchat.messages
+        message = messages[-1] if messages else {}
+
+        # Step 1: Tool calls go to an agent that registered the functions
+        calls = message.get("tool_calls") or []
+        names = [call["function"]["name"] for call in calls]
+        if message.get("function_call"):
+            names.append(message["function_call"]["name"])
+        if names:
+            for agent in groupchat.agents:
+                if agent.can_execute_function(names):
+                    return agent
+
+        # Step 2: Tool results go back to the agent that made the call
+        if message.get("tool_responses") or message.get("role") in ("tool", "function"):
+            if len(messages) > 1:
+                caller = groupchat.agent_by_name(messages[-2].get("name"))
+                if caller is not None:
+                    return caller
+
+        # Step 3: The policy picks the next agent, or ends the chat
+        name = self.next_speaker(last_speaker, message, groupchat)
+        return groupchat.agent_by_name(name) if name else None
+
+    def next_speaker(self, last_speaker, message, groupchat):
+        """
+        Return the name of the next speaker, or None to end the conversation.
+        """
+        raise NotImplementedError
+
+
+class StateMachineSelector(SpeakerSelector):
+    """
+    Speaker selection as a state machine over agent names.
+
+    Attributes:
+        transitions (dict): Agent name -> next agent name, None (end), or a
+                            callable(message, groupchat) returning either
+        start (str): Agent answering the initial message (sent by an agent
+                     without a transition, e.g. UserProxy)
+
+    Example:
+        >>> selector = StateMachineSelector(
+        ...     {"MarketAnalysisAgent": "ReportGenerationAgent",
+        ...      "ReportGenerationAgent": None},
+        ...     start="MarketAnalysisAgent")
+    """
+
+    def __init__(self, transitions, start):
+        self.transitions = dict(transitions)
+        self.start = start
+
+    def next_speaker(self, last_speaker, message, groupchat):
+        if last_speaker.name not in self.transitions:
+            # Only the initial message leads into the machine; anyone else
+            # speaking out of turn ends the conversation
+            return self.start if len(groupchat.messages) == 1 else None
+        target = self.transitions[last_speaker.name]
+        return target(message, groupchat) if callable(target) else target
+
+
+class PipelineSelector(StateMachineSelector):
+    """
+    Fixed speaking order that ends once the last stage has produced its output.
+
+    Every agent speaks once, in `order`. After the last stage, `is_done`
+    decides whether the work is complete; if not, the last stage gets up to
+    `retries` more turns (still bounded by the group chat's max_round).
+
+    Attributes:
+        order (list): Agent names in speaking order
+        is_done (callable | None): message -> bool for the last stage's
+                                   output (None = done after one turn)
+        retries (int): Extra turns for the last stage when not done
+    """
+
+    def __init__(self, order=DEFAULT_PIPELINE, is_done=None, retries=1):
+        self.order = list(order)
+        self.is_done = is_done
+        self.retries = retries
+        transitions = dict(zip(self.order, self.order[1:]))
+        transitions[self.order[-1]] = self._after_last_stage
+        super().__init__(transitions, start=self.order[0])
+
+    def _after_last_stage(self, message, groupchat):
+        # End the chat once the output is complete or the retries are used up
+        if self.is_done is None or self.is_done(message):
+            return None
+        last = self.order[-1]
+        turns = sum(1 for entry in groupchat.messages if entry.get("name") == last)
+        return last if turns <= self.retries else None
+
+
+def default_speaker_selector(agent_names):
+    """
+    Build the default policy for the given specialist agents.
+
+    The agents speak once each, in the given order; when the report agent
+    speaks last, the chat ends as soon as its report is complete.
+
+    Args:
+        agent_names (list): Names of the specialist agents, in speaking order.
+
+    Returns:
+        PipelineSelector: The speaker-selection policy.
+    """
+    is_done = is_complete_report if agent_names and agent_names[-1] == REPORT_AGENT else None
+    return PipelineSelector(agent_names, is_done=is_done)
@@ -0,0 +1,28 @@
+# ============================================================================
+# test_batch_runner.py
+# Invalid JSONL requests are reported and counted as failures
+# ============================================================================
+
+# Import json to write the input file and read the result records
+import json
+
+# Import the batch runner under test
+from orchestrator.batch_runner import BatchRunner
+
+
+def test_invalid_lines_are_counted_as_failures(tmp_path):
+    input_path, output_path = tmp_path / "requests.jsonl", tmp_path / "results.jsonl"
+    input_path.write_text('not json\n\n{"id": "a"}\n["query"]\n', encoding="utf-8")
+
+    runner = BatchRunner(pool_size=1)
+    try:
+        summary = runner.run_jsonl(str(input_path), str(output_path))
+    finally:
+        runner.shutdown()
+
+    records = [json.loads(line) for line in output_path.read_text(encoding="utf-8").splitlines()]
+    assert [record["id"] for record in records] == [1, 3, 4]
+    assert all(record["status"] == "error" for record in records)
+    assert (summary["completed"], summary["failed"], summary["invalid"]) == (3, 3, 3)
+    # Invalid lines never ran, so they add no latency samples
+    assert runner.stats.latencies == []
@@ -0,0 +1,46 @@
+# ============================================================================
+# test_context_manager.py
+# Context compaction condenses prose but never cuts structured payloads
+# ============================================================================
+
+# Import json to build and read back a large structured payload
+import json
+
+# Import the compactor under test
+from orchestrator.context_manager import ContextCompactor, estimate_tokens, extract_key_lines
+
+
+def risk_payload(assets=300):
+    # A compact risk payload for a large universe, as the tool loop returns it
+    return json.dumps({
+        "overall": "Medium",
+        "summary": "Deterministic scorer, mean score 0.50.",
+        "assets": [{"ticker": f"T{i:03d}", "tier": "Medium", "score": 0.5,
+                    "reason": "vol 24.4%, max DD -26.7%, VaR95 3.3%"} for i in range(assets)],
+    }, separators=(",", ":"))
+
+
+def test_over_budget_json_payload_is_kept_verbatim():
+    payload = risk_payload()
+    messages = [
+        {"role": "user", "name": "UserProxy", "content": "Assess the risk"},
+        {"role": "user", "name": "RiskAssessmentAgent", "content": payload},
+    ]
+    compactor = ContextCompactor("ReportGenerationAgent", budget=200)
+
+    compacted = compactor.apply_transform(messages)
+
+    assert estimate_tokens(payload) > 200
+    assert compacted[1]["content"] == payload
+    assert len(json.loads(compacted[1]["content"])["assets"]) == 300
+
+
+def test_fenced_payload_is_kept_and_prose_is_condensed():
+    fenced = "```json\n" + risk_payload() + "\n```"
+    assert extract_key_lines(fenced, 50) == fenced
+
+    prose = "\n".join(["# Outlook"] + [f"Line {i} about the market." for i in range(200)]
+                      + ["Plain words without figures."] * 50)
+    extract = extract_key_lines(prose, 50)
+    assert estimate_tokens(extract) <= 60
+    assert extract.endswith("[earlier output condensed]")
@@ -0,0 +1,81 @@
+# ============================================================================
+# test_indicators.py
+# Signals and returns must not depend on the other exchanges in the watchlist
+# ============================================================================
+
+# Import numpy and pandas to build synthetic bars in exchange timezones
+import numpy as np
+import pandas as pd
+
+# Import pytest for approximate comparisons
+import pytest
+
+# Import the indicator engine, the date alignment and the return matrix under test
+from tools.indicators import compute_signals
+from tools.market_data_tool import align_frames
+from tools.portfolio_optimizer import return_matrix
+
+# Exchange timezone and calendar of every synthetic ticker, like yfinance
+# returns them: daily bars at local midnight
+EXCHANGES = {
+    "AAPL": ("America/New_York", "B"),
+    "^GSPC": ("America/New_York", "B"),
+    "^NSEI": ("Asia/Kolkata", "B"),
+    "BTC-USD": ("UTC", "D"),
+}
+
+
+def bars(ticker, periods=180, seed=0):
+    timezone, freq = EXCHANGES[ticker]
+    rng = np.random.default_rng([seed, len(ticker), ord(ticker[-1])])
+    index = pd.date_range("2024-01-01", periods=periods, freq=freq, tz=timezone)
+    close = 100.0 * np.cumprod(1.0 + rng.normal(0.0, 0.02, periods))
+    volume = rng.integers(1_000, 10_000, periods).astype(np.float64)
+    return pd.DataFrame({"Close": close, "Volume": volume}, index=index)
+
+
+def watchlist():
+    return {ticker: bars(ticker) for ticker in EXCHANGES}
+
+
+def test_same_trading_day_shares_one_row():
+    aligned = align_frames(watchlist())
+    # Kolkata's local midnight is the previous day in UTC; it must still
+    # line up with New York's bar of the same date
+    closes = aligned.xs("Close", axis=1, level=1)
+    assert closes.index.tz is None
+    assert closes.loc[pd.Timestamp("2024-01-02"), ["AAPL", "^NSEI", "BTC-USD"]].notna().all()
+    # Weekends only have the crypto bar
+    assert closes.loc[pd.Timestamp("2024-01-06")].notna().tolist() == [False, False, False, True]
+
+
+def test_signals_do_not_depend_on_the_other_tickers():
+    frames = watchlist()
+    alone = compute_signals({"AAPL": frames["AAPL"]})["AAPL"]
+    mixed = compute_signals(frames, benchmark="^GSPC")["AAPL"]
+
+    for name, value in alone.items():
+        assert mixed[name] == pytest.approx(value), name
+    # AAPL and ^GSPC share the calendar, so beta pairs every return
+    assert mixed["beta"] is not None
+
+
+def test_bulk_and_per_ticker_inputs_agree():
+    frames = watchlist()
+    assert compute_signals(align_frames(frames)) == compute_signals(frames)
+
+
+def test_return_matrix_has_no_filled_zero_returns():
+    frames = watchlist()
+    tickers, returns = return_matrix(frames)
+
+    assert tickers == list(EXCHANGES)
+    assert not np.isnan(returns).any()
+    assert (returns != 0.0).all()
+    # One return between every two consecutive common trading dates
+    common = frames["AAPL"].index.tz_localize(None)
+    common = common[common <= frames["BTC-USD"].index[-1].tz_localize(None)]
+    assert returns.shape == (len(common) - 1, len(tickers))
+    # The business days are all common, so AAPL's returns are its own
+    expected = frames["AAPL"]["Close"].pct_change().to_numpy()[1:len(common)]
+    np.testing.assert_allclose(returns[:, 0], expected)
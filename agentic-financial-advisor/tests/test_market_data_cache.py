@@ -0,0 +1,80 @@
+# ============================================================================
+# test_market_data_cache.py
+# Offline checks of the OHLCV cache refresh rules with a fake provider
+# ============================================================================
+
+# Import numpy and pandas to build the fake bars and compare results
+import numpy as np
+import pandas as pd
+
+# Import the cache under test and the provider interface it is built on
+from tools.market_data_cache import MarketDataProvider, OHLCVCache, period_start
+
+# Exchange timezone of the fake bars, as returned by yfinance history()
+TIMEZONE = "America/New_York"
+
+
+class FakeProvider(MarketDataProvider):
+    """
+    Daily bars up to today; the price of a bar depends on its date, plus
+    `version` so a refetch can be told apart from the stored bars.
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.version = 0
+
+    def fetch(self, ticker, interval="1d", period=None, start=None):
+        self.calls.append(("tail", start) if start is not None else ("full", period))
+        begin = pd.Timestamp(start) if start is not None else period_start(period)
+        index = pd.date_range(
+            begin.tz_convert(TIMEZONE).normalize(),
+            pd.Timestamp.now(tz=TIMEZONE).normalize(),
+            freq="D",
+        )
+        close = index.dayofyear.to_numpy(dtype=np.float64) + 100.0 + self.version
+        return pd.DataFrame({"Close": close, "Volume": np.full(len(index), 1000.0)}, index=index)
+
+
+def test_fresh_entry_is_served_from_disk(tmp_path):
+    provider = FakeProvider()
+    cache = OHLCVCache(provider, cache_dir=str(tmp_path))
+
+    first = cache.get("AAPL", period="1mo")
+    second = cache.get("AAPL", period="1mo")
+
+    assert provider.calls == [("full", "1mo")]
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert str(second.index.tz) == TIMEZONE
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_stale_entry_fetches_only_the_tail(tmp_path):
+    provider = FakeProvider()
+    OHLCVCache(provider, cache_dir=str(tmp_path)).get("AAPL", period="1mo")
+    stored = OHLCVCache(provider, cache_dir=str(tmp_path)).lookup("AAPL", period="1mo")
+
+    # A negative TTL makes every stored entry stale
+    provider.version = 1
+    stale = OHLCVCache(provider, cache_dir=str(tmp_path), ttl_seconds={"1d": -1})
+    data = stale.get("AAPL", period="1mo")
+
+    # The tail starts at the last stored bar, which is replaced, not duplicated
+    assert provider.calls[-1] == ("tail", stored.index[-1])
+    assert data.index.is_unique and data.index.is_monotonic_increasing
+    assert data.index.equals(stored.index)
+    assert data["Close"].iloc[-1] == stored["Close"].iloc[-1] + 1
+    np.testing.assert_array_equal(data["Close"].to_numpy()[:-1], stored["Close"].to_numpy()[:-1])
+
+
+def test_longer_period_refetches_the_whole_entry(tmp_path):
+    provider = FakeProvider()
+    cache = OHLCVCache(provider, cache_dir=str(tmp_path))
+    short = cache.get("AAPL", period="1mo")
+    longer = cache.get("AAPL", period="1y")
+
+    assert provider.calls == [("full", "1mo"), ("full", "1y")]
+    assert len(longer) > len(short)
+    # The longer entry also covers the shorter period from then on
+    cache.get("AAPL", period="1mo")
+    assert len(provider.calls) == 2
@@ -0,0 +1,118 @@
+# ============================================================================
+# test_portfolio_optimizer.py
+# Allocations sum to 1, stay long-only and match small known solutions
+# ============================================================================
+
+# Import numpy to build covariance matrices and check the solutions
+import numpy as np
+
+# Import pytest for approximate comparisons
+import pytest
+
+# Import the optimizers under test
+from tools.portfolio_optimizer import (
+    efficient_frontier,
+    max_sharpe_weights,
+    mean_variance_weights,
+    min_variance_weights,
+    portfolio_stats,
+    risk_parity_weights,
+    shrinkage_covariance,
+)
+
+# Three correlated assets (annualized): volatilities 10%, 20%, 30%
+VOLATILITIES = np.array([0.10, 0.20, 0.30])
+CORRELATION = np.array([[1.0, 0.3, 0.1], [0.3, 1.0, 0.5], [0.1, 0.5, 1.0]])
+COV = CORRELATION * np.outer(VOLATILITIES, VOLATILITIES)
+MU = np.array([0.04, 0.08, 0.11])
+
+
+def assert_long_only(weights):
+    assert weights.sum() == pytest.approx(1.0)
+    assert np.all(weights >= -1e-12)
+
+
+def test_shrinkage_matches_the_ledoit_wolf_formula():
+    rng = np.random.default_rng(0)
+    returns = rng.normal(0.0, 0.01, (40, 6)) + rng.normal(0.0, 0.01, (40, 1))
+    cov, shrinkage = shrinkage_covariance(returns)
+
+    # Reference: the (T, N, N) tensor form of Ledoit & Wolf (2004)
+    periods, assets = returns.shape
+    centered = returns - returns.mean(axis=0)
+    sample = centered.T @ centered / periods
+    target = np.trace(sample) / assets * np.eye(assets)
+    outer = np.einsum("ti,tj->tij", centered, centered)
+    spread = np.sum((outer - sample) ** 2) / periods ** 2 / assets
+    distance = np.sum((sample - target) ** 2) / assets
+    expected = min(spread, distance) / distance
+
+    assert shrinkage == pytest.approx(expected)
+    np.testing.assert_allclose(cov, expected * target + (1 - expected) * sample)
+    assert np.all(np.linalg.eigvalsh(cov) > 0)
+
+
+def test_min_variance_of_uncorrelated_assets_is_inverse_variance():
+    cov = np.diag(VOLATILITIES ** 2)
+    expected = (1 / VOLATILITIES ** 2) / np.sum(1 / VOLATILITIES ** 2)
+
+    np.testing.assert_allclose(min_variance_weights(cov, long_only=False), expected)
+    np.testing.assert_allclose(min_variance_weights(cov), expected, atol=1e-6)
+
+
+def test_mean_variance_satisfies_its_optimality_conditions():
+    aversion = np.array([2.0, 5.0, 20.0])
+    unconstrained = mean_variance_weights(MU, COV, aversion, long_only=False)
+    # Budget-constrained optimum: mu - aversion * cov w is the same for every asset
+    for gamma, weights in zip(aversion, unconstrained):
+        marginal = MU - gamma * COV @ weights
+        np.testing.assert_allclose(marginal, marginal[0])
+        assert weights.sum() == pytest.approx(1.0)
+
+    long_only = mean_variance_weights(MU, COV, aversion)
+    for weights in long_only:
+        assert_long_only(weights)
+    # These solutions are interior, so the constraint changes nothing
+    interior = np.all(unconstrained > 0, axis=1)
+    np.testing.assert_allclose(long_only[interior], unconstrained[interior], atol=1e-6)
+
+
+def test_risk_parity_equalizes_risk_contributions():
+    uncorrelated = risk_parity_weights(np.diag(VOLATILITIES ** 2))
+    np.testing.assert_allclose(uncorrelated, (1 / VOLATILITIES) / np.sum(1 / VOLATILITIES))
+
+    weights = risk_parity_weights(COV)
+    contributions = weights * (COV @ weights)
+    assert_long_only(weights)
+    np.testing.assert_allclose(contributions, contributions.mean())
+
+    budgets = np.array([0.5, 0.3, 0.2])
+    weights = risk_parity_weights(COV, budgets)
+    contributions = weights * (COV @ weights)
+    np.testing.assert_allclose(contributions / contributions.sum(), budgets)
+
+
+def test_max_sharpe_closed_form_and_long_only_tangency():
+    # Interior tangency portfolio: the closed form cov^-1 (mu - rf), normalized
+    raw = np.linalg.solve(COV, MU - 0.01)
+    np.testing.assert_allclose(max_sharpe_weights(MU, COV, 0.01), raw / raw.sum())
+
+    # A poor third asset gets a negative closed-form weight; long-only drops it
+    mu = np.array([0.06, 0.09, 0.02])
+    assert np.linalg.solve(COV, mu)[2] < 0
+    weights = max_sharpe_weights(mu, COV)
+    assert_long_only(weights)
+    assert weights[2] == pytest.approx(0.0, abs=1e-9)
+    # On the first two assets it is their own tangency portfolio
+    pair = np.linalg.solve(COV[:2, :2], mu[:2])
+    np.testing.assert_allclose(weights[:2], pair / pair.sum(), atol=1e-7)
+
+    # No frontier portfolio has a higher Sharpe ratio
+    frontier = efficient_frontier(mu, COV, points=200)
+    assert portfolio_stats(weights, mu, COV)[2] >= np.nanmax(frontier["sharpe"]) - 1e-9
+
+
+def test_max_sharpe_without_excess_return_picks_the_best_asset():
+    weights = max_sharpe_weights(np.array([0.01, 0.015, 0.0]), COV, risk_free_rate=0.02)
+    # Sharpe ratios -0.1, -0.025 and -0.067
+    np.testing.assert_array_equal(weights, [0.0, 1.0, 0.0])
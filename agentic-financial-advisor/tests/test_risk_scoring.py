@@ -0,0 +1,71 @@
+# ============================================================================
+# test_risk_scoring.py
+# Risk tiers of the deterministic scorer and fast-path / narrative routing
+# ============================================================================
+
+# Import json to read the fast-path payload
+import json
+
+# Import numpy to compare the vectorized scores
+import numpy as np
+
+# Import pytest to run the routing checks over several requests
+import pytest
+
+# Import the scorer and the fast path under test, and the signal block renderer
+from tools.risk_scoring import classify_risk, risk_fast_path_reply, score_risk
+from tools.signal_context import format_signal_context
+
+# Signals of a clearly calm and a clearly risky asset
+CALM = {"vol_20d": 0.10, "max_drawdown": -0.05, "var_95": 0.010, "adv_20d": 80e6}
+RISKY = {"vol_20d": 0.55, "max_drawdown": -0.45, "var_95": 0.050, "adv_20d": 1e6}
+
+
+def query(request, signals):
+    return [{"role": "user", "name": "UserProxy",
+             "content": request + "\n\n" + format_signal_context(signals)}]
+
+
+def test_scores_map_features_between_their_bounds():
+    scores = score_risk({name: [CALM[name], RISKY[name]] for name in CALM})
+    np.testing.assert_allclose(scores, [0.0, 1.0])
+
+    # Missing features are skipped and the remaining weights renormalized
+    partial = score_risk({"vol_20d": [0.275, np.nan], "var_95": [np.nan, np.nan]})
+    assert partial[0] == pytest.approx(0.5)
+    assert np.isnan(partial[1])
+
+
+def test_tiers_and_ambiguous_scores():
+    tiers, ambiguous = classify_risk([0.1, 0.5, 0.9, 0.33, 0.68, np.nan])
+    assert tiers[:5].tolist() == ["Low", "Medium", "High", "Low", "High"]
+    assert ambiguous.tolist() == [False, False, False, True, True, True]
+
+
+def test_clear_tiers_are_answered_without_the_llm():
+    final, reply = risk_fast_path_reply(None, query("Assess the risk", {"A": CALM, "B": RISKY}))
+
+    payload = json.loads(reply)
+    assert final
+    assert [asset["tier"] for asset in payload["assets"]] == ["Low", "High"]
+    assert payload["overall"] == "Medium"
+
+
+@pytest.mark.parametrize("request_text", [
+    "Explain the risk",
+    "Give me an explanation of the risk",
+    "Why is this portfolio risky?",
+    "Can you discuss the drawdowns",
+    "A discussion of the tiers, please",
+    "Describe the risks in detail",
+    "Elaborate on the volatility",
+])
+def test_narrative_requests_go_to_the_llm(request_text):
+    assert risk_fast_path_reply(None, query(request_text, {"A": CALM})) == (False, None)
+
+
+def test_borderline_scores_and_missing_signals_go_to_the_llm():
+    borderline = {"vol_20d": 0.2375, "max_drawdown": -0.1875, "var_95": 0.02375, "adv_20d": 34.25e6}
+    assert risk_fast_path_reply(None, query("Assess the risk", {"A": borderline})) == (False, None)
+    no_signals = [{"role": "user", "content": "Assess the risk"}]
+    assert risk_fast_path_reply(None, no_signals) == (False, None)
@@ -0,0 +1,60 @@
+# ============================================================================
+# test_scenario_engine.py
+# Seeded scenario simulations must not depend on the number of workers,
+# and a chunk of paths must fit its memory budget
+# ============================================================================
+
+# Import numpy and pandas to build a small synthetic price history
+import numpy as np
+import pandas as pd
+
+# Import pytest to run the check for both simulation methods
+import pytest
+
+# Import the scenario simulator and its chunk sizing under test
+from tools.scenario_engine import DEFAULT_CHUNK_BYTES, chunk_paths, run_scenarios
+
+
+def synthetic_prices(tickers=("AAA", "BBB", "CCC"), periods=120, seed=3):
+    # Mapping of ticker -> DataFrame, like fetch_market_data returns
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2024-01-01", periods=periods, freq="D", tz="UTC")
+    return {
+        ticker: pd.DataFrame(
+            {"Close": 100.0 * np.cumprod(1.0 + rng.normal(0.0005, 0.01, periods))}, index=index
+        )
+        for ticker in tickers
+    }
+
+
+@pytest.mark.parametrize("method", ["bootstrap", "gbm"])
+def test_seeded_results_do_not_depend_on_workers(method):
+    data = synthetic_prices()
+    options = dict(method=method, horizon=10, paths=4_000, chunk_size=1_000, seed=7)
+
+    sequential = run_scenarios(data, workers=1, **options)
+    parallel = run_scenarios(data, workers=2, **options)
+
+    assert sequential == parallel
+    # A different seed gives different paths
+    assert run_scenarios(data, workers=1, **dict(options, seed=8)) != sequential
+
+
+def test_chunk_size_follows_the_memory_budget():
+    # 500 assets over a year: a fixed 20,000-path chunk would need about 20 GB
+    paths = chunk_paths(252, 500)
+    assert 1 <= paths < 20_000
+    assert paths * 252 * 501 * 8 * 4 <= DEFAULT_CHUNK_BYTES
+    # Small universes are capped, and a tiny budget still simulates one path
+    assert chunk_paths(10, 3) == 20_000
+    assert chunk_paths(252, 500, chunk_bytes=1) == 1
+
+
+def test_explicit_chunk_size_is_capped_by_the_budget():
+    data = synthetic_prices()
+    options = dict(horizon=10, paths=2_000, seed=7)
+    budget = 4 * 10 * 4 * 8 * 250  # 250 paths of 3 assets + the portfolio
+
+    assert chunk_paths(10, 3, chunk_bytes=budget) == 250
+    capped = run_scenarios(data, chunk_size=1_000, chunk_bytes=budget, **options)
+    assert capped == run_scenarios(data, chunk_size=250, **options)
@@ -0,0 +1,156 @@
+# ============================================================================
+# test_speaker_selection.py
+# Speaking order, termination and tool routing of the code-driven selector,
+# in both execution modes of the orchestrator (scripted agents, no LLM)
+# ============================================================================
+
+# Import the AutoGen agent and group chat classes the selector works with
+from autogen import Agent, ConversableAgent, GroupChat
+
+# Import the completion cache so every test gets its own database
+from config.llm_cache import SQLiteCompletionCache
+
+# Import the orchestrator to run both execution modes end to end
+from orchestrator.financial_advisor_orchestrator import FinancialAdvisorOrchestrator
+
+# Import the selection policies under test
+from orchestrator.speaker_selection import (
+    DEFAULT_PIPELINE,
+    default_speaker_selector,
+    is_complete_report,
+)
+
+# A report with a heading for every required section
+REPORT = """# Investment Report
+## Market Overview
+Equities trend up.
+## Risk Analysis
+Volatility is moderate.
+## Strategies
+Hold a diversified core.
+## Conclusion
+Stay invested."""
+
+# Mentions every topic, but only in prose under two headings
+PARTIAL_REPORT = """## Market Overview
+Market and risk look fine; the strategy is to hold.
+## Risk Analysis
+In conclusion, nothing to add."""
+
+# An advisor's analysis that happens to mention every topic
+ANALYSIS = "Market view: risk is contained, strategy: hold. Conclusion: bullish."
+
+
+def scripted(name, *replies):
+    """
+    Build an agent that answers with the given replies in turn (the last repeats)
+    and records the messages it was given.
+    """
+    agent = ConversableAgent(name, llm_config=False, human_input_mode="NEVER")
+    agent.seen = []
+    pending = list(replies)
+
+    def reply(recipient, messages=None, sender=None, config=None):
+        agent.seen.append(list(messages or []))
+        return True, pending.pop(0) if len(pending) > 1 else pending[0]
+
+    agent.register_reply([Agent, None], reply)
+    return agent
+
+
+def orchestrator(tmp_path, report_replies=(REPORT,), **kwargs):
+    agents = [scripted(name, ANALYSIS) for name in DEFAULT_PIPELINE[:-1]]
+    agents.append(scripted(DEFAULT_PIPELINE[-1], *report_replies))
+    cache = SQLiteCompletionCache(str(tmp_path / "cache.db"), max_bytes=1 << 20)
+    return FinancialAdvisorOrchestrator(agents, llm_cache=cache, silent=True, **kwargs)
+
+
+def speakers(advisor):
+    return [message["name"] for message in advisor.group_chat.messages]
+
+
+def test_only_the_reporters_headings_complete_a_report():
+    assert is_complete_report({"name": "ReportGenerationAgent", "content": REPORT})
+    # Bold title lines count as headings too
+    bold = "\n".join(f"**{title}**" for title in ("Market", "Risk", "Strategy", "Conclusion"))
+    assert is_complete_report({"name": "ReportGenerationAgent", "content": bold})
+
+    assert not is_complete_report({"name": "ReportGenerationAgent", "content": PARTIAL_REPORT})
+    assert not is_complete_report({"name": "InvestmentStrategyAgent", "content": REPORT})
+    assert not is_complete_report({"name": "ReportGenerationAgent", "content": None})
+
+
+def test_pipeline_speaks_in_order_and_ends_after_the_report(tmp_path):
+    advisor = orchestrator(tmp_path)
+    result = advisor.run("Analyze the market")
+
+    # Every advisor mentions all topics, yet the chat only ends on the report
+    assert speakers(advisor) == ["UserProxy", *DEFAULT_PIPELINE]
+    assert result.summary == REPORT
+
+
+def test_incomplete_report_gets_one_retry(tmp_path):
+    advisor = orchestrator(tmp_path, report_replies=(PARTIAL_REPORT, REPORT))
+    advisor.run("Analyze the market")
+    assert speakers(advisor) == ["UserProxy", *DEFAULT_PIPELINE, "ReportGenerationAgent"]
+
+    # The retries are bounded even if the report never completes
+    advisor = orchestrator(tmp_path, report_replies=(PARTIAL_REPORT,))
+    advisor.run("Analyze the market")
+    assert speakers(advisor) == ["UserProxy", *DEFAULT_PIPELINE, "ReportGenerationAgent"]
+
+
+def test_pipeline_without_reporter_ends_after_the_last_stage():
+    agents = [scripted(name, ANALYSIS) for name in DEFAULT_PIPELINE[:2]]
+    user = scripted("UserProxy", "")
+    chat = GroupChat(agents=[user] + agents, messages=[{"name": "UserProxy", "content": "Hi"}])
+    selector = default_speaker_selector([agent.name for agent in agents])
+
+    assert selector(user, chat) is agents[0]
+    assert selector(agents[0], chat) is agents[1]
+    # The last stage returns None, which ends the chat
+    assert selector(agents[1], chat) is None
+
+
+def test_out_of_turn_speaker_ends_the_chat():
+    user = scripted("UserProxy", "")
+    market = scripted("MarketAnalysisAgent", ANALYSIS)
+    chat = GroupChat(agents=[user, market], messages=[{"name": "UserProxy", "content": "Hi"}] * 2)
+    assert default_speaker_selector([market.name])(user, chat) is None
+
+
+def test_tool_calls_go_to_the_executor_and_back():
+    user = scripted("UserProxy", "")
+    market = scripted("MarketAnalysisAgent", ANALYSIS)
+    executor = scripted("ToolExecutor", "")
+    executor.register_function({"get_quote": lambda ticker: "1.0"})
+    chat = GroupChat(agents=[user, market, executor], messages=[])
+    selector = default_speaker_selector([market.name])
+
+    chat.messages.append({"name": "MarketAnalysisAgent", "content": None, "tool_calls": [
+        {"id": "1", "type": "function", "function": {"name": "get_quote", "arguments": "{}"}},
+    ]})
+    assert selector(market, chat) is executor
+
+    chat.messages.append({"name": "ToolExecutor", "role": "tool", "content": "1.0",
+                          "tool_responses": [{"tool_call_id": "1", "content": "1.0"}]})
+    assert selector(executor, chat) is market
+
+
+def test_fanout_runs_each_agent_once_after_its_dependencies(tmp_path):
+    advisor = orchestrator(tmp_path, execution_mode="fanout")
+    outputs = advisor.run("Analyze the market")
+
+    # Market and risk run in the first wave, the report comes last
+    assert set(list(outputs)[:2]) == {"MarketAnalysisAgent", "RiskAssessmentAgent"}
+    assert list(outputs)[2:] == ["InvestmentStrategyAgent", "ReportGenerationAgent"]
+    assert outputs["ReportGenerationAgent"] == REPORT
+    # No group chat takes place, and every agent answers exactly once
+    assert advisor.group_chat.messages == []
+    for agent in advisor.agents:
+        assert len(agent.seen) == 1
+    # The strategy agent sees the query plus the market and risk outputs
+    strategy = advisor.agents[2]
+    assert [message["name"] for message in strategy.seen[0]] == [
+        "UserProxy", "MarketAnalysisAgent", "RiskAssessmentAgent",
+    ]
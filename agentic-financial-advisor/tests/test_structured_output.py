@@ -0,0 +1,185 @@
+# ============================================================================
+# test_structured_output.py
+# Schema validation, the validate-and-retry reply loop and the template report
+# (a scripted agent stands in for the LLM)
+# ============================================================================
+
+# Import json to build and read the payloads
+import json
+
+# Import pytest to run the validation checks over several payloads
+import pytest
+
+# Import the reply loop under test
+from tools.agent_tools import tool_loop_reply
+
+# Import the schemas, the parser and the report reply under test
+from tools.structured_output import (
+    RISK_ASSESSMENT_SCHEMA,
+    STRATEGY_SCHEMA,
+    parse_payload,
+    register_structured_output,
+    report_template_reply,
+    validate_payload,
+)
+
+# A valid payload for every structured agent
+MARKET = {"outlook": "bullish", "summary": "Broad rally.", "drivers": ["Earnings"],
+          "assets": [{"ticker": "AAPL", "trend": "up"}]}
+RISK = {"overall": "Medium", "summary": "Moderate volatility.",
+        "assets": [{"ticker": "AAPL", "tier": "Medium", "score": 0.5, "reason": "vol 25%"}]}
+STRATEGY = {"short_term": [{"asset": "AAPL", "weight": 0.6, "rationale": "Momentum"}],
+            "long_term": [], "summary": "Stay invested."}
+
+# An invalid risk payload: the tier is not one of Low / Medium / High
+BAD_RISK = dict(RISK, overall="Severe")
+
+
+class ScriptedAgent:
+    """
+    Stand-in for a ConversableAgent whose LLM answers with the given replies,
+    recording every request (history and client) it receives.
+    """
+
+    def __init__(self, *replies, tools=False):
+        self.replies = list(replies)
+        self.requests = []
+        self.client = object()
+        self.llm_config = {"tools": [{"type": "function"}]} if tools else {}
+
+    def register_reply(self, trigger, reply_func, position=0):
+        self.reply_func = reply_func
+
+    def generate_oai_reply(self, messages, sender, config=None):
+        self.requests.append((list(messages), config))
+        return True, self.replies.pop(0)
+
+    def generate_tool_calls_reply(self, messages, sender):
+        return True, {"role": "tool", "content": "42", "tool_responses": [{"tool_call_id": "1", "content": "42"}]}
+
+
+def structured_agent(*replies, tools=False):
+    agent = ScriptedAgent(*replies, tools=tools)
+    register_structured_output(agent, RISK_ASSESSMENT_SCHEMA)
+    return agent
+
+
+def options(request):
+    # Request options of a constrained request, None for a plain one
+    client = request[1]
+    return None if client is None else client.options
+
+
+@pytest.mark.parametrize("payload, error", [
+    (RISK, None),
+    ({"overall": "Low", "summary": "ok"}, "$.assets is required"),
+    (BAD_RISK, "$.overall must be one of Low, Medium, High"),
+    (dict(RISK, assets=[{"ticker": "AAPL", "tier": "Low", "score": True}]),
+     "$.assets[0].score must be of type number or null"),
+    (dict(RISK, key_risks=["a"] * 6), "$.key_risks must have at most 5 items"),
+    ([RISK], "$ must be of type object"),
+])
+def test_validate_payload_reports_the_first_problem(payload, error):
+    assert validate_payload(payload, RISK_ASSESSMENT_SCHEMA) == error
+
+
+def test_validate_payload_checks_bounds():
+    over = dict(STRATEGY, long_term=[{"asset": "X", "weight": 1.5, "rationale": "r"}])
+    assert validate_payload(over, STRATEGY_SCHEMA) == "$.long_term[0].weight must be at most 1"
+    assert validate_payload(STRATEGY, STRATEGY_SCHEMA) is None
+
+
+def test_parse_payload_tolerates_fences_and_text():
+    fenced = "Here it is:\n```json\n" + json.dumps(RISK) + "\n```\nDone."
+    assert parse_payload(fenced, RISK_ASSESSMENT_SCHEMA) == (RISK, None)
+    assert parse_payload("Result: " + json.dumps(RISK) + " (end)", RISK_ASSESSMENT_SCHEMA) == (RISK, None)
+
+
+@pytest.mark.parametrize("text, error", [
+    ("", "the reply is empty"),
+    (None, "the reply is empty"),
+    ("Risk is medium.", "the reply contains no JSON object"),
+    ("{'overall': 'Low'}", "the reply is not valid JSON"),
+    (json.dumps(BAD_RISK), "$.overall must be one of"),
+])
+def test_parse_payload_rejects_unusable_replies(text, error):
+    payload, problem = parse_payload(text, RISK_ASSESSMENT_SCHEMA)
+    assert payload is None
+    assert problem.startswith(error)
+
+
+def test_valid_reply_is_returned_as_compact_json():
+    agent = structured_agent("```json\n" + json.dumps(RISK, indent=2) + "\n```")
+    final, reply = tool_loop_reply(agent, [{"role": "user", "content": "Assess"}])
+
+    assert final
+    assert reply == json.dumps(RISK, separators=(",", ":"))
+    # An agent without tools is constrained to the schema from the first request
+    assert len(agent.requests) == 1
+    assert options(agent.requests[0])["response_format"]["json_schema"]["schema"] is RISK_ASSESSMENT_SCHEMA
+
+
+def test_invalid_reply_is_corrected_once():
+    agent = structured_agent(json.dumps(BAD_RISK), json.dumps(RISK))
+    final, reply = tool_loop_reply(agent, [{"role": "user", "content": "Assess"}])
+
+    assert final
+    assert json.loads(reply) == RISK
+    # The retry only adds the rejected answer and the problem to the history
+    history, _ = agent.requests[1]
+    assert history[-2] == {"role": "assistant", "content": json.dumps(BAD_RISK)}
+    assert "$.overall must be one of Low, Medium, High" in history[-1]["content"]
+
+
+def test_unparseable_reply_is_passed_on_after_the_retries():
+    agent = structured_agent("Risk is medium.", "Still medium, really.")
+    final, reply = tool_loop_reply(agent, [{"role": "user", "content": "Assess"}])
+
+    # One corrective turn, then the last answer goes on as free text
+    assert (final, reply) == (True, "Still medium, really.")
+    assert len(agent.requests) == 2
+    assert "contains no JSON object" in agent.requests[1][0][-1]["content"]
+
+
+def test_tools_run_before_the_constrained_answer():
+    call = {"content": None, "tool_calls": [
+        {"id": "1", "type": "function", "function": {"name": "risk_metrics", "arguments": "{}"}},
+    ]}
+    agent = structured_agent(call, json.dumps(RISK), tools=True)
+    final, reply = tool_loop_reply(agent, [{"role": "user", "content": "Assess"}])
+
+    assert json.loads(reply) == RISK
+    # The tool call is free; the answer after the tool results is constrained
+    assert options(agent.requests[0]) is None
+    assert "response_format" in options(agent.requests[1])
+    assert agent.requests[1][0][-1]["content"] == "42"
+
+
+def conversation(**contents):
+    messages = [{"role": "user", "name": "UserProxy", "content": "Analyze"}]
+    return messages + [{"role": "user", "name": name, "content": content} for name, content in contents.items()]
+
+
+def test_report_is_rendered_from_valid_payloads():
+    messages = conversation(MarketAnalysisAgent=json.dumps(MARKET), RiskAssessmentAgent=json.dumps(RISK),
+                            InvestmentStrategyAgent=json.dumps(STRATEGY))
+    final, report = report_template_reply(None, messages)
+
+    assert final
+    for heading in ("## Market Overview", "## Risk Analysis", "## Strategies", "## Conclusion"):
+        assert heading in report
+    assert "- AAPL (60%): Momentum" in report
+    assert "Overall risk is Medium." in report
+
+
+def test_report_falls_back_to_the_llm_on_free_text():
+    # A structured agent that replied in free text after its retries
+    messages = conversation(MarketAnalysisAgent=json.dumps(MARKET), RiskAssessmentAgent="Risk is medium.")
+    assert report_template_reply(None, messages) == (False, None)
+    # No structured payload at all
+    assert report_template_reply(None, conversation()) == (False, None)
+
+    # Agents that did not take part do not block the template
+    final, report = report_template_reply(None, conversation(RiskAssessmentAgent=json.dumps(RISK)))
+    assert final
+    assert "No market analysis was provided." in report
@@ -0,0 +1,157 @@
+# ============================================================================
+# agent_tools.py
+# Lets an agent call its quantitative tools within its own turn
+# The tool computes the numbers; the LLM only explains them
+# ============================================================================
+
+# Import AutoGen's helper that registers a function for the LLM and for execution
+from autogen import Agent, register_function
+
+# Maximum LLM -> tool -> LLM rounds within one reply
+MAX_TOOL_ROUNDS = 3
+
+# Message asking for a corrected answer after a failed output check
+DEFAULT_CORRECTION = "Your reply is not valid: {error}. Reply again with only the corrected answer."
+
+
+class _RequestOptionsClient:
+    """
+    View of an agent's OpenAIWrapper that adds fixed parameters to every request
+    (e.g. `response_format` for schema-constrained output).
+    """
+
+    def __init__(self, client, **options):
+        self.client = client
+        self.options = options
+
+    def create(self, **config):
+        return self.client.create(**dict(config, **self.options))
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+
+def tool_loop_reply(recipient, messages=None, sender=None, config=None):
+    """
+    AutoGen reply function that executes the agent's own tool calls in place.
+
+    This function:
+    1. Asks the LLM for a reply (with the agent's registered tool schemas)
+    2. If the reply contains tool calls, executes them with the agent's own
+       function map and sends the results back to the LLM
+    3. Repeats until the LLM answers in plain text (at most MAX_TOOL_ROUNDS)
+    4. If the agent has an output check (see `register_structured_output`),
+       validates the answer and asks again with the problem on failure
+
+    The tool round trip therefore stays inside one turn: the group chat's
+    pipeline order and the fan-out mode are unaffected, and the next agent
+    only sees the final answer.
+
+    With an output check, every request after the first one (or every request,
+    for agents without tools) carries the check's request options, e.g. a
+    `response_format` that constrains the answer to a JSON schema.
+
+    Args:
+        recipient (ConversableAgent): The agent the function is registered on
+        messages (list): Conversation history seen by the agent
+        sender (Agent): The agent requesting a reply
+        config: Unused; the settings are read from the agent (see
+                `reply_loop_config`): "validate" (callable text -> (reply, error)),
+                "request_options" (dict), "retries" (int) and "correction"
+                (message template with an {error} field)
+
+    Returns:
+        tuple: (final, reply) - (True, text) once the LLM has answered,
+               (False, None) if the agent has no LLM client
+    """
+    # AutoGen copies the registered config, so later updates live on the agent
+    config = getattr(recipient, "tool_loop_config", {})
+    validate = config.get("validate")
+    retries = config.get("retries", 0)
+    checked_client = (
+        _RequestOptionsClient(recipient.client, **config.get("request_options", {}))
+        if validate is not None and recipient.client is not None else None
+    )
+    has_tools = bool((recipient.llm_config or {}).get("tools"))
+    constrained = checked_client is not None and not has_tools
+    history = list(messages or [])
+    rounds = 0
+    results = None
+
+    while True:
+        # Step 1: Ask the LLM (constrained once no more tool calls are expected)
+        final, reply = recipient.generate_oai_reply(
+            history, sender, config=checked_client if constrained else None
+        )
+        if not final:
+            return False, None
+
+        # Step 2: Execute the requested tools and hand the results back
+        if isinstance(reply, dict) and reply.get("tool_calls") and rounds < MAX_TOOL_ROUNDS:
+            rounds += 1
+            call = {"role": "assistant", "content": reply.get("content") or "", "tool_calls": reply["tool_calls"]}
+            _, results = recipient.generate_tool_calls_reply(history + [call], sender)
+            history += [call, results]
+            constrained = checked_client is not None
+            continue
+
+        text = reply.get("content") if isinstance(reply, dict) else reply
+        if validate is None:
+            # The LLM kept calling tools: return the last results for the next agent
+            if isinstance(reply, dict) and reply.get("tool_calls") and results is not None:
+                return True, results.get("content", "")
+            return True, reply
+
+        # Step 3: Check the answer
+        checked, error = validate(text)
+        if error is None:
+            return True, checked
+
+        # Step 4: Ask for a corrected answer, or give up and pass the text on
+        if retries <= 0:
+            return True, text or ""
+        retries -= 1
+        history += [
+            {"role": "assistant", "content": text or ""},
+            {"role": "user", "content": config.get("correction", DEFAULT_CORRECTION).format(error=error)},
+        ]
+        constrained = True
+
+
+def reply_loop_config(agent):
+    """
+    Install the tool loop on `agent` (once) and return its settings dict.
+
+    The loop is registered after the termination checks; reply functions
+    registered later at the same position (e.g. the risk fast path) run first.
+    Tools and output checks share this one loop, so an agent never runs two.
+
+    Args:
+        agent (ConversableAgent): The agent.
+
+    Returns:
+        dict: The settings passed to `tool_loop_reply` (updated in place)
+    """
+    config = getattr(agent, "tool_loop_config", None)
+    if config is None:
+        config = {}
+        agent.tool_loop_config = config
+        agent.register_reply(trigger=[Agent, None], reply_func=tool_loop_reply, position=2)
+    return config
+
+
+def register_agent_tool(agent, function, name, description):
+    """
+    Make `function` a tool that `agent` proposes and executes itself.
+
+    The agent must have been created with its own copy of the LLM
+    configuration: AutoGen adds the tool schema to the agent's llm_config dict.
+
+    Args:
+        agent (ConversableAgent): The agent using the tool.
+        function (callable): Tool function with Annotated parameters.
+        name (str): Tool name shown to the LLM.
+        description (str): Tool description shown to the LLM.
+    """
+    register_function(function, caller=agent, executor=agent, name=name, description=description)
+    reply_loop_config(agent)
@@ -0,0 +1,279 @@
+# ============================================================================
+# indicators.py
+# Vectorized technical-indicator engine built on NumPy and pandas
+# Computes signals for N tickers at once over a 2-D (dates x tickers) array
+# ============================================================================
+
+# Import numpy for the array-based indicator math
+import numpy as np
+
+# Import pandas for exponential smoothing and aligning fetched data
+import pandas as pd
+
+# Import the per-exchange date alignment shared with the batch fetcher
+from tools.market_data_tool import align_frames
+
+# Import the prompt block helpers; re-exported here for existing callers
+# They live in a pandas-free module so the risk fast path loads quickly
+from tools.signal_context import (
+    SIGNALS_BLOCK_END,
+    SIGNALS_BLOCK_START,
+    format_signal_context,
+    parse_signal_context,
+)
+
+# Number of trading periods per year, used to annualize volatility
+TRADING_DAYS_PER_YEAR = 252
+
+# ============================================================================
+# Input preparation
+# ============================================================================
+
+def price_matrix(data, field="Close"):
+    """
+    Build a 2-D price matrix from fetched market data.
+
+    Per-ticker frames are aligned with `align_frames` (daily bars on their
+    exchange's local calendar date), so the same trading day shares one row
+    whatever the exchange timezones are.
+
+    Args:
+        data (pandas.DataFrame | dict): Either the aligned (ticker, field)
+                     DataFrame returned by `fetch_market_data_many`, or a
+                     mapping of ticker -> DataFrame from `fetch_market_data`.
+        field (str): OHLCV column to extract (default: 'Close').
+
+    Returns:
+        tuple: (dates, tickers, values)
+               - dates (pandas.DatetimeIndex): Row labels
+               - tickers (list): Column labels
+               - values (numpy.ndarray): Float array of shape (dates, tickers),
+                 NaN where a ticker has no bar (holiday, weekend, before its
+                 history starts). Nothing is forward-filled: a filled price
+                 would add a fake zero return between two real bars.
+    """
+    if isinstance(data, dict):
+        data = align_frames(data)
+    frame = data.xs(field, axis=1, level=1)
+    return frame.index, list(frame.columns), frame.to_numpy(dtype=np.float64)
+
+def own_bars(values):
+    """
+    Move every column's bars to the bottom of the array, in date order.
+
+    Tickers from different exchanges (or crypto, trading every day) have bars
+    on different dates. After packing, each column holds only its own
+    consecutive bars (gaps move to the top as NaN), so the rolling indicators
+    below see every ticker on its own calendar, still in one array operation.
+
+    Args:
+        values (numpy.ndarray): Aligned values of shape (dates, tickers).
+
+    Returns:
+        tuple: (packed, order) - packed[i, j] == values[order[i, j], j]
+    """
+    order = np.argsort(~np.isnan(values), axis=0, kind="stable")
+    return np.take_along_axis(values, order, axis=0), order
+
+def on_dates(packed, order):
+    """
+    Put values computed on `own_bars` output back on the aligned dates.
+    """
+    values = np.full(packed.shape, np.nan)
+    np.put_along_axis(values, order, packed, axis=0)
+    return values
+
+# ============================================================================
+# Vectorized indicators (all operate on arrays of shape (T, N))
+# ============================================================================
+
+def _rolling_sum(values, window):
+    """
+    Rolling sum along axis 0 using cumulative sums.
+
+    Windows that contain a NaN (or are incomplete) produce NaN.
+    """
+    filled = np.where(np.isnan(values), 0.0, values)
+    missing = np.isnan(values).astype(np.int64)
+    zeros = np.zeros((1,) + values.shape[1:])
+
+    sums = np.concatenate([zeros, np.cumsum(filled, axis=0)])
+    counts = np.concatenate([zeros, np.cumsum(missing, axis=0)])
+
+    result = np.full(values.shape, np.nan)
+    result[window - 1:] = sums[window:] - sums[:-window]
+    gaps = np.ones(values.shape, dtype=bool)
+    gaps[window - 1:] = (counts[window:] - counts[:-window]) > 0
+    result[gaps] = np.nan
+    return result
+
+def simple_returns(prices):
+    """
+    Period-over-period simple returns; the first row is NaN.
+    """
+    returns = np.full(prices.shape, np.nan)
+    returns[1:] = prices[1:] / prices[:-1] - 1.0
+    return returns
+
+def rolling_volatility(returns, window=20, periods_per_year=TRADING_DAYS_PER_YEAR):
+    """
+    Annualized rolling standard deviation of returns (sample, ddof=1).
+    """
+    mean = _rolling_sum(returns, window) / window
+    mean_sq = _rolling_sum(returns ** 2, window) / window
+    variance = np.maximum(mean_sq - mean ** 2, 0.0) * window / (window - 1)
+    return np.sqrt(variance * periods_per_year)
+
+def sma(prices, window):
+    """
+    Simple moving average over `window` periods.
+    """
+    return _rolling_sum(prices, window) / window
+
+def ema(prices, span):
+    """
+    Exponential moving average with smoothing 2 / (span + 1).
+    """
+    return pd.DataFrame(prices).ewm(span=span, adjust=False).mean().to_numpy()
+
+def rsi(prices, window=14):
+    """
+    Relative Strength Index using Wilder's smoothing (0-100).
+    """
+    change = np.diff(prices, axis=0, prepend=np.nan)
+    gains = pd.DataFrame(np.clip(change, 0.0, None))
+    losses = pd.DataFrame(np.clip(-change, 0.0, None))
+    avg_gain = gains.ewm(alpha=1.0 / window, adjust=False, min_periods=window).mean().to_numpy()
+    avg_loss = losses.ewm(alpha=1.0 / window, adjust=False, min_periods=window).mean().to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        strength = avg_gain / avg_loss
+    return np.where(avg_loss == 0.0, 100.0, 100.0 - 100.0 / (1.0 + strength))
+
+def macd(prices, fast=12, slow=26, signal=9):
+    """
+    MACD line, signal line and histogram.
+    """
+    line = ema(prices, fast) - ema(prices, slow)
+    signal_line = ema(line, signal)
+    return line, signal_line, line - signal_line
+
+def drawdown(prices):
+    """
+    Drawdown from the running peak (0 at a new high, negative below it).
+    """
+    peak = np.fmax.accumulate(prices, axis=0)
+    return prices / peak - 1.0
+
+def beta(returns, benchmark_returns):
+    """
+    Beta of every column against a benchmark return series.
+
+    Args:
+        returns (numpy.ndarray): Returns of shape (T, N).
+        benchmark_returns (numpy.ndarray): Benchmark returns of shape (T,).
+
+    Returns:
+        numpy.ndarray: Beta per column, shape (N,).
+    """
+    bench = benchmark_returns[:, None]
+    valid = ~np.isnan(returns) & ~np.isnan(bench)
+    count = valid.sum(axis=0)
+    r = np.where(valid, returns, 0.0)
+    b = np.where(valid, bench, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r_mean = r.sum(axis=0) / count
+        b_mean = b.sum(axis=0) / count
+        covariance = (np.where(valid, (r - r_mean) * (b - b_mean), 0.0)).sum(axis=0)
+        variance = (np.where(valid, (b - b_mean) ** 2, 0.0)).sum(axis=0)
+        return covariance / variance
+
+def value_at_risk(returns, level=0.95):
+    """
+    Historical Value at Risk per column, as a positive loss fraction.
+    """
+    return -np.nanquantile(returns, 1.0 - level, axis=0)
+
+# ============================================================================
+# Signal summary for the agents
+# ============================================================================
+
+def compute_signals(data, benchmark=None, periods_per_year=TRADING_DAYS_PER_YEAR):
+    """
+    Compute a compact set of indicators for every ticker in `data`.
+
+    This function:
+    1. Builds a (dates x tickers) close-price matrix and packs every ticker's
+       own bars together (`own_bars`), so returns and rolling windows never
+       span another exchange's trading days
+    2. Computes returns, volatility, moving averages, RSI, MACD, drawdown and VaR
+       for all tickers in single array operations
+    3. Computes beta against `benchmark` when it is part of the data, pairing
+       returns by date
+    4. Computes average daily traded value when volume is available (liquidity)
+    5. Returns only the latest value of each indicator per ticker
+
+    Args:
+        data (pandas.DataFrame | dict): Output of `fetch_market_data_many`
+                     or a mapping of ticker -> `fetch_market_data` frame
+        benchmark (str | None): Ticker to measure beta against (e.g. '^GSPC')
+        periods_per_year (int): Bars per year for annualization (default: 252)
+
+    Returns:
+        dict: Mapping of ticker -> {indicator name: rounded float}
+
+    Example:
+        >>> data, errors = fetch_market_data_many(['AAPL', 'MSFT', '^GSPC'], '1y')
+        >>> signals = compute_signals(data, benchmark='^GSPC')
+        >>> signals['AAPL']['rsi_14']
+    """
+    # Step 1: Normalize the input to one aligned (ticker, field) DataFrame
+    # and compute every ticker's indicators over its own bars
+    if isinstance(data, dict):
+        data = align_frames(data)
+    _, tickers, aligned = price_matrix(data)
+    prices, order = own_bars(aligned)
+    returns = simple_returns(prices)
+
+    def last(values):
+        # Latest non-NaN value of every column
+        return pd.DataFrame(values).ffill().iloc[-1].to_numpy()
+
+    # Step 2: Compute every indicator for all tickers at once
+    latest = last(prices)
+    first = pd.DataFrame(prices).bfill().iloc[0].to_numpy()
+    columns = {
+        "last": latest,
+        "ret_1m": latest / prices[max(len(prices) - 22, 0)] - 1.0,
+        "ret_period": latest / first - 1.0,
+        "vol_20d": last(rolling_volatility(returns, 20, periods_per_year)),
+        "sma_50": last(sma(prices, 50)),
+        "ema_20": last(ema(prices, 20)),
+        "rsi_14": last(rsi(prices, 14)),
+        "max_drawdown": np.nanmin(drawdown(prices), axis=0),
+        "drawdown": last(drawdown(prices)),
+        "var_95": value_at_risk(returns, 0.95),
+    }
+    line, signal_line, _ = macd(prices)
+    columns["macd"] = last(line)
+    columns["macd_signal"] = last(signal_line)
+
+    # Step 3: Beta needs the benchmark to be one of the fetched tickers
+    # Returns go back on the aligned dates so each pair covers the same day
+    if benchmark is not None and benchmark in tickers:
+        dated = on_dates(returns, order)
+        columns["beta"] = beta(dated, dated[:, tickers.index(benchmark)])
+
+    # Step 4: Liquidity as average traded value (close x volume) over 20 bars
+    if "Volume" in data.columns.get_level_values(1):
+        _, _, volume = price_matrix(data, "Volume")
+        volume = np.take_along_axis(volume, order, axis=0)
+        columns["adv_20d"] = np.nanmean((prices * volume)[-20:], axis=0)
+
+    # Step 5: Keep only the latest values, rounded for a compact prompt
+    signals = {}
+    for position, ticker in enumerate(tickers):
+        signals[ticker] = {
+            name: (None if np.isnan(values[position]) else round(float(values[position]), 4))
+            for name, values in columns.items()
+        }
+    return signals
@@ -0,0 +1,488 @@
+# ============================================================================
+# market_data_cache.py
+# Persistent, columnar on-disk cache for OHLCV market data
+# Serves bars it already holds and only fetches the missing tail from the provider
+# ============================================================================
+
+# Import json for the small per-entry metadata files
+import json
+
+# Import os and shutil for file system operations (atomic replace, eviction)
+import os
+import shutil
+
+# Import threading so concurrent callers never write the same entry twice
+import threading
+
+# Import numpy for the memory-mapped column files
+import numpy as np
+
+# Import pandas to rebuild DataFrames from the stored columns
+import pandas as pd
+
+# ============================================================================
+# Cache policy defaults
+# ============================================================================
+
+# Default location of the cache, next to AutoGen's own .cache directory
+# Can be overridden with the MARKET_DATA_CACHE_DIR environment variable
+DEFAULT_CACHE_DIR = os.environ.get(
+    "MARKET_DATA_CACHE_DIR", os.path.join(".cache", "market_data")
+)
+
+# Default upper bound for the total size of the cache on disk (512 MB)
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Time-to-live per bar interval, in seconds
+# A cached entry younger than its TTL is served without contacting the provider
+# Older entries trigger an incremental refresh of the tail only
+DEFAULT_TTL_SECONDS = {
+    "1m": 60,
+    "2m": 2 * 60,
+    "5m": 5 * 60,
+    "15m": 15 * 60,
+    "30m": 30 * 60,
+    "60m": 60 * 60,
+    "90m": 90 * 60,
+    "1h": 60 * 60,
+    "1d": 60 * 60,
+    "5d": 24 * 60 * 60,
+    "1wk": 24 * 60 * 60,
+    "1mo": 24 * 60 * 60,
+    "3mo": 24 * 60 * 60,
+}
+
+# Mapping of period suffixes to pandas DateOffset keyword arguments
+# Used to turn a yfinance-style period ('6mo', '1y', ...) into a start timestamp
+_PERIOD_UNITS = {"d": "days", "wk": "weeks", "mo": "months", "y": "years"}
+
+# Name of the metadata file stored inside every cache entry directory
+_META_FILE = "meta.json"
+
+# Name of the column file that holds the bar timestamps
+_INDEX_FILE = "__index__.npy"
+
+
+class MarketDataProvider:
+    """
+    Base class for pluggable market data sources used by the OHLCV cache.
+
+    Subclasses implement `fetch` and return a pandas DataFrame indexed by
+    timestamp with OHLCV columns, exactly like `yf.Ticker(...).history()`.
+    Swapping the provider lets the cache be exercised offline against a
+    fake or synthetic data source.
+
+    Attributes:
+        host (str): Upstream host name, used for per-host concurrency limits
+        max_batch_size (int): Most tickers a single `fetch_many` call may carry
+    """
+
+    host = "default"
+    max_batch_size = 1
+
+    def fetch(self, ticker, interval="1d", period=None, start=None):
+        """
+        Fetch bars for one ticker.
+
+        Args:
+            ticker (str): Stock symbol or index code (e.g. 'AAPL', '^NSEI').
+            interval (str): Bar interval (e.g. '1d', '1h').
+            period (str | None): yfinance-style period ('6mo', '1y', 'max').
+                                 Used for the initial fill of an entry.
+            start (pandas.Timestamp | None): Fetch bars from this timestamp on.
+                                 Used for incremental tail refreshes.
+
+        Returns:
+            pandas.DataFrame: OHLCV bars indexed by timestamp.
+        """
+        raise NotImplementedError
+
+    def fetch_many(self, tickers, interval="1d", period=None):
+        """
+        Fetch bars for several tickers in one bulk request.
+
+        Providers with a native bulk endpoint override this; the default
+        implementation simply calls `fetch` once per ticker.
+
+        Args:
+            tickers (list): Ticker symbols (at most `max_batch_size`).
+            interval (str): Bar interval.
+            period (str | None): yfinance-style period.
+
+        Returns:
+            dict: Mapping of ticker -> pandas.DataFrame of bars.
+        """
+        return {
+            ticker: self.fetch(ticker, interval=interval, period=period)
+            for ticker in tickers
+        }
+
+
+def period_start(period, now=None):
+    """
+    Convert a yfinance-style period string into a UTC start timestamp.
+
+    Args:
+        period (str): Period such as '5d', '6mo', '1y', 'ytd' or 'max'.
+        now (pandas.Timestamp | None): Reference time (default: current UTC time).
+
+    Returns:
+        pandas.Timestamp | None: Start of the period in UTC,
+                                 or None for 'max' (all available history).
+
+    Raises:
+        ValueError: If the period string is not recognised.
+    """
+    # Use the current UTC time as the reference unless one is supplied
+    now = pd.Timestamp.now(tz="UTC") if now is None else pd.Timestamp(now)
+
+    # 'max' means all available history, which has no fixed start
+    if period == "max":
+        return None
+
+    # 'ytd' starts on January 1st of the current year
+    if period == "ytd":
+        return pd.Timestamp(year=now.year, month=1, day=1, tz="UTC")
+
+    # Split the period into its numeric amount and unit suffix ('6' + 'mo')
+    for suffix, unit in _PERIOD_UNITS.items():
+        amount = period[: -len(suffix)]
+        if period.endswith(suffix) and amount.isdigit():
+            return now - pd.DateOffset(**{unit: int(amount)})
+
+    raise ValueError(f"Unsupported period: {period!r}")
+
+
+def _to_utc_ns(index):
+    """
+    Convert a DatetimeIndex to int64 UTC nanoseconds (naive indexes count as UTC).
+    """
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+    return index.as_unit("ns").asi8
+
+
+def _entry_name(ticker):
+    """
+    Turn a ticker symbol into a safe directory name ('^NSEI' -> '_5ENSEI').
+    """
+    return "".join(
+        char if char.isalnum() or char in "-." else f"_{ord(char):X}"
+        for char in ticker.upper()
+    )
+
+
+class OHLCVCache:
+    """
+    Persistent, columnar cache of OHLCV bars keyed by ticker and interval.
+
+    Every entry lives in its own directory and stores one NumPy `.npy` file per
+    column (plus a timestamp column), which are memory-mapped on read.
+    The cache:
+    - Serves requests entirely from disk while an entry is fresher than its TTL
+    - Fetches only the missing tail (since the last stored bar) once it is stale
+    - Back-fills from the provider when a longer period than stored is requested
+    - Evicts least-recently-used entries when the total size exceeds max_bytes
+
+    Attributes:
+        provider (MarketDataProvider): Source used for cache misses and refreshes
+        cache_dir (str): Root directory of the cache on disk
+        max_bytes (int): Upper bound for the total size of all entries
+        ttl_seconds (dict): Freshness window per bar interval
+        hits (int): Requests served without contacting the provider
+        misses (int): Requests that needed a full or incremental provider fetch
+    """
+
+    def __init__(self, provider, cache_dir=DEFAULT_CACHE_DIR,
+                 max_bytes=DEFAULT_MAX_BYTES, ttl_seconds=None):
+        """
+        Initialize the cache.
+
+        Args:
+            provider (MarketDataProvider): Data source for misses and refreshes.
+            cache_dir (str): Root directory for cache entries.
+            max_bytes (int): Maximum total size of the cache on disk.
+            ttl_seconds (dict | None): Per-interval TTL overrides, merged
+                                       over DEFAULT_TTL_SECONDS.
+        """
+        self.provider = provider
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.ttl_seconds = dict(DEFAULT_TTL_SECONDS)
+        self.ttl_seconds.update(ttl_seconds or {})
+        self.hits = 0
+        self.misses = 0
+
+        # One lock per (ticker, interval) so different tickers refresh in parallel
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get(self, ticker, period="6mo", interval="1d"):
+        """
+        Return bars for `ticker` covering `period`, fetching only what is missing.
+
+        Args:
+            ticker (str): Stock symbol or index code.
+            period (str): yfinance-style period ('6mo', '1y', 'max', ...).
+            interval (str): Bar interval ('1d', '1h', ...).
+
+        Returns:
+            pandas.DataFrame: OHLCV bars for the requested period.
+        """
+        now = pd.Timestamp.now(tz="UTC")
+        start = period_start(period, now)
+
+        with self._lock_for(ticker, interval):
+            entry_dir = self._entry_dir(ticker, interval)
+            meta = self._read_meta(entry_dir)
+
+            # Step 1: Nothing stored, or stored history does not reach back far enough
+            # Fetch the whole requested period and replace the entry
+            if meta is None or not self._covers(meta, start):
+                self.misses += 1
+                data = self.provider.fetch(ticker, interval=interval, period=period)
+                self._write(entry_dir, data, coverage_start=start, now=now)
+                self._evict(keep=entry_dir)
+
+            # Step 2: Stored history is long enough but older than its TTL
+            # Fetch the tail from the last stored bar onward and merge it in
+            elif now.timestamp() - meta["refreshed_at"] > self._ttl(interval):
+                self.misses += 1
+                stored = self._read(entry_dir, meta)
+                tail_start = (
+                    pd.Timestamp(stored.index[-1]) if len(stored) else start
+                )
+                tail = self.provider.fetch(ticker, interval=interval, start=tail_start)
+                coverage = None if meta["coverage_start"] is None else pd.Timestamp(
+                    meta["coverage_start"], unit="ns", tz="UTC"
+                )
+                self._write(entry_dir, self._merge(stored, tail),
+                            coverage_start=coverage, now=now)
+                self._evict(keep=entry_dir)
+
+            # Step 3: Fresh entry that covers the period - served straight from disk
+            else:
+                self.hits += 1
+
+            data = self._read(entry_dir, self._read_meta(entry_dir))
+
+        # Mark the entry as recently used for LRU eviction
+        self._touch(entry_dir)
+
+        # Return only the rows of the requested period
+        return self._slice(data, start)
+
+    def lookup(self, ticker, period="6mo", interval="1d"):
+        """
+        Return cached bars only if the entry is fresh and covers `period`.
+
+        Unlike `get`, this never contacts the provider. Batch fetchers use it
+        to split a universe into cache hits and tickers that need fetching.
+
+        Returns:
+            pandas.DataFrame | None: Bars for the period, or None on a miss.
+        """
+        now = pd.Timestamp.now(tz="UTC")
+        start = period_start(period, now)
+
+        with self._lock_for(ticker, interval):
+            entry_dir = self._entry_dir(ticker, interval)
+            meta = self._read_meta(entry_dir)
+            if (meta is None or not self._covers(meta, start)
+                    or now.timestamp() - meta["refreshed_at"] > self._ttl(interval)):
+                return None
+            self.hits += 1
+            data = self._read(entry_dir, meta)
+
+        self._touch(entry_dir)
+        return self._slice(data, start)
+
+    def store(self, ticker, data, period="6mo", interval="1d"):
+        """
+        Store bars fetched elsewhere (e.g. by a bulk request) as a full entry.
+
+        Args:
+            ticker (str): Stock symbol or index code.
+            data (pandas.DataFrame): Bars covering `period`.
+            period (str): Period the bars were fetched for.
+            interval (str): Bar interval.
+        """
+        now = pd.Timestamp.now(tz="UTC")
+        with self._lock_for(ticker, interval):
+            self.misses += 1
+            entry_dir = self._entry_dir(ticker, interval)
+            self._write(entry_dir, data, coverage_start=period_start(period, now), now=now)
+            self._evict(keep=entry_dir)
+
+    def invalidate(self, ticker, interval="1d"):
+        """
+        Remove a single entry from the cache.
+        """
+        with self._lock_for(ticker, interval):
+            shutil.rmtree(self._entry_dir(ticker, interval), ignore_errors=True)
+
+    def total_bytes(self):
+        """
+        Return the total size of all cache entries on disk.
+        """
+        return sum(size for _, size, _ in self._entries())
+
+    # ------------------------------------------------------------------
+    # Freshness and coverage rules
+    # ------------------------------------------------------------------
+
+    def _ttl(self, interval):
+        # Unknown intervals fall back to the daily TTL
+        return self.ttl_seconds.get(interval, self.ttl_seconds["1d"])
+
+    @staticmethod
+    def _covers(meta, start):
+        # An entry filled with 'max' covers any start; otherwise compare starts
+        if meta["coverage_start"] is None:
+            return True
+        if start is None:
+            return False
+        return meta["coverage_start"] <= start.value
+
+    @staticmethod
+    def _slice(data, start):
+        # Keep only the bars at or after the requested start
+        if start is None or data.empty:
+            return data
+        return data[_to_utc_ns(data.index) >= start.value]
+
+    @staticmethod
+    def _merge(stored, tail):
+        # Bars from the tail replace any stored bar at or after its first timestamp
+        # (the last stored bar may have been partial when it was written)
+        if tail is None or tail.empty:
+            return stored
+        first_new = _to_utc_ns(tail.index)[0]
+        kept = stored[_to_utc_ns(stored.index) < first_new]
+        return pd.concat([kept, tail])
+
+    # ------------------------------------------------------------------
+    # Storage layout
+    # ------------------------------------------------------------------
+
+    def _lock_for(self, ticker, interval):
+        key = (ticker.upper(), interval)
+        with self._locks_guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _entry_dir(self, ticker, interval):
+        return os.path.join(self.cache_dir, interval, _entry_name(ticker))
+
+    @staticmethod
+    def _read_meta(entry_dir):
+        try:
+            with open(os.path.join(entry_dir, _META_FILE), encoding="utf-8") as handle:
+                return json.load(handle)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, entry_dir, data, coverage_start, now):
+        """
+        Write all columns of `data` into a fresh directory and swap it in atomically.
+        """
+        tmp_dir = f"{entry_dir}.tmp-{os.getpid()}-{threading.get_ident()}"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+
+        # Store timestamps as int64 UTC nanoseconds plus the original timezone
+        index = pd.DatetimeIndex(data.index)
+        np.save(os.path.join(tmp_dir, _INDEX_FILE), _to_utc_ns(index))
+
+        # Store every column as its own contiguous array
+        columns = []
+        for position, column in enumerate(data.columns):
+            file_name = f"{position}.npy"
+            np.save(os.path.join(tmp_dir, file_name), data[column].to_numpy())
+            columns.append({"name": str(column), "file": file_name})
+
+        meta = {
+            "columns": columns,
+            "tz": None if index.tz is None else str(index.tz),
+            "coverage_start": None if coverage_start is None else coverage_start.value,
+            "refreshed_at": now.timestamp(),
+        }
+        with open(os.path.join(tmp_dir, _META_FILE), "w", encoding="utf-8") as handle:
+            json.dump(meta, handle)
+
+        # Replace the previous entry (readers holding memory maps keep their inodes)
+        old_dir = f"{tmp_dir}.old"
+        if os.path.isdir(entry_dir):
+            os.replace(entry_dir, old_dir)
+        os.replace(tmp_dir, entry_dir)
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+    @staticmethod
+    def _read(entry_dir, meta):
+        """
+        Rebuild a DataFrame from the memory-mapped column files of an entry.
+        """
+        stamps = np.load(os.path.join(entry_dir, _INDEX_FILE), mmap_mode="r")
+        index = pd.DatetimeIndex(np.asarray(stamps, dtype="datetime64[ns]"))
+        if meta["tz"] is not None:
+            index = index.tz_localize("UTC").tz_convert(meta["tz"])
+
+        columns = {
+            column["name"]: np.load(os.path.join(entry_dir, column["file"]), mmap_mode="r")
+            for column in meta["columns"]
+        }
+        return pd.DataFrame(columns, index=index)
+
+    # ------------------------------------------------------------------
+    # LRU eviction by total disk size
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _touch(entry_dir):
+        # The metadata file's mtime records the last access for LRU ordering
+        try:
+            os.utime(os.path.join(entry_dir, _META_FILE))
+        except OSError:
+            pass
+
+    def _entries(self):
+        """
+        Yield (entry_dir, size_in_bytes, last_access_time) for every cache entry.
+        """
+        for interval in os.listdir(self.cache_dir):
+            interval_dir = os.path.join(self.cache_dir, interval)
+            if not os.path.isdir(interval_dir):
+                continue
+            for name in os.listdir(interval_dir):
+                entry_dir = os.path.join(interval_dir, name)
+                meta_path = os.path.join(entry_dir, _META_FILE)
+                if not os.path.isfile(meta_path):
+                    continue
+                size = sum(
+                    os.path.getsize(os.path.join(entry_dir, file_name))
+                    for file_name in os.listdir(entry_dir)
+                )
+                yield entry_dir, size, os.path.getmtime(meta_path)
+
+    def _evict(self, keep=None):
+        """
+        Delete least-recently-used entries until the cache fits in max_bytes.
+
+        Args:
+            keep (str | None): Entry directory that must survive (the one just written).
+        """
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        for entry_dir, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            if entry_dir == keep:
+                continue
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total -= size
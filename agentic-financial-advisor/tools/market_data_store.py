@@ -0,0 +1,676 @@
+# ============================================================================
+# market_data_store.py
+# Compact, memory-mapped market data store shared by worker processes
+# One copy of a multi-year, many-ticker universe; workers attach read-only and
+# get zero-copy NumPy / pandas views instead of their own DataFrame copies
+# ============================================================================
+
+# Import json for the store's metadata file
+import json
+
+# Import os and shutil for file system operations (atomic replace, growth, compaction)
+import os
+import shutil
+
+# Import threading so concurrent writers in one process never interleave
+import threading
+
+# Import time to record when every symbol was last written
+import time
+
+# Import numpy for the memory-mapped columns and the symbol index
+import numpy as np
+
+# Import pandas to expose the columns as DataFrames
+import pandas as pd
+
+# Import the freshness defaults and helpers shared with the OHLCV cache
+from tools.market_data_cache import DEFAULT_TTL_SECONDS, _to_utc_ns, period_start
+
+# ============================================================================
+# Store layout defaults
+# ============================================================================
+
+# Location of the default store; workers inherit it through the environment
+# The store is only used once it has been created there (see `fill`)
+DEFAULT_STORE_DIR = os.environ.get("MARKET_DATA_STORE_DIR")
+
+# Columns kept per bar, the same as yfinance history() returns
+# Columns a ticker's data does not have are stored as NaN and left out of its frames
+DEFAULT_FIELDS = ("Open", "High", "Low", "Close", "Volume", "Dividends", "Stock Splits")
+
+# Price precision: float32 halves the footprint of float64 prices
+DEFAULT_DTYPE = "float32"
+
+# Columns always stored as float64, whatever the price precision:
+# float32 has 24 bits of mantissa, so share counts above ~16.7 million lose
+# digits (52345679 reads back as 52345680); float64 is exact up to 2**53
+FULL_PRECISION_FIELDS = ("Volume", "Dividends", "Stock Splits")
+
+# Rows reserved when a store is created, and spare rows per symbol so that
+# daily appends land in place instead of relocating the symbol
+INITIAL_ROWS = 4096
+MIN_HEADROOM_ROWS = 32
+
+# Longest symbol the index can hold (ASCII bytes)
+MAX_SYMBOL_BYTES = 16
+
+# Longest timezone name the index can hold (IANA names such as 'America/New_York')
+MAX_TIMEZONE_BYTES = 48
+
+# Record of the symbol index: where a symbol's bars live in the columns
+# - offset, length, capacity: rows of its segment (used and reserved)
+# - coverage_start: UTC ns of the earliest period the bars cover
+#   (_ALL_HISTORY for 'max')
+# - updated_at: Unix time of the last write
+# - timezone: timezone of the source bars ('' for naive timestamps)
+# - present: bit mask of the fields the source data had
+_INDEX_DTYPE = np.dtype([
+    ("symbol", f"S{MAX_SYMBOL_BYTES}"),
+    ("offset", "<i8"),
+    ("length", "<i8"),
+    ("capacity", "<i8"),
+    ("coverage_start", "<i8"),
+    ("updated_at", "<f8"),
+    ("timezone", f"S{MAX_TIMEZONE_BYTES}"),
+    ("present", "<u8"),
+])
+
+# Coverage marker of symbols filled with all available history
+_ALL_HISTORY = np.iinfo(np.int64).min
+
+# Metadata file: the single pointer to the current data and index files
+_META_FILE = "store.json"
+
+# Name of the timestamp column file inside a data directory
+_STAMPS_FILE = "__index__.bin"
+
+# Version of the on-disk layout
+STORE_VERSION = 2
+
+
+def _headroom(length):
+    # Spare rows reserved behind a segment for future appends
+    return max(MIN_HEADROOM_ROWS, length // 8)
+
+
+class MarketDataStore:
+    """
+    Array-backed OHLCV store in memory-mapped files, indexed by ticker and date.
+
+    All symbols share one contiguous file per column (float32 or float64
+    prices; volumes and corporate actions always float64) plus one int64
+    file of UTC timestamps. A compact symbol index (a NumPy
+    structured array) maps every ticker to the offset and length of its
+    segment, so the bars of a ticker are one contiguous slice of every column.
+
+    The store:
+    - Is written by one process and attached read-only by any number of
+      others; the operating system's page cache holds the single copy
+    - Returns zero-copy views: `columns` gives NumPy slices of the mapped
+      files, `frame` wraps them in a DataFrame without copying the columns,
+      with the columns and timezone of the data that was stored
+    - Appends new bars in place while a segment has spare rows; otherwise
+      (or when bars are replaced) the segment is rewritten at the end of the
+      columns, so rows a reader can already see are never modified
+    - Grows its files as needed and reclaims the space of relocated
+      segments with `compact`
+
+    Readers pick up the writer's changes automatically on their next access.
+    Only one process may write to a store at a time.
+
+    Attributes:
+        path (str): Directory of the store
+        readonly (bool): True for attached readers
+        fields (tuple): Column names
+        dtype (numpy.dtype): Price column precision
+        dtypes (dict): Element type per column
+        interval (str): Bar interval of all stored data
+        max_age_seconds (float): Age after which `get` treats bars as stale
+    """
+
+    def __init__(self, path, readonly=False, fields=DEFAULT_FIELDS, dtype=DEFAULT_DTYPE,
+                 interval="1d", max_age_seconds=None):
+        """
+        Open the store at `path`, creating it if needed (writers only).
+
+        Args:
+            path (str): Store directory.
+            readonly (bool): Attach read-only (worker processes).
+            fields (tuple): Columns of a new store; an existing store keeps its own.
+            dtype (str): Price precision of a new store ('float32' or 'float64');
+                         FULL_PRECISION_FIELDS are always float64.
+            interval (str): Bar interval of a new store.
+            max_age_seconds (float | None): Freshness window used by `get`
+                             (default: the OHLCV cache TTL of the interval).
+
+        Raises:
+            FileNotFoundError: If a read-only store does not exist.
+            ValueError: If the store was written with another layout version.
+        """
+        self.path = path
+        self.readonly = readonly
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._maps = None
+        self._data = None
+
+        meta_path = os.path.join(path, _META_FILE)
+        if not os.path.isfile(meta_path):
+            if readonly:
+                raise FileNotFoundError(f"No market data store at {path!r}")
+            self._create(fields, dtype, interval)
+        self.refresh()
+
+        self.max_age_seconds = (
+            DEFAULT_TTL_SECONDS.get(self.interval, DEFAULT_TTL_SECONDS["1d"])
+            if max_age_seconds is None else max_age_seconds
+        )
+
+    # ------------------------------------------------------------------
+    # Reading (zero-copy)
+    # ------------------------------------------------------------------
+
+    def __contains__(self, ticker):
+        self.refresh()
+        return ticker.strip().upper() in self._positions
+
+    def __len__(self):
+        self.refresh()
+        return len(self._positions)
+
+    def symbols(self):
+        """
+        Return the stored ticker symbols in index order.
+        """
+        self.refresh()
+        return list(self._positions)
+
+    def columns(self, ticker, start=None):
+        """
+        Return zero-copy views of one ticker's timestamps and columns.
+
+        Args:
+            ticker (str): Stock symbol or index code.
+            start (pandas.Timestamp | None): Only bars at or after this time.
+
+        Returns:
+            tuple: (stamps, columns)
+                   - stamps (numpy.ndarray): int64 UTC nanoseconds
+                   - columns (dict): field -> read-only numpy.ndarray view
+
+        Raises:
+            KeyError: If the ticker is not stored.
+        """
+        self.refresh()
+        record = self._index[self._positions[ticker.strip().upper()]]
+        first = int(record["offset"])
+        last = first + int(record["length"])
+        stamps = self._maps[_STAMPS_FILE][first:last]
+        if start is not None:
+            first += int(np.searchsorted(stamps, pd.Timestamp(start).value, side="left"))
+            stamps = self._maps[_STAMPS_FILE][first:last]
+        return stamps, {field: self._maps[field][first:last] for field in self.fields}
+
+    def frame(self, ticker, start=None):
+        """
+        Return one ticker's bars as a DataFrame over the mapped columns.
+
+        The columns are read-only views of the shared files (no copy); only
+        the timestamp index is built per call. Like the OHLCV cache, the
+        frame has the columns the stored data had, indexed in its timezone.
+
+        Raises:
+            KeyError: If the ticker is not stored.
+        """
+        stamps, columns = self.columns(ticker, start=start)
+        record = self._index[self._positions[ticker.strip().upper()]]
+        present = int(record["present"])
+        columns = {field: column for bit, (field, column) in enumerate(columns.items())
+                   if present >> bit & 1}
+        index = pd.DatetimeIndex(stamps.view("datetime64[ns]"), copy=False)
+        timezone = record["timezone"].decode("ascii")
+        if timezone:
+            index = index.tz_localize("UTC").tz_convert(timezone)
+        return pd.DataFrame(columns, index=index, copy=False)
+
+    def get(self, ticker, period="6mo", interval="1d"):
+        """
+        Return bars covering `period` if the store holds them fresh, else None.
+
+        Used by the market data fetchers: a None result makes them fall back
+        to the OHLCV cache and the provider.
+
+        Returns:
+            pandas.DataFrame | None: Bars for the period (zero-copy columns).
+        """
+        if interval != self.interval:
+            return None
+        self.refresh()
+        position = self._positions.get(ticker.strip().upper())
+        if position is None:
+            return None
+        record = self._index[position]
+        now = pd.Timestamp.now(tz="UTC")
+        start = period_start(period, now)
+        covered = record["coverage_start"] == _ALL_HISTORY or (
+            start is not None and record["coverage_start"] <= start.value
+        )
+        if not covered or now.timestamp() - record["updated_at"] > self.max_age_seconds:
+            return None
+        return self.frame(ticker, start=start)
+
+    def frames(self, tickers, period="6mo"):
+        """
+        Return {ticker: bars} for every requested ticker the store can serve.
+
+        The result can be passed to `compute_signals` and `return_matrix`
+        like the output of `fetch_market_data_many`.
+        """
+        frames = {}
+        for ticker in tickers:
+            data = self.get(ticker, period=period, interval=self.interval)
+            if data is not None:
+                frames[ticker.strip().upper()] = data
+        return frames
+
+    def refresh(self):
+        """
+        Pick up changes made by the writer since the last access.
+
+        Returns:
+            bool: True if the index was reloaded.
+        """
+        meta_path = os.path.join(self.path, _META_FILE)
+        # The writer swaps the metadata file atomically, so a new inode or
+        # modification time means a new index
+        stat = os.stat(meta_path)
+        stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if stamp == self._stamp:
+            return False
+
+        # A concurrent swap may delete the index file named by the metadata
+        # just read; read again in that case
+        for attempt in range(3):
+            with open(meta_path, encoding="utf-8") as handle:
+                meta = json.load(handle)
+            try:
+                index = np.load(os.path.join(self.path, meta["symbols"]))
+                break
+            except FileNotFoundError:
+                if attempt == 2:
+                    raise
+        self._apply(meta, index)
+        self._stamp = stamp
+        return True
+
+    # ------------------------------------------------------------------
+    # Writing (single writer process)
+    # ------------------------------------------------------------------
+
+    def put(self, ticker, data, period=None):
+        """
+        Store the full history of one ticker, replacing what is stored.
+
+        Args:
+            ticker (str): Stock symbol or index code.
+            data (pandas.DataFrame): OHLCV bars indexed by timestamp.
+            period (str | None): Period the bars were fetched for; recorded
+                         as their coverage (default: from the first bar).
+        """
+        self.put_many({ticker: data}, period=period)
+
+    def put_many(self, frames, period=None):
+        """
+        Store the full history of several tickers with one index update.
+        """
+        coverage = self._coverage(period)
+        self._write({ticker: (data, coverage, False) for ticker, data in frames.items()})
+
+    def append(self, ticker, data):
+        """
+        Add new bars to one ticker (incremental refresh).
+
+        Bars at or after the first new timestamp replace stored ones, as the
+        last stored bar may have been partial when it was written.
+        """
+        self.append_many({ticker: data})
+
+    def append_many(self, frames):
+        """
+        Add new bars to several tickers with one index update.
+        """
+        self._write({ticker: (data, None, True) for ticker, data in frames.items()})
+
+    def fill(self, tickers, period="1y", **fetch_options):
+        """
+        Fetch `tickers` through `fetch_market_data_many` and store them.
+
+        Args:
+            tickers (iterable): Symbols to load.
+            period (str): History to load (e.g. '5y').
+            **fetch_options: Passed to `fetch_market_data_many`.
+
+        Returns:
+            dict: Mapping of ticker -> error message for symbols not stored.
+
+        Example:
+            >>> store = MarketDataStore("/dev/shm/market_data")
+            >>> errors = store.fill(universe, period="5y")
+        """
+        from tools.market_data_tool import fetch_market_data_many, get_default_cache
+        # Symbols already stored fresh for the period are not fetched again
+        pending = [ticker for ticker in tickers if self.get(ticker, period=period, interval=self.interval) is None]
+        if not pending:
+            return {}
+        data, errors = fetch_market_data_many(pending, period=period, interval=self.interval,
+                                              **fetch_options)
+        if not data.empty:
+            # The aligned result shares one index (local dates for daily bars)
+            # and the union of all columns; the per-ticker frames the fetch
+            # just cached keep each ticker's own columns and timezone
+            cache = get_default_cache() if fetch_options.get("use_cache", True) else None
+            frames = {}
+            for ticker in data.columns.get_level_values(0).unique():
+                frame = cache.lookup(ticker, period=period, interval=self.interval) if cache else None
+                if frame is None:
+                    frame = data[ticker].dropna(how="all").dropna(axis=1, how="all")
+                frames[ticker] = frame
+            self.put_many(frames, period=period)
+        return errors
+
+    def compact(self):
+        """
+        Rewrite the live segments contiguously and release relocated space.
+
+        Readers keep their current mappings valid until they refresh.
+        """
+        self._check_writable()
+        with self._lock:
+            self.refresh()
+            index = self._index.copy()
+            live = int(index["length"].sum() + sum(_headroom(int(n)) for n in index["length"]))
+            data_name = f"data-{int(self._meta['epoch']) + 1}"
+            maps = self._create_columns(os.path.join(self.path, data_name), max(live, INITIAL_ROWS))
+
+            # Copy every segment into its new, tightly packed position
+            offset = 0
+            for record in index:
+                first, length = int(record["offset"]), int(record["length"])
+                for name, column in maps.items():
+                    column[offset:offset + length] = self._maps[name][first:first + length]
+                record["offset"] = offset
+                record["capacity"] = length + _headroom(length)
+                offset += int(record["capacity"])
+            for column in maps.values():
+                column.flush()
+
+            old_data = self._data
+            self._commit(index, rows=offset, data=data_name, epoch=int(self._meta["epoch"]) + 1)
+            shutil.rmtree(os.path.join(self.path, old_data), ignore_errors=True)
+
+    def stats(self):
+        """
+        Return the size of the store: symbols, used and live rows, bytes on disk.
+        """
+        self.refresh()
+        live = int(self._index["length"].sum())
+        rows = int(self._meta["rows"])
+        data_dir = os.path.join(self.path, self._data)
+        return {
+            "symbols": len(self._positions),
+            "rows": rows,
+            "live_rows": live,
+            "dead_rows": rows - int(self._index["capacity"].sum()),
+            "bytes": sum(os.path.getsize(os.path.join(data_dir, name)) for name in os.listdir(data_dir)),
+        }
+
+    # ------------------------------------------------------------------
+    # Storage layout
+    # ------------------------------------------------------------------
+
+    def _create(self, fields, dtype, interval):
+        # Empty columns with INITIAL_ROWS reserved, an empty index and metadata
+        os.makedirs(self.path, exist_ok=True)
+        self.fields = tuple(str(field) for field in fields)
+        if len(self.fields) > 64:
+            raise ValueError("A store holds at most 64 fields")
+        self.dtype = np.dtype(dtype)
+        self.dtypes = {
+            field: np.dtype("float64") if field in FULL_PRECISION_FIELDS else self.dtype
+            for field in self.fields
+        }
+        self.interval = interval
+        self._create_columns(os.path.join(self.path, "data-0"), INITIAL_ROWS)
+        self._meta = {
+            "version": STORE_VERSION,
+            "interval": interval,
+            "dtype": self.dtype.name,
+            "dtypes": {field: dtype.name for field, dtype in self.dtypes.items()},
+            "fields": list(self.fields),
+            "epoch": 0,
+            "sequence": 0,
+        }
+        self._commit(np.empty(0, dtype=_INDEX_DTYPE), rows=0, data="data-0", epoch=0)
+
+    def _files(self):
+        # Column file name -> element type
+        files = {_STAMPS_FILE: np.dtype("<i8")}
+        files.update(self.dtypes)
+        return files
+
+    @staticmethod
+    def _file_name(name):
+        # Fields get a position-independent, file-system-safe name
+        return name if name == _STAMPS_FILE else "".join(
+            char if char.isalnum() else f"_{ord(char):X}" for char in name
+        ) + ".bin"
+
+    def _create_columns(self, data_dir, rows):
+        # Sparse files of `rows` rows, mapped for writing
+        os.makedirs(data_dir, exist_ok=True)
+        for name, dtype in self._files().items():
+            with open(os.path.join(data_dir, self._file_name(name)), "wb") as handle:
+                handle.truncate(rows * dtype.itemsize)
+        return self._map(data_dir, mode="r+")
+
+    def _map(self, data_dir, mode):
+        # Map every column over the file's current size
+        maps = {}
+        for name, dtype in self._files().items():
+            path = os.path.join(data_dir, self._file_name(name))
+            rows = os.path.getsize(path) // dtype.itemsize
+            maps[name] = np.memmap(path, dtype=dtype, mode=mode, shape=(rows,))
+        return maps
+
+    def _apply(self, meta, index):
+        # Adopt a (new) metadata/index pair; remap when the columns moved or grew
+        if meta.get("version") != STORE_VERSION:
+            raise ValueError(
+                f"Market data store {self.path!r} has layout version {meta.get('version')}, "
+                f"expected {STORE_VERSION}; recreate it with fill()"
+            )
+        self.fields = tuple(meta["fields"])
+        self.dtype = np.dtype(meta["dtype"])
+        self.dtypes = {field: np.dtype(name) for field, name in meta["dtypes"].items()}
+        self.interval = meta["interval"]
+        mapped_rows = len(self._maps[_STAMPS_FILE]) if self._maps else -1
+        if self._maps is None or meta["data"] != self._data or meta["rows"] > mapped_rows:
+            self._maps = self._map(os.path.join(self.path, meta["data"]),
+                                   mode="r" if self.readonly else "r+")
+            self._data = meta["data"]
+        self._meta = meta
+        self._index = index
+        self._positions = {symbol.decode("ascii"): position
+                           for position, symbol in enumerate(index["symbol"])}
+
+    def _commit(self, index, rows, data, epoch):
+        """
+        Publish a new index: write it under a new name, then swap the metadata.
+        """
+        sequence = int(self._meta.get("sequence", 0)) + 1
+        symbols = f"symbols-{sequence}.npy"
+        with open(os.path.join(self.path, symbols), "wb") as handle:
+            np.save(handle, index)
+
+        previous = self._meta.get("symbols")
+        meta = dict(self._meta, rows=rows, data=data, epoch=epoch, sequence=sequence, symbols=symbols)
+        tmp_path = os.path.join(self.path, f"{_META_FILE}.tmp-{os.getpid()}")
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(meta, handle)
+        os.replace(tmp_path, os.path.join(self.path, _META_FILE))
+        if previous:
+            try:
+                os.remove(os.path.join(self.path, previous))
+            except OSError:
+                pass
+        self.refresh()
+
+    def _check_writable(self):
+        if self.readonly:
+            raise PermissionError(f"Market data store {self.path!r} is attached read-only")
+
+    @staticmethod
+    def _coverage(period):
+        # Coverage recorded for a full fill (None: from the first bar)
+        if period is None:
+            return None
+        start = period_start(period)
+        return _ALL_HISTORY if start is None else start.value
+
+    def _grow(self, rows):
+        # Extend every column file to at least `rows` rows and remap
+        current = len(self._maps[_STAMPS_FILE])
+        if rows <= current:
+            return
+        target = max(rows, 2 * current)
+        data_dir = os.path.join(self.path, self._data)
+        for column in self._maps.values():
+            column.flush()
+        for name, dtype in self._files().items():
+            os.truncate(os.path.join(data_dir, self._file_name(name)), target * dtype.itemsize)
+        self._maps = self._map(data_dir, mode="r+")
+
+    def _write(self, items):
+        """
+        Write bars for several tickers, then publish the index once.
+
+        Args:
+            items (dict): ticker -> (data, coverage, append)
+        """
+        self._check_writable()
+        with self._lock:
+            self.refresh()
+            index = self._index.copy()
+            positions = dict(self._positions)
+            rows = int(self._meta["rows"])
+            now = time.time()
+
+            # Step 1: Plan every write - in place or in a new segment at the end
+            writes = []
+            new_records = []
+            for ticker, (data, coverage, append) in items.items():
+                symbol = ticker.strip().upper()
+                if len(symbol.encode("ascii")) > MAX_SYMBOL_BYTES:
+                    raise ValueError(f"Symbol {ticker!r} is longer than {MAX_SYMBOL_BYTES} characters")
+                stamps, values, timezone, present = self._prepare(data)
+                position = positions.get(symbol)
+                record = index[position] if position is not None else None
+
+                if append and record is not None and len(stamps):
+                    first, length = int(record["offset"]), int(record["length"])
+                    stored = self._maps[_STAMPS_FILE][first:first + length]
+                    kept = int(np.searchsorted(stored, stamps[0], side="left"))
+                    if kept == length and length + len(stamps) <= record["capacity"]:
+                        # Pure append into the spare rows of the segment
+                        writes.append((first + length, stamps, values))
+                        record["length"] = length + len(stamps)
+                        record["updated_at"] = now
+                        record["timezone"] = timezone
+                        record["present"] = int(record["present"]) | present
+                        continue
+                    # Keep the stored bars before the tail and move the symbol
+                    stamps = np.concatenate([stored[:kept], stamps])
+                    values = {field: np.concatenate([self._maps[field][first:first + kept], values[field]])
+                              for field in self.fields}
+                    coverage = int(record["coverage_start"])
+                    present |= int(record["present"])
+                elif append and record is not None:
+                    record["updated_at"] = now
+                    continue
+
+                # A new segment with headroom at the end of the columns
+                capacity = len(stamps) + _headroom(len(stamps))
+                writes.append((rows, stamps, values))
+                if coverage is None:
+                    coverage = int(stamps[0]) if len(stamps) else _ALL_HISTORY
+                fields = (symbol.encode("ascii"), rows, len(stamps), capacity, coverage, now,
+                          timezone, present)
+                if record is not None:
+                    index[position] = fields
+                else:
+                    positions[symbol] = len(index) + len(new_records)
+                    new_records.append(fields)
+                rows += capacity
+
+            # Step 2: Grow the files if needed, write the bars and flush them
+            self._grow(rows)
+            for offset, stamps, values in writes:
+                self._maps[_STAMPS_FILE][offset:offset + len(stamps)] = stamps
+                for field in self.fields:
+                    self._maps[field][offset:offset + len(stamps)] = values[field]
+            for column in self._maps.values():
+                column.flush()
+
+            # Step 3: Publish the new index (readers switch over atomically)
+            if new_records:
+                index = np.concatenate([index, np.array(new_records, dtype=_INDEX_DTYPE)])
+            self._commit(index, rows=rows, data=self._data, epoch=int(self._meta["epoch"]))
+
+    def _prepare(self, data):
+        # Sorted, unique UTC timestamps, one array per stored field, the
+        # timezone of the index and the bit mask of the fields data has
+        data = data[~data.index.duplicated(keep="last")]
+        if not data.index.is_monotonic_increasing:
+            data = data.sort_index()
+        index = pd.DatetimeIndex(data.index)
+        stamps = _to_utc_ns(index)
+        timezone = b"" if index.tz is None else str(index.tz).encode("ascii")
+        if len(timezone) > MAX_TIMEZONE_BYTES:
+            raise ValueError(f"Timezone {index.tz!s} is longer than {MAX_TIMEZONE_BYTES} characters")
+        values = {
+            field: (data[field].to_numpy(dtype=self.dtypes[field], na_value=np.nan) if field in data.columns
+                    else np.full(len(data), np.nan, dtype=self.dtypes[field]))
+            for field in self.fields
+        }
+        present = sum(1 << bit for bit, field in enumerate(self.fields) if field in data.columns)
+        return stamps, values, timezone, present
+
+
+# Process-wide store used by the market data fetchers, opened on first use
+_default_store = None
+
+
+def get_default_store():
+    """
+    Return the shared market data store, or None if none is configured.
+
+    Processes started with MARKET_DATA_STORE_DIR pointing at an existing
+    store attach to it read-only on first use.
+    """
+    global _default_store
+    if _default_store is None and DEFAULT_STORE_DIR and os.path.isfile(
+            os.path.join(DEFAULT_STORE_DIR, _META_FILE)):
+        _default_store = MarketDataStore(DEFAULT_STORE_DIR, readonly=True)
+    return _default_store
+
+
+def set_default_store(store):
+    """
+    Replace the process-wide store (None disables it).
+
+    Example:
+        >>> set_default_store(MarketDataStore("/dev/shm/market_data"))
+    """
+    global _default_store
+    _default_store = store
@@ -4,11 +4,187 @@
 # Provides functions to retrieve real-time and historical market data
 # ============================================================================
 
-# Import yfinance library for accessing financial market data
-# yfinance allows easy retrieval of stock prices, historical data, and other market information
-import yfinance as yf
+# Import random and time for jittered retry backoff
+import random
+import time
 
-def fetch_market_data(ticker: str, period: str = "6mo"):
+# Import threading for the per-host concurrency limits of batch fetches
+import threading
+
+# Import the thread pool used to run bulk requests concurrently
+from concurrent.futures import ThreadPoolExecutor
+
+# Import pandas to assemble the aligned multi-ticker DataFrame
+import pandas as pd
+
+# Import the persistent OHLCV cache and the provider interface it is built on
+from tools.market_data_cache import MarketDataProvider, OHLCVCache
+
+# Import the shared memory-mapped store, consulted before the cache when configured
+from tools.market_data_store import get_default_store
+
+# Import span tracing to time fetches and record cache hits, retries and queue wait
+from tools.tracing import span
+
+class YFinanceProvider(MarketDataProvider):
+    """
+    Market data provider backed by Yahoo Finance (via yfinance).
+
+    This is the default provider used by `fetch_market_data` and the OHLCV cache.
+
+    Attributes:
+        timezones (dict): Exchange timezone per ticker, remembered from earlier
+                          fetches so bulk downloads can be indexed without a
+                          per-ticker lookup
+    """
+
+    # Yahoo Finance answers bulk downloads from a single host
+    host = "query1.finance.yahoo.com"
+
+    # yf.download accepts many symbols per request; keep groups moderate
+    max_batch_size = 50
+
+    def __init__(self):
+        self.timezones = {}
+
+    def fetch(self, ticker, interval="1d", period=None, start=None):
+        """
+        Fetch bars for one ticker from Yahoo Finance.
+
+        Uses `period` for a full fetch and `start` for an incremental tail fetch.
+        """
+        # Import yfinance on first fetch; it is slow to import and only needed here
+        import yfinance as yf
+        stock = yf.Ticker(ticker)
+        if start is not None:
+            data = stock.history(start=start, interval=interval)
+        else:
+            data = stock.history(period=period, interval=interval)
+        if getattr(data.index, "tz", None) is not None:
+            self.timezones[ticker] = str(data.index.tz)
+        return data
+
+    def fetch_many(self, tickers, interval="1d", period=None):
+        """
+        Fetch bars for several tickers with one `yf.download` request.
+
+        Tickers without any rows in the response are left out of the result,
+        so the caller can report them as per-ticker errors. Every frame is
+        indexed in its exchange timezone, like the bars from `fetch`, so
+        cache entries filled by either path can be merged safely.
+        """
+        import yfinance as yf
+        # yfinance keeps a persistent per-ticker timezone cache, filled by the
+        # download itself, so resolving the timezones below costs no requests
+        from yfinance.cache import get_tz_cache
+        # ignore_tz keeps every ticker's bars in exchange local time (naive);
+        # they are localized to the exchange timezone below
+        data = yf.download(
+            tickers=list(tickers), period=period, interval=interval,
+            group_by="ticker", auto_adjust=True, actions=True,
+            threads=False, progress=False, ignore_tz=True,
+        )
+        frames = {}
+        for ticker in tickers:
+            # Multi-ticker responses carry the ticker as the first column level
+            if isinstance(data.columns, pd.MultiIndex):
+                if ticker not in data.columns.get_level_values(0):
+                    continue
+                frame = data[ticker]
+            else:
+                frame = data
+            frame = frame.dropna(how="all")
+            if not frame.empty:
+                frames[ticker] = _in_timezone(frame, self._timezone(ticker, get_tz_cache()))
+        return frames
+
+    def _timezone(self, ticker, tz_cache):
+        """
+        Return the exchange timezone of `ticker` from the memo or yfinance's
+        timezone cache; only if both miss (e.g. the cache is disabled) is it
+        looked up with a request.
+        """
+        if ticker not in self.timezones:
+            import yfinance as yf
+            self.timezones[ticker] = tz_cache.lookup(ticker) or yf.Ticker(ticker).fast_info["timezone"]
+        return self.timezones[ticker]
+
+def _in_timezone(frame, tz):
+    """
+    Return `frame` indexed in timezone `tz` (naive timestamps are local time in `tz`).
+    """
+    index = pd.DatetimeIndex(frame.index)
+    index = index.tz_localize(tz) if index.tz is None else index.tz_convert(tz)
+    return frame.set_axis(index, axis=0)
+
+def align_frames(frames):
+    """
+    Join per-ticker bars into one DataFrame with (ticker, field) columns.
+
+    Tickers from different exchanges keep their bars in different timezones,
+    so daily (and longer) bars fall on different UTC instants for the same
+    trading day. Daily bars are therefore aligned on their local calendar
+    date; intraday bars are aligned on UTC time. A ticker without a bar on a
+    date (holiday, weekend) has NaN there; nothing is forward-filled.
+
+    Args:
+        frames (dict): Mapping of ticker -> DataFrame of bars.
+
+    Returns:
+        pandas.DataFrame: Bars on the union of all dates, tickers in input order.
+    """
+    frames = {ticker: frame for ticker, frame in frames.items() if frame is not None}
+    if not frames:
+        return pd.DataFrame()
+
+    # Local wall-clock time of every bar (naive indexes already are local)
+    local = {
+        ticker: pd.DatetimeIndex(frame.index).tz_localize(None)
+        for ticker, frame in frames.items()
+    }
+    daily = all((index == index.normalize()).all() for index in local.values())
+
+    aligned = {}
+    for ticker, frame in frames.items():
+        index = pd.DatetimeIndex(frame.index)
+        if daily:
+            index = local[ticker]
+        elif index.tz is not None:
+            index = index.tz_convert("UTC")
+        else:
+            index = index.tz_localize("UTC")
+        aligned[ticker] = frame.set_axis(index, axis=0)
+    return pd.concat(aligned, axis=1, sort=True)
+
+# Shared cache instance, created on first use so importing this module stays cheap
+_default_cache = None
+
+def get_default_cache():
+    """
+    Return the process-wide OHLCV cache used by `fetch_market_data`.
+
+    The cache is backed by Yahoo Finance and created lazily on first access.
+    """
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = OHLCVCache(YFinanceProvider())
+    return _default_cache
+
+def set_default_cache(cache):
+    """
+    Replace the process-wide OHLCV cache.
+
+    Use this to plug in another provider (e.g. a fake source for offline tests)
+    or a cache with a different location, size limit or TTL policy.
+
+    Example:
+        >>> set_default_cache(OHLCVCache(MyFakeProvider(), cache_dir="/tmp/ohlcv"))
+    """
+    global _default_cache
+    _default_cache = cache
+
+def fetch_market_data(ticker: str, period: str = "6mo", interval: str = "1d",
+                      use_cache: bool = True):
     """
     Fetch historical market data for a given stock or index from Yahoo Finance.
     
@@ -19,6 +195,11 @@ def fetch_market_data(ticker: str, period: str = "6mo"):
     4. Returns the data as a pandas DataFrame
     5. Handles exceptions and provides error messages
     
+    Data is served from the persistent OHLCV cache (see `get_default_cache`):
+    repeated calls reuse stored bars and only the missing tail is fetched.
+    When a shared market data store is configured (see `get_default_store`),
+    fresh bars it holds are returned as zero-copy views without a cache read.
+    
     Args:
         ticker (str): Stock symbol or index code
                      Examples:
@@ -39,6 +220,12 @@ def fetch_market_data(ticker: str, period: str = "6mo"):
                      - '5y': 5 years
                      - '10y': 10 years
                      - 'max': All available data
+        
+        interval (str): Bar interval (default: '1d')
+                     Examples: '1m', '1h', '1d', '1wk'
+        
+        use_cache (bool): Serve the data through the OHLCV cache (default: True)
+                     Set to False to always fetch directly from the provider
     
     Returns:
         pandas.DataFrame: Historical price data with the following columns:
@@ -62,14 +249,25 @@ def fetch_market_data(ticker: str, period: str = "6mo"):
     
     # Wrap the data fetching logic in try-except for error handling
     try:
-        # Step 1: Create a Ticker object for the given stock symbol
-        # The Ticker class manages all interactions with that specific stock
-        stock = yf.Ticker(ticker)
-        
-        # Step 2: Retrieve historical price data for the specified period
-        # The history() method fetches data from Yahoo Finance servers
-        # It returns a DataFrame indexed by date with OHLCV data (Open, High, Low, Close, Volume)
-        data = stock.history(period=period)
+        # Step 1: Serve the request from the shared store or the OHLCV cache when enabled
+        # The store maps one copy of the bars for all processes; the cache
+        # returns stored bars and only fetches the missing tail
+        with span("market_data.fetch", ticker=ticker, period=period) as current:
+            store = get_default_store() if use_cache else None
+            data = store.get(ticker, period=period, interval=interval) if store is not None else None
+            if data is not None:
+                current.set("store_hits", 1)
+            elif use_cache:
+                cache = get_default_cache()
+                hits = cache.hits
+                data = cache.get(ticker, period=period, interval=interval)
+                current.set("cache_hits", cache.hits - hits)
+            
+            # Step 2: Otherwise fetch directly from the provider
+            # The history() method fetches data from Yahoo Finance servers
+            # It returns a DataFrame indexed by date with OHLCV data (Open, High, Low, Close, Volume)
+            else:
+                data = YFinanceProvider().fetch(ticker, interval=interval, period=period)
         
         # Step 3: Return the retrieved data
         # The caller can now use this data for analysis, calculations, charting, etc.
@@ -85,3 +283,182 @@ def fetch_market_data(ticker: str, period: str = "6mo"):
         # - Yahoo Finance service temporarily unavailable
         # - Invalid period parameter
         raise RuntimeError(f"Market data fetch failed: {error}")
+
+# ============================================================================
+# Batched, concurrent multi-ticker fetching
+# ============================================================================
+
+# Default number of bulk requests that may run at the same time
+DEFAULT_MAX_WORKERS = 8
+
+# Default number of concurrent requests allowed against a single upstream host
+DEFAULT_PER_HOST_LIMIT = 4
+
+# Default retry policy for bulk requests (attempts and base backoff in seconds)
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF_SECONDS = 0.5
+
+# Semaphores limiting concurrent requests per upstream host, shared across calls
+_host_limits = {}
+_host_limits_guard = threading.Lock()
+
+def _host_semaphore(host, limit):
+    """
+    Return the shared semaphore that caps concurrent requests to `host`.
+    """
+    with _host_limits_guard:
+        if host not in _host_limits:
+            _host_limits[host] = threading.BoundedSemaphore(limit)
+        return _host_limits[host]
+
+def _with_retries(request, retries, backoff_seconds, on_retry=None):
+    """
+    Call `request()` up to `retries` times with full-jitter exponential backoff.
+
+    `on_retry()`, if given, is called before every retry (used for tracing).
+
+    Returns:
+        tuple: (result, attempts) of the first successful call.
+
+    Raises:
+        Exception: The error of the last attempt if every attempt fails.
+    """
+    for attempt in range(1, retries + 1):
+        try:
+            return request(), attempt
+        except Exception:
+            if attempt == retries:
+                raise
+            if on_retry is not None:
+                on_retry()
+            # Full jitter: sleep a random time up to the exponential backoff cap
+            time.sleep(random.uniform(0, backoff_seconds * 2 ** (attempt - 1)))
+
+def fetch_market_data_many(tickers, period: str = "6mo", interval: str = "1d",
+                           use_cache: bool = True, provider=None,
+                           max_workers: int = DEFAULT_MAX_WORKERS,
+                           per_host_limit: int = DEFAULT_PER_HOST_LIMIT,
+                           retries: int = DEFAULT_RETRIES,
+                           backoff_seconds: float = DEFAULT_BACKOFF_SECONDS):
+    """
+    Fetch historical market data for many tickers at once.
+    
+    This function:
+    1. Deduplicates the requested symbols (case-insensitive, order preserved)
+    2. Serves fresh, covering entries straight from the shared market data
+       store (if configured) or the OHLCV cache
+    3. Groups the remaining symbols into bulk provider requests
+    4. Runs the groups on a bounded thread pool, limited per upstream host
+    5. Retries failed groups with jittered backoff, then falls back to
+       per-ticker requests so one bad symbol cannot fail its whole group
+    6. Aligns all results into one DataFrame with (ticker, field) columns
+       (daily bars on each exchange's local calendar date, see `align_frames`)
+    
+    Args:
+        tickers (iterable): Stock symbols or index codes (e.g. ['AAPL', '^NSEI'])
+        period (str): Time duration for historical data (default: '6mo')
+        interval (str): Bar interval (default: '1d')
+        use_cache (bool): Read from the shared store and read from and write to
+                     the OHLCV cache (default: True)
+        provider (MarketDataProvider | None): Data source for the bulk requests
+                     Defaults to the provider of the shared OHLCV cache
+        max_workers (int): Maximum number of bulk requests in flight
+        per_host_limit (int): Maximum concurrent requests per upstream host
+        retries (int): Attempts per bulk request before falling back
+        backoff_seconds (float): Base delay for the exponential backoff
+    
+    Returns:
+        tuple: (data, errors)
+               - data (pandas.DataFrame): Bars aligned on a shared index, with
+                 MultiIndex columns (ticker, field) in request order and NaN
+                 where a ticker has no bar
+               - errors (dict): Mapping of ticker -> error message for every
+                 symbol that could not be fetched
+    
+    Example:
+        >>> data, errors = fetch_market_data_many(['AAPL', 'MSFT', '^NSEI'], '1y')
+        >>> closes = data.xs('Close', axis=1, level=1)  # One column per ticker
+    """
+    
+    # The whole call is one span: cache hits, retries and time spent waiting
+    # for the per-host limit are recorded on it
+    with span("market_data.fetch_many", period=period, interval=interval) as current:
+        # Step 1: Deduplicate symbols while preserving the caller's order
+        symbols = list(dict.fromkeys(ticker.strip().upper() for ticker in tickers))
+        current.set("tickers", len(symbols))
+        cache = get_default_cache() if use_cache else None
+        if provider is None:
+            provider = cache.provider if cache is not None else YFinanceProvider()
+        
+        frames = {}
+        errors = {}
+        
+        # Step 2: Take every fresh store or cache hit and collect the symbols still missing
+        store = get_default_store() if use_cache else None
+        missing = []
+        store_hits = 0
+        for ticker in symbols:
+            stored = store.get(ticker, period=period, interval=interval) if store is not None else None
+            if stored is not None:
+                frames[ticker] = stored
+                store_hits += 1
+                continue
+            cached = cache.lookup(ticker, period=period, interval=interval) if cache else None
+            if cached is None:
+                missing.append(ticker)
+            else:
+                frames[ticker] = cached
+        current.set("store_hits", store_hits)
+        current.set("cache_hits", len(frames) - store_hits)
+        
+        # Step 3: Split the missing symbols into bulk request groups
+        size = max(1, provider.max_batch_size)
+        groups = [missing[i:i + size] for i in range(0, len(missing), size)]
+        limit = _host_semaphore(provider.host, per_host_limit)
+        
+        def fetch_group(group):
+            # Each group respects the per-host limit and retries with backoff
+            def request():
+                waiting = time.perf_counter()
+                with limit:
+                    current.add("queue_wait_s", time.perf_counter() - waiting)
+                    return provider.fetch_many(group, interval=interval, period=period)
+            try:
+                fetched, _ = _with_retries(
+                    request, retries, backoff_seconds, on_retry=lambda: current.add("retries")
+                )
+                return fetched, {}
+            except Exception as error:
+                if len(group) == 1:
+                    return {}, {group[0]: f"Market data fetch failed: {error}"}
+        
+            # The bulk request kept failing: isolate the bad symbols one by one
+            fetched, failed = {}, {}
+            for ticker in group:
+                single_fetched, single_failed = fetch_group([ticker])
+                fetched.update(single_fetched)
+                failed.update(single_failed)
+            return fetched, failed
+        
+        # Step 4: Run the groups concurrently on a bounded thread pool
+        if groups:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(groups))) as pool:
+                for fetched, failed in pool.map(fetch_group, groups):
+                    errors.update(failed)
+                    for ticker, frame in fetched.items():
+                        if frame is None or frame.empty:
+                            continue
+                        frames[ticker] = frame
+                        if cache is not None:
+                            cache.store(ticker, frame, period=period, interval=interval)
+        
+        # Step 5: Symbols that came back without any rows are per-ticker errors
+        for ticker in missing:
+            if ticker not in frames and ticker not in errors:
+                errors[ticker] = "Market data fetch failed: no data returned"
+        
+        # Step 6: Align everything into one (ticker, field) column MultiIndex
+        ordered = {ticker: frames[ticker] for ticker in symbols if ticker in frames}
+        data = align_frames(ordered)
+        current.set("errors", len(errors))
+        return data, errors
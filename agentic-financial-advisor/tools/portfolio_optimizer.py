@@ -0,0 +1,416 @@
+# ============================================================================
+# portfolio_optimizer.py
+# Vectorized portfolio construction on historical returns
+# Min-variance, risk-parity, max-Sharpe and efficient-frontier allocations
+# ============================================================================
+
+# Import json to return the tool result as compact JSON text
+import json
+
+# Import Annotated to describe the tool parameters to the LLM
+from typing import Annotated
+
+# Import numpy for the batched linear algebra
+import numpy as np
+
+# The indicator engine and the market data fetcher are imported inside the
+# functions using them: they pull in pandas, which agents loading this module
+# as a tool do not need until the tool actually runs
+
+# Number of trading periods per year (same as tools.indicators)
+TRADING_DAYS_PER_YEAR = 252
+
+# Risk aversion of the client risk profiles (higher = closer to min-variance)
+RISK_PROFILES = {
+    "conservative": 10.0,
+    "moderate": 4.0,
+    "aggressive": 1.5,
+}
+
+# Default iteration limit and tolerance of the projected-gradient solver
+DEFAULT_ITERATIONS = 1000
+DEFAULT_TOLERANCE = 1e-9
+
+
+def return_matrix(data, field="Close"):
+    """
+    Build the matrix of simple returns from fetched market data.
+
+    Returns are taken between the dates on which every ticker has a bar, so
+    each return spans the same interval for all tickers. A date on which any
+    ticker has no bar (holiday, weekend) is skipped and the next return spans
+    it; no price is filled in, which would add fake zero returns.
+
+    Args:
+        data (pandas.DataFrame | dict): Output of `fetch_market_data_many`, or
+                     a mapping of ticker -> DataFrame from `fetch_market_data`.
+        field (str): Price column to use (default: 'Close').
+
+    Returns:
+        tuple: (tickers, returns) with returns of shape (periods, tickers)
+    """
+    from tools.indicators import price_matrix, simple_returns
+    _, tickers, prices = price_matrix(data, field)
+    common = prices[~np.isnan(prices).any(axis=1)]
+    return tickers, simple_returns(common)[1:]
+
+
+def shrinkage_covariance(returns):
+    """
+    Ledoit-Wolf covariance estimate, shrunk towards a scaled identity.
+
+    The sample covariance of a few months of daily data is noisy; shrinking it
+    keeps the optimizers from betting on estimation error.
+
+    Args:
+        returns (numpy.ndarray): Returns of shape (periods, assets).
+
+    Returns:
+        tuple: (covariance, shrinkage) - the (assets, assets) estimate per
+               period and the shrinkage intensity in [0, 1]
+    """
+    periods, assets = returns.shape
+    centered = returns - returns.mean(axis=0)
+    sample = centered.T @ centered / periods
+
+    # Target: identity scaled by the average variance
+    scale = np.trace(sample) / assets
+    target = scale * np.eye(assets)
+
+    # Optimal intensity (Ledoit & Wolf 2004); sum_t ||x_t x_t' - S||^2 is
+    # computed as sum_t ||x_t||^4 - T ||S||^2 to avoid the (T, N, N) tensor
+    distance = np.sum((sample - target) ** 2) / assets
+    spread = (np.sum(np.sum(centered ** 2, axis=1) ** 2) - periods * np.sum(sample ** 2))
+    spread = min(spread / periods ** 2 / assets, distance)
+    shrinkage = spread / distance if distance > 0 else 1.0
+    return shrinkage * target + (1.0 - shrinkage) * sample, shrinkage
+
+
+def project_to_simplex(weights):
+    """
+    Euclidean projection of every row onto {w >= 0, sum(w) = 1}.
+    """
+    ordered = -np.sort(-weights, axis=-1)
+    cumulative = np.cumsum(ordered, axis=-1) - 1.0
+    ranks = np.arange(1, weights.shape[-1] + 1)
+    count = np.sum(ordered - cumulative / ranks > 0, axis=-1, keepdims=True)
+    threshold = np.take_along_axis(cumulative, count - 1, axis=-1) / count
+    return np.maximum(weights - threshold, 0.0)
+
+
+def portfolio_stats(weights, mu, cov, risk_free_rate=0.0):
+    """
+    Expected return, volatility and Sharpe ratio of one or many portfolios.
+
+    Args:
+        weights (numpy.ndarray): Shape (assets,) or (portfolios, assets).
+        mu (numpy.ndarray): Expected returns, shape (assets,).
+        cov (numpy.ndarray): Covariance, shape (assets, assets).
+        risk_free_rate (float): Rate in the same units as `mu`.
+
+    Returns:
+        tuple: (returns, volatilities, sharpe) arrays matching the leading shape
+    """
+    weights = np.asarray(weights, dtype=np.float64)
+    expected = weights @ mu
+    volatility = np.sqrt(np.maximum(np.einsum("...i,ij,...j->...", weights, cov, weights), 0.0))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sharpe = (expected - risk_free_rate) / volatility
+    return expected, volatility, sharpe
+
+
+def mean_variance_weights(mu, cov, risk_aversion, long_only=True,
+                          iterations=DEFAULT_ITERATIONS, tolerance=DEFAULT_TOLERANCE):
+    """
+    Maximize w'mu - risk_aversion / 2 * w'cov w for many risk aversions at once.
+
+    This function:
+    1. Without the long-only constraint, uses the closed-form solution of the
+       budget-constrained problem for every risk aversion
+    2. With it, runs accelerated projected gradient ascent (FISTA) on all
+       risk aversions simultaneously, projecting onto the simplex each step
+
+    Thousands of client risk profiles cost one (profiles, assets) array
+    operation per iteration.
+
+    Args:
+        mu (numpy.ndarray): Expected returns, shape (assets,).
+        cov (numpy.ndarray): Covariance, shape (assets, assets).
+        risk_aversion (float | array-like): One value per profile.
+        long_only (bool): Restrict weights to be non-negative (default: True).
+        iterations (int): Iteration limit of the projected-gradient solver.
+        tolerance (float): Stop once no weight moves more than this.
+
+    Returns:
+        numpy.ndarray: Weights of shape (profiles, assets), rows summing to 1
+
+    Example:
+        >>> weights = mean_variance_weights(mu, cov, np.linspace(1, 20, 5000))
+    """
+    mu = np.asarray(mu, dtype=np.float64)
+    cov = np.asarray(cov, dtype=np.float64)
+    aversion = np.maximum(np.atleast_1d(np.asarray(risk_aversion, dtype=np.float64)), 1e-6)[:, None]
+    assets = mu.shape[0]
+
+    # Step 1: Closed form w = (cov^-1 mu - gamma cov^-1 1) / risk_aversion
+    if not long_only:
+        inv_mu = np.linalg.solve(cov, mu)
+        inv_one = np.linalg.solve(cov, np.ones(assets))
+        return inv_mu / aversion + (1.0 - inv_mu.sum() / aversion) * inv_one / inv_one.sum()
+
+    # Step 2: Accelerated projected gradient, one step size per profile
+    lipschitz = np.linalg.eigvalsh(cov)[-1]
+    step = 1.0 / (aversion * lipschitz)
+    weights = np.full((aversion.shape[0], assets), 1.0 / assets)
+    momentum, t = weights, 1.0
+    for _ in range(iterations):
+        gradient = mu - aversion * (momentum @ cov)
+        updated = project_to_simplex(momentum + step * gradient)
+        t_next = (1.0 + np.sqrt(1.0 + 4.0 * t * t)) / 2.0
+        momentum = updated + ((t - 1.0) / t_next) * (updated - weights)
+        converged = np.max(np.abs(updated - weights)) < tolerance
+        weights, t = updated, t_next
+        if converged:
+            break
+    return weights
+
+
+def min_variance_weights(cov, long_only=True):
+    """
+    Minimum-variance allocation.
+
+    Returns:
+        numpy.ndarray: Weights of shape (assets,)
+    """
+    cov = np.asarray(cov, dtype=np.float64)
+    if not long_only:
+        inv_one = np.linalg.solve(cov, np.ones(cov.shape[0]))
+        return inv_one / inv_one.sum()
+    return mean_variance_weights(np.zeros(cov.shape[0]), cov, 1.0)[0]
+
+
+def risk_parity_weights(cov, budgets=None, iterations=100, tolerance=1e-10):
+    """
+    Allocation where every asset contributes its budget share of total risk.
+
+    Solves cov x = budgets / x, the optimality condition of the convex problem
+    min 1/2 x'cov x - sum(budgets * log x), with damped Newton steps: every
+    step is one linear solve over all assets, and it converges in a few dozen
+    steps. x is then normalized to sum to 1.
+
+    Args:
+        cov (numpy.ndarray): Covariance, shape (assets, assets).
+        budgets (array-like | None): Risk budget per asset (default: equal).
+        iterations (int): Maximum number of Newton steps.
+        tolerance (float): Stop once no weight moves more than this (relative).
+
+    Returns:
+        numpy.ndarray: Long-only weights of shape (assets,)
+    """
+    cov = np.asarray(cov, dtype=np.float64)
+    assets = cov.shape[0]
+    budgets = np.full(assets, 1.0 / assets) if budgets is None else np.asarray(budgets, dtype=np.float64)
+    budgets = budgets / budgets.sum()
+    # Start from inverse volatility, scaled so x'cov x = 1 (the solution's scale)
+    x = 1.0 / np.sqrt(np.diag(cov))
+    x = x / np.sqrt(x @ cov @ x)
+    for _ in range(iterations):
+        gradient = cov @ x - budgets / x
+        newton = np.linalg.solve(cov + np.diag(budgets / (x * x)), gradient)
+        # Damped step (1 / (1 + Newton decrement)), halved until x stays positive
+        step = 1.0 / (1.0 + np.sqrt(max(gradient @ newton, 0.0)))
+        while np.any(x - step * newton <= 0.0):
+            step /= 2.0
+        x = x - step * newton
+        if np.max(np.abs(step * newton)) < tolerance * np.max(x):
+            break
+    return x / x.sum()
+
+
+def efficient_frontier(mu, cov, points=25, long_only=True, risk_free_rate=0.0):
+    """
+    Trace the efficient frontier with one batched mean-variance solve.
+
+    Args:
+        mu (numpy.ndarray): Expected returns, shape (assets,).
+        cov (numpy.ndarray): Covariance, shape (assets, assets).
+        points (int): Number of frontier portfolios.
+        long_only (bool): Restrict weights to be non-negative.
+        risk_free_rate (float): Rate used for the Sharpe ratios.
+
+    Returns:
+        dict: "risk_aversion", "weights" (points, assets), "returns",
+              "volatilities" and "sharpe", ordered by increasing volatility
+    """
+    aversion = np.logspace(-1.0, 3.0, points)
+    weights = mean_variance_weights(mu, cov, aversion, long_only=long_only)
+    returns, volatilities, sharpe = portfolio_stats(weights, mu, cov, risk_free_rate)
+    order = np.argsort(volatilities)
+    return {
+        "risk_aversion": aversion[order],
+        "weights": weights[order],
+        "returns": returns[order],
+        "volatilities": volatilities[order],
+        "sharpe": sharpe[order],
+    }
+
+
+def max_sharpe_weights(mu, cov, risk_free_rate=0.0, long_only=True,
+                       iterations=DEFAULT_ITERATIONS * 10, tolerance=DEFAULT_TOLERANCE):
+    """
+    Tangency (maximum Sharpe ratio) allocation.
+
+    This function:
+    1. Computes the closed-form tangency portfolio cov^-1 (mu - rf), normalized;
+       it is the answer unless the long-only constraint is violated
+    2. If no asset earns more than `risk_free_rate`, returns the asset with
+       the highest Sharpe ratio
+    3. Otherwise solves min 1/2 y'cov y - (mu - rf)'y over y >= 0 by
+       accelerated projected gradient (the projection is max(y, 0)). For any
+       direction y, the best scale leaves -1/2 Sharpe(y)^2, so the normalized
+       solution y / sum(y) is the long-only tangency portfolio
+
+    Args:
+        mu (numpy.ndarray): Expected returns, shape (assets,).
+        cov (numpy.ndarray): Covariance, shape (assets, assets).
+        risk_free_rate (float): Rate in the same units as `mu`.
+        long_only (bool): Restrict weights to be non-negative (default: True).
+        iterations (int): Iteration limit of the projected-gradient solver.
+        tolerance (float): Stop once no weight moves more than this (relative).
+
+    Returns:
+        numpy.ndarray: Weights of shape (assets,)
+    """
+    mu = np.asarray(mu, dtype=np.float64)
+    cov = np.asarray(cov, dtype=np.float64)
+    excess = mu - risk_free_rate
+
+    # Step 1: Closed form
+    raw = np.linalg.solve(cov, excess)
+    if raw.sum() > 0 and (not long_only or np.all(raw >= 0.0)):
+        return raw / raw.sum()
+
+    # Step 2: Nothing beats the risk-free rate; keep the least bad asset
+    if np.all(excess <= 0.0):
+        weights = np.zeros(mu.shape[0])
+        weights[np.argmax(excess / np.sqrt(np.diag(cov)))] = 1.0
+        return weights
+
+    # Step 3: Non-negative quadratic program
+    lipschitz = np.linalg.eigvalsh(cov)[-1]
+    y = np.maximum(excess, 0.0) / np.diag(cov)
+    momentum, t = y, 1.0
+    for _ in range(iterations):
+        updated = np.maximum(momentum - (cov @ momentum - excess) / lipschitz, 0.0)
+        t_next = (1.0 + np.sqrt(1.0 + 4.0 * t * t)) / 2.0
+        momentum = updated + ((t - 1.0) / t_next) * (updated - y)
+        converged = np.max(np.abs(updated - y)) < tolerance * np.max(updated)
+        y, t = updated, t_next
+        if converged:
+            break
+    return y / y.sum()
+
+
+def optimize_portfolio(data, risk_free_rate=0.0, frontier_points=12,
+                       profiles=None, periods_per_year=TRADING_DAYS_PER_YEAR):
+    """
+    Compute all allocations for the tickers in `data`.
+
+    This function:
+    1. Builds the aligned return matrix and annualized inputs
+       (mean returns and Ledoit-Wolf covariance)
+    2. Computes min-variance, risk-parity and max-Sharpe allocations
+    3. Solves every client risk profile in one batched pass
+    4. Traces the efficient frontier
+
+    Args:
+        data (pandas.DataFrame | dict): Output of `fetch_market_data_many`.
+        risk_free_rate (float): Annual risk-free rate (default: 0.0).
+        frontier_points (int): Number of frontier portfolios to report.
+        profiles (dict | None): Profile name -> risk aversion (default: RISK_PROFILES).
+        periods_per_year (int): Bars per year (default: 252 trading days).
+
+    Returns:
+        dict: {"tickers", "observations", "shrinkage", "assets": {ticker:
+              {"expected_return", "volatility"}}, "allocations": {name:
+              {"weights", "expected_return", "volatility", "sharpe"}},
+              "frontier": [{"expected_return", "volatility"}, ...]}
+
+    Raises:
+        ValueError: If fewer than two tickers or too few common dates are available.
+    """
+    profiles = RISK_PROFILES if profiles is None else profiles
+
+    # Step 1: Annualized expected returns and shrunk covariance
+    tickers, returns = return_matrix(data)
+    if len(tickers) < 2 or returns.shape[0] < len(tickers) + 2:
+        raise ValueError("Need at least two tickers with enough overlapping history")
+    cov, shrinkage = shrinkage_covariance(returns)
+    mu = returns.mean(axis=0) * periods_per_year
+    cov = cov * periods_per_year
+
+    # Step 2: Reference allocations
+    allocations = {
+        "min_variance": min_variance_weights(cov),
+        "risk_parity": risk_parity_weights(cov),
+        "max_sharpe": max_sharpe_weights(mu, cov, risk_free_rate),
+    }
+
+    # Step 3: All client risk profiles in one batched solve
+    names = list(profiles)
+    profile_weights = mean_variance_weights(mu, cov, [profiles[name] for name in names])
+    allocations.update({f"profile_{name}": weights for name, weights in zip(names, profile_weights)})
+
+    # Step 4: Efficient frontier
+    frontier = efficient_frontier(mu, cov, points=frontier_points, risk_free_rate=risk_free_rate)
+
+    def describe(weights):
+        expected, volatility, sharpe = portfolio_stats(weights, mu, cov, risk_free_rate)
+        return {
+            "weights": {ticker: round(float(w), 4) for ticker, w in zip(tickers, weights) if w > 1e-4},
+            "expected_return": round(float(expected), 4),
+            "volatility": round(float(volatility), 4),
+            "sharpe": round(float(sharpe), 3),
+        }
+
+    volatilities = np.sqrt(np.diag(cov))
+    return {
+        "tickers": tickers,
+        "observations": int(returns.shape[0]),
+        "shrinkage": round(float(shrinkage), 3),
+        "assets": {
+            ticker: {"expected_return": round(float(m), 4), "volatility": round(float(v), 4)}
+            for ticker, m, v in zip(tickers, mu, volatilities)
+        },
+        "allocations": {name: describe(weights) for name, weights in allocations.items()},
+        "frontier": [
+            {"expected_return": round(float(r), 4), "volatility": round(float(v), 4)}
+            for r, v in zip(frontier["returns"], frontier["volatilities"])
+        ],
+    }
+
+
+def optimize_portfolio_tool(
+    tickers: Annotated[str, "Comma-separated ticker symbols, e.g. 'AAPL,MSFT,GOOGL,^GSPC'"],
+    period: Annotated[str, "History window used for the estimates, e.g. '6mo', '1y', '2y'"] = "1y",
+    risk_free_rate: Annotated[float, "Annual risk-free rate as a fraction, e.g. 0.04"] = 0.0,
+) -> str:
+    """
+    Agent tool: compute portfolio allocations for the given tickers.
+
+    Returns annualized per-asset statistics, min-variance, risk-parity,
+    max-Sharpe and per-risk-profile allocations, and the efficient frontier,
+    as compact JSON (or an error message the agent can relay).
+    """
+    from tools.market_data_tool import fetch_market_data_many
+    symbols = [symbol.strip() for symbol in tickers.split(",") if symbol.strip()]
+    data, errors = fetch_market_data_many(symbols, period=period)
+    if data.empty:
+        return "Portfolio optimization failed: no market data available"
+    try:
+        result = optimize_portfolio(data, risk_free_rate=risk_free_rate)
+    except ValueError as error:
+        return f"Portfolio optimization failed: {error}"
+    if errors:
+        result["unavailable"] = sorted(errors)
+    return json.dumps(result, separators=(",", ":"))
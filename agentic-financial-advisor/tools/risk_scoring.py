@@ -0,0 +1,199 @@
+# ============================================================================
+# risk_scoring.py
+# Deterministic, vectorized risk scorer (Low / Medium / High)
+# Lets the Risk Assessment Agent answer without an LLM call when the tier is clear
+# ============================================================================
+
+# Import json to return the assessment as a structured payload
+import json
+
+# Import re to match the narrative keywords at word starts
+import re
+
+# Import numpy to score many assets or portfolios in one array operation
+import numpy as np
+
+# Import the parser for the precomputed signal block attached to queries
+from tools.signal_context import SIGNALS_BLOCK_START, parse_signal_context
+
+# ============================================================================
+# Scoring rules
+# ============================================================================
+
+# For every feature: (value at which risk starts rising, value at which it is maximal, weight)
+# Values between the two bounds map linearly onto a 0..1 risk score
+RISK_FEATURES = {
+    # Annualized 20-day volatility
+    "vol_20d": (0.15, 0.40, 0.35),
+    # Worst drawdown over the period (negative fraction, deeper is riskier)
+    "max_drawdown": (-0.10, -0.35, 0.30),
+    # 95% one-period historical Value at Risk (positive loss fraction)
+    "var_95": (0.015, 0.040, 0.25),
+    # Average daily traded value; thinner markets are riskier
+    "adv_20d": (50e6, 5e6, 0.10),
+}
+
+# Composite score boundaries between the Low / Medium / High tiers
+TIER_BOUNDARIES = (0.35, 0.65)
+
+# Scores within this distance of a boundary are ambiguous and go to the LLM
+AMBIGUOUS_MARGIN = 0.05
+
+# Tier names indexed by how many boundaries the score has passed
+TIERS = np.array(["Low", "Medium", "High"])
+
+# Word stems in the user query that ask for an explanation rather than just a tier
+# ("expla" covers explain, explained and explanation)
+NARRATIVE_KEYWORDS = ("expla", "why", "narrativ", "elaborat", "in detail", "discuss")
+
+# Matches a stem at the start of a word with any ending ("discussion", "in details"),
+# never in the middle of a word
+_NARRATIVE_PATTERN = re.compile(
+    r"\b(?:" + "|".join(re.escape(keyword) for keyword in NARRATIVE_KEYWORDS) + r")\w*"
+)
+
+
+def score_risk(features):
+    """
+    Compute composite risk scores for many assets or portfolios at once.
+
+    This function:
+    1. Maps every feature onto a 0..1 risk scale between its bounds
+    2. Takes the weighted average over the features that are present
+       (missing values are skipped and the weights renormalized)
+
+    Args:
+        features (dict): Mapping of feature name -> array-like of values
+                         (any of the keys in RISK_FEATURES; all same length)
+
+    Returns:
+        numpy.ndarray: Composite risk score in [0, 1] per row
+                       (NaN when no feature is available for a row)
+
+    Example:
+        >>> score_risk({"vol_20d": [0.12, 0.45], "max_drawdown": [-0.05, -0.40]})
+        array([0., 1.])
+    """
+    total = None
+    weights = None
+    for name, (low, high, weight) in RISK_FEATURES.items():
+        if name not in features:
+            continue
+        values = np.asarray(features[name], dtype=np.float64)
+        partial = np.clip((values - low) / (high - low), 0.0, 1.0)
+        present = ~np.isnan(values)
+        if total is None:
+            total = np.zeros(values.shape)
+            weights = np.zeros(values.shape)
+        total += np.where(present, partial * weight, 0.0)
+        weights += np.where(present, weight, 0.0)
+
+    if total is None:
+        raise ValueError("No known risk features supplied")
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return total / weights
+
+
+def classify_risk(scores):
+    """
+    Turn composite scores into tiers and flag the ambiguous ones.
+
+    Returns:
+        tuple: (tiers, ambiguous)
+               - tiers (numpy.ndarray): 'Low' / 'Medium' / 'High' per score
+               - ambiguous (numpy.ndarray): True where the score is missing or
+                 within AMBIGUOUS_MARGIN of a tier boundary
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    tiers = TIERS[np.searchsorted(TIER_BOUNDARIES, np.nan_to_num(scores), side="right")]
+    distance = np.min(np.abs(scores[..., None] - np.array(TIER_BOUNDARIES)), axis=-1)
+    ambiguous = np.isnan(scores) | (distance < AMBIGUOUS_MARGIN)
+    return tiers, ambiguous
+
+
+def risk_assessment_payload(tickers, signals, scores, tiers):
+    """
+    Build the deterministic assessment as a risk payload for the group chat.
+
+    The payload follows RISK_ASSESSMENT_SCHEMA (tools/structured_output.py),
+    like the replies of the LLM.
+    """
+    assets = []
+    for ticker, score, tier in zip(tickers, scores, tiers):
+        row = signals[ticker]
+        details = []
+        if row.get("vol_20d") is not None:
+            details.append(f"vol {row['vol_20d']:.1%}")
+        if row.get("max_drawdown") is not None:
+            details.append(f"max DD {row['max_drawdown']:.1%}")
+        if row.get("var_95") is not None:
+            details.append(f"VaR95 {row['var_95']:.1%}")
+        if row.get("adv_20d") is not None:
+            details.append(f"ADV {row['adv_20d'] / 1e6:,.1f}M")
+        assets.append({"ticker": ticker, "tier": str(tier), "score": round(float(score), 2),
+                       "reason": ", ".join(details)})
+
+    overall = float(np.nanmean(scores))
+    overall_tier, _ = classify_risk([overall])
+    return {
+        "overall": str(overall_tier[0]),
+        "summary": f"Deterministic scorer, mean score {overall:.2f}.",
+        "assets": assets,
+    }
+
+
+def risk_fast_path_reply(recipient, messages=None, sender=None, config=None):
+    """
+    AutoGen reply function that assesses risk without calling the LLM.
+
+    This function:
+    1. Looks for the precomputed market signal block in the conversation
+    2. Defers to the LLM if there is none, or if the query asks for narrative
+    3. Scores every ticker with the deterministic scorer
+    4. Defers to the LLM if any score falls in an ambiguous band
+    5. Otherwise returns the tiers as the agent's final reply (a risk payload)
+
+    Args:
+        recipient (ConversableAgent): The agent the function is registered on
+        messages (list): Conversation history seen by the agent
+        sender (Agent): The agent requesting a reply
+        config: Unused (part of the AutoGen reply function signature)
+
+    Returns:
+        tuple: (final, reply) - (True, text) when the fast path answered,
+               (False, None) to let the next reply function (the LLM) run
+    """
+    # Step 1: Find the signal block, normally attached to the initial query
+    query, signals = None, None
+    for message in messages or []:
+        content = message.get("content")
+        if not isinstance(content, str):
+            continue
+        query = query if query is not None else content
+        signals = parse_signal_context(content)
+        if signals:
+            break
+    if not signals:
+        return False, None
+
+    # Step 2: Narrative requests always go to the LLM
+    request = query.split(SIGNALS_BLOCK_START, 1)[0].lower()
+    if _NARRATIVE_PATTERN.search(request):
+        return False, None
+
+    # Step 3: Score all tickers in one vectorized pass
+    tickers = list(signals)
+    features = {
+        name: [np.nan if signals[t].get(name) is None else signals[t][name] for t in tickers]
+        for name in RISK_FEATURES
+    }
+    scores = score_risk(features)
+    tiers, ambiguous = classify_risk(scores)
+
+    # Step 4: Any borderline score is left to the LLM's judgement
+    if ambiguous.any():
+        return False, None
+
+    # Step 5: Clear-cut result - answer directly
+    payload = risk_assessment_payload(tickers, signals, scores, tiers)
+    return True, json.dumps(payload, separators=(",", ":"))
@@ -0,0 +1,301 @@
+# ============================================================================
+# scenario_engine.py
+# Vectorized Monte Carlo / bootstrap scenario simulator for risk analysis
+# VaR, CVaR, drawdown distributions and probability of loss over a horizon
+# ============================================================================
+
+# Import json to return the tool result as compact JSON text
+import json
+
+# Import the process pool used to spread large simulations over CPU cores
+from concurrent.futures import ProcessPoolExecutor
+
+# Import Annotated to describe the tool parameters to the LLM
+from typing import Annotated
+
+# Import numpy to simulate all paths, steps and assets as array operations
+import numpy as np
+
+# Import the aligned return matrix builder of the portfolio optimizer
+from tools.portfolio_optimizer import return_matrix
+
+# The batched market data fetcher is imported by the agent tool on first use
+
+# Supported simulation methods
+# - "gbm": correlated geometric Brownian motion fitted to the log returns
+# - "bootstrap": circular block bootstrap of the historical return rows
+SCENARIO_METHODS = ("gbm", "bootstrap")
+
+# Memory budget of one chunk of paths (256 MB); the chunk size follows from it
+DEFAULT_CHUNK_BYTES = 256 * 1024 * 1024
+
+# Upper bound on the paths per chunk for small universes
+MAX_CHUNK_SIZE = 20_000
+
+# (paths, horizon, assets + 1) float64 arrays alive at once while a chunk is
+# simulated and reduced (draws, returns, asset values, portfolio values)
+_WORKING_ARRAYS = 4
+
+# Confidence levels for VaR and CVaR
+DEFAULT_LEVELS = (0.95, 0.99)
+
+# Drawdown distribution percentiles reported
+DRAWDOWN_PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def simulate_gbm_returns(log_mu, log_cov, horizon, paths, rng):
+    """
+    Simulate correlated log returns of geometric Brownian motion.
+
+    Args:
+        log_mu (numpy.ndarray): Mean log return per period, shape (assets,).
+        log_cov (numpy.ndarray): Covariance of the log returns, shape (assets, assets).
+        horizon (int): Number of periods per path.
+        paths (int): Number of paths.
+        rng (numpy.random.Generator): Random generator.
+
+    Returns:
+        numpy.ndarray: Simple returns of shape (paths, horizon, assets)
+    """
+    # Cholesky factor; a tiny ridge keeps nearly singular covariances usable
+    assets = log_mu.shape[0]
+    factor = np.linalg.cholesky(log_cov + 1e-12 * np.eye(assets))
+    shocks = rng.standard_normal((paths, horizon, assets)) @ factor.T
+    return np.expm1(log_mu + shocks)
+
+
+def simulate_bootstrap_returns(returns, horizon, paths, rng, block=5):
+    """
+    Resample historical return rows in blocks (circular block bootstrap).
+
+    Whole rows are drawn, so the cross-asset correlation of every day is kept,
+    and consecutive days stay together within a block (volatility clustering).
+
+    Args:
+        returns (numpy.ndarray): Historical simple returns, shape (periods, assets).
+        horizon (int): Number of periods per path.
+        paths (int): Number of paths.
+        rng (numpy.random.Generator): Random generator.
+        block (int): Block length in periods.
+
+    Returns:
+        numpy.ndarray: Simple returns of shape (paths, horizon, assets)
+    """
+    periods = returns.shape[0]
+    blocks = -(-horizon // block)
+    starts = rng.integers(0, periods, size=(paths, blocks, 1))
+    rows = ((starts + np.arange(block)) % periods).reshape(paths, blocks * block)[:, :horizon]
+    return returns[rows]
+
+
+def path_metrics(asset_returns, weights):
+    """
+    Terminal return and maximum drawdown of buy-and-hold portfolios per path.
+
+    Args:
+        asset_returns (numpy.ndarray): Simple returns, shape (paths, horizon, assets).
+        weights (numpy.ndarray): Portfolio weights, shape (portfolios, assets).
+
+    Returns:
+        tuple: (terminal, max_drawdown), each of shape (paths, portfolios)
+    """
+    # Value of every asset, then of every portfolio, along each path
+    values = np.cumprod(1.0 + asset_returns, axis=1) @ weights.T
+    peaks = np.maximum(np.maximum.accumulate(values, axis=1), 1.0)
+    return values[:, -1] - 1.0, np.min(values / peaks - 1.0, axis=1).clip(max=0.0)
+
+
+def chunk_paths(horizon, assets, chunk_bytes=DEFAULT_CHUNK_BYTES):
+    """
+    Number of paths per chunk that keeps a chunk's arrays within `chunk_bytes`.
+
+    A chunk holds about _WORKING_ARRAYS float64 arrays of shape
+    (paths, horizon, assets + 1), so paths = budget / (horizon x assets x 8)
+    up to that factor; e.g. 500 assets over 252 days give 66 paths per chunk
+    with the default budget, instead of 20,000 paths (about 20 GB).
+    """
+    per_path = _WORKING_ARRAYS * horizon * (assets + 1) * np.dtype(np.float64).itemsize
+    return int(max(1, min(MAX_CHUNK_SIZE, chunk_bytes // per_path)))
+
+
+def _simulate_chunk(method, params, weights, horizon, paths, seed):
+    # One independent chunk of paths; top-level so worker processes can run it
+    rng = np.random.default_rng(seed)
+    if method == "gbm":
+        simulated = simulate_gbm_returns(params["log_mu"], params["log_cov"], horizon, paths, rng)
+    else:
+        simulated = simulate_bootstrap_returns(params["returns"], horizon, paths, rng, params["block"])
+    return path_metrics(simulated, weights)
+
+
+def summarize_outcomes(terminal, max_drawdown, levels=DEFAULT_LEVELS):
+    """
+    Risk statistics of simulated outcomes, for many portfolios at once.
+
+    Args:
+        terminal (numpy.ndarray): Terminal returns, shape (paths, portfolios).
+        max_drawdown (numpy.ndarray): Max drawdowns, shape (paths, portfolios).
+        levels (tuple): Confidence levels for VaR and CVaR.
+
+    Returns:
+        list: One dict per portfolio with expected/median return, probability
+              of loss, VaR/CVaR per level (positive loss fractions) and the
+              drawdown distribution percentiles
+    """
+    summaries = [dict() for _ in range(terminal.shape[1])]
+    expected = terminal.mean(axis=0)
+    median = np.median(terminal, axis=0)
+    probability_of_loss = (terminal < 0).mean(axis=0)
+    drawdowns = np.percentile(max_drawdown, DRAWDOWN_PERCENTILES, axis=0)
+
+    tail = {}
+    for level in levels:
+        cutoff = np.quantile(terminal, 1.0 - level, axis=0)
+        in_tail = terminal <= cutoff
+        tail[level] = (-cutoff, -(terminal * in_tail).sum(axis=0) / np.maximum(in_tail.sum(axis=0), 1))
+
+    for index, summary in enumerate(summaries):
+        summary["expected_return"] = round(float(expected[index]), 4)
+        summary["median_return"] = round(float(median[index]), 4)
+        summary["probability_of_loss"] = round(float(probability_of_loss[index]), 4)
+        for level in levels:
+            label = int(round(level * 100))
+            summary[f"var_{label}"] = round(float(tail[level][0][index]), 4)
+            summary[f"cvar_{label}"] = round(float(tail[level][1][index]), 4)
+        summary["max_drawdown_percentiles"] = {
+            f"p{p}": round(float(value), 4) for p, value in zip(DRAWDOWN_PERCENTILES, drawdowns[:, index])
+        }
+    return summaries
+
+
+def run_scenarios(data, weights=None, method="bootstrap", horizon=21, paths=100_000,
+                  block=5, chunk_size=None, workers=1, seed=None,
+                  levels=DEFAULT_LEVELS, chunk_bytes=DEFAULT_CHUNK_BYTES):
+    """
+    Simulate future paths for every ticker and a portfolio of them.
+
+    This function:
+    1. Builds the aligned historical return matrix
+    2. Splits the paths into chunks with independent random streams
+       (spawned from `seed`), so results do not depend on `workers`
+    3. Simulates each chunk as one (chunk, horizon, assets) array and reduces
+       it to per-path terminal returns and drawdowns right away, so memory
+       stays bounded by `chunk_bytes` (see `chunk_paths`) whatever the
+       universe size and horizon
+    4. Runs the chunks in-process or on a process pool (`workers` > 1)
+    5. Summarizes VaR/CVaR, drawdown percentiles and probability of loss for
+       every ticker and for the portfolio
+
+    Args:
+        data (pandas.DataFrame | dict): Output of `fetch_market_data_many`.
+        weights (array-like | dict | None): Portfolio weights (array in ticker
+                     order or ticker -> weight); default: equal weights.
+        method (str): "bootstrap" (default) or "gbm".
+        horizon (int): Simulated periods per path (default: 21 trading days).
+        paths (int): Number of simulated paths (default: 100,000).
+        block (int): Block length of the bootstrap (default: 5).
+        chunk_size (int | None): Paths simulated at once (default: derived
+                     from `chunk_bytes`; never more than the budget allows).
+        workers (int): Worker processes (1 = run in the calling process).
+        seed (int | None): Seed for reproducible results.
+        levels (tuple): Confidence levels for VaR and CVaR.
+        chunk_bytes (int): Memory budget of one chunk (default: 256 MB).
+
+    Returns:
+        dict: {"method", "horizon", "paths", "seed", "portfolio": {"weights", ...stats},
+               "assets": {ticker: stats}}
+
+    Raises:
+        ValueError: If the method is unknown or there is not enough history.
+
+    Example:
+        >>> result = run_scenarios(data, method="gbm", paths=200_000, seed=7)
+        >>> result["portfolio"]["cvar_95"]
+    """
+    if method not in SCENARIO_METHODS:
+        raise ValueError(f"Unknown scenario method {method!r}; expected one of {SCENARIO_METHODS}")
+
+    # Step 1: Historical inputs
+    tickers, returns = return_matrix(data)
+    if returns.shape[0] < max(2 * block, 20):
+        raise ValueError("Not enough overlapping history for a scenario simulation")
+    if weights is None:
+        portfolio = np.full(len(tickers), 1.0 / len(tickers))
+    elif isinstance(weights, dict):
+        portfolio = np.array([float(weights.get(ticker, 0.0)) for ticker in tickers])
+    else:
+        portfolio = np.asarray(weights, dtype=np.float64)
+    if portfolio.sum() <= 0:
+        raise ValueError("Portfolio weights must sum to a positive number")
+    portfolio = portfolio / portfolio.sum()
+
+    # Every ticker on its own plus the portfolio, evaluated together
+    all_weights = np.vstack([np.eye(len(tickers)), portfolio])
+    if method == "gbm":
+        log_returns = np.log1p(returns)
+        params = {"log_mu": log_returns.mean(axis=0), "log_cov": np.atleast_2d(np.cov(log_returns, rowvar=False))}
+    else:
+        params = {"returns": returns, "block": block}
+
+    # Step 2: Independent, reproducible random streams per chunk
+    # The chunk size depends only on the inputs and budget, not on `workers`
+    budget_paths = chunk_paths(horizon, len(tickers), chunk_bytes)
+    chunk_size = budget_paths if chunk_size is None else max(1, min(chunk_size, budget_paths))
+    sizes = [min(chunk_size, paths - start) for start in range(0, paths, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(method, params, all_weights, horizon, size, chunk_seed) for size, chunk_seed in zip(sizes, seeds)]
+
+    # Steps 3-4: Simulate and reduce chunk by chunk
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_simulate_chunk, *zip(*jobs)))
+    else:
+        results = [_simulate_chunk(*job) for job in jobs]
+    terminal = np.concatenate([result[0] for result in results])
+    max_drawdown = np.concatenate([result[1] for result in results])
+
+    # Step 5: Risk statistics per ticker and for the portfolio
+    summaries = summarize_outcomes(terminal, max_drawdown, levels)
+    portfolio_summary = dict(
+        {"weights": {ticker: round(float(w), 4) for ticker, w in zip(tickers, portfolio)}},
+        **summaries[-1]
+    )
+    return {
+        "method": method,
+        "horizon": horizon,
+        "paths": paths,
+        "seed": seed,
+        "portfolio": portfolio_summary,
+        "assets": dict(zip(tickers, summaries[:-1])),
+    }
+
+
+def simulate_risk_tool(
+    tickers: Annotated[str, "Comma-separated ticker symbols, e.g. 'AAPL,MSFT,BTC-USD'"],
+    weights: Annotated[str, "Optional comma-separated portfolio weights in ticker order; empty for equal weights"] = "",
+    method: Annotated[str, "'bootstrap' (historical blocks) or 'gbm' (correlated Brownian motion)"] = "bootstrap",
+    horizon_days: Annotated[int, "Simulated horizon in trading days"] = 21,
+    period: Annotated[str, "History window the simulation is fitted to, e.g. '1y'"] = "1y",
+) -> str:
+    """
+    Agent tool: simulate 100,000 scenarios for the given tickers.
+
+    Returns VaR/CVaR, probability of loss and drawdown percentiles for each
+    ticker and the portfolio as compact JSON (or an error message). Uses a
+    fixed seed so the same question gets the same numbers.
+    """
+    from tools.market_data_tool import fetch_market_data_many
+    symbols = [symbol.strip().upper() for symbol in tickers.split(",") if symbol.strip()]
+    try:
+        portfolio = [float(value) for value in weights.split(",")] if weights.strip() else None
+        if portfolio is not None:
+            portfolio = dict(zip(symbols, portfolio))
+        data, errors = fetch_market_data_many(symbols, period=period)
+        if data.empty:
+            return "Scenario simulation failed: no market data available"
+        result = run_scenarios(data, weights=portfolio, method=method, horizon=horizon_days, seed=0)
+    except ValueError as error:
+        return f"Scenario simulation failed: {error}"
+    if errors:
+        result["unavailable"] = sorted(errors)
+    return json.dumps(result, separators=(",", ":"))
@@ -0,0 +1,54 @@
+# ============================================================================
+# signal_context.py
+# Prompt block carrying the precomputed market signals
+# Renders the signals for the agents and parses them back for code paths
+# ============================================================================
+
+# Import json to render and parse the compact signal summary
+import json
+
+# Markers around the JSON block injected into the agents' context
+# Downstream code (e.g. the risk fast path) parses the block between them
+SIGNALS_BLOCK_START = "[MARKET_SIGNALS]"
+SIGNALS_BLOCK_END = "[/MARKET_SIGNALS]"
+
+def format_signal_context(signals, period="6mo", interval="1d", unavailable=None):
+    """
+    Render the signals as a short, dense block for an agent prompt.
+
+    The block is compact JSON between SIGNALS_BLOCK_START / SIGNALS_BLOCK_END,
+    so it is cheap in tokens for the LLM and machine-readable for code.
+
+    Args:
+        signals (dict): Output of `compute_signals`.
+        period (str): Period the signals were computed over.
+        interval (str): Bar interval of the underlying data.
+        unavailable (list | None): Tickers that could not be fetched.
+
+    Returns:
+        str: Prompt-ready context block.
+    """
+    header = (
+        f"Precomputed market signals ({period}, {interval} bars; returns/vol/drawdown/VaR "
+        "as fractions, vol annualized). Use these numbers; do not recompute them."
+    )
+    payload = json.dumps(signals, separators=(",", ":"))
+    lines = [header, SIGNALS_BLOCK_START, payload, SIGNALS_BLOCK_END]
+    if unavailable:
+        lines.append("No data for: " + ", ".join(unavailable))
+    return "\n".join(lines)
+
+def parse_signal_context(text):
+    """
+    Extract the signals dictionary from a message containing a signal block.
+
+    Returns:
+        dict | None: The parsed signals, or None if the text has no valid block.
+    """
+    if not text or SIGNALS_BLOCK_START not in text:
+        return None
+    body = text.split(SIGNALS_BLOCK_START, 1)[1].split(SIGNALS_BLOCK_END, 1)[0]
+    try:
+        return json.loads(body)
+    except ValueError:
+        return None
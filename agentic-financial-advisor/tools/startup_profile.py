@@ -0,0 +1,159 @@
+# ============================================================================
+# startup_profile.py
+# Startup time report for the --profile-startup option of main.py
+# Times each startup stage and breaks import time down per package
+# ============================================================================
+
+# Import importlib to import the profiled modules by name
+import importlib
+
+# Import os to run the import-time subprocess from the application directory
+import os
+
+# Import subprocess to measure import times in a fresh interpreter
+import subprocess
+
+# Import sys to find the current interpreter
+import sys
+
+# Import time to time the startup stages
+import time
+
+# Modules imported by a typical run, measured with `python -X importtime`
+PROFILED_IMPORTS = (
+    "autogen",
+    "orchestrator.financial_advisor_orchestrator",
+    "orchestrator.batch_runner",
+    "agents.registry",
+    "tools.market_data_tool",
+    "tools.indicators",
+)
+
+# Number of packages listed in the import-time breakdown
+TOP_PACKAGES = 15
+
+
+def parse_import_times(output):
+    """
+    Aggregate `python -X importtime` output per top-level package.
+
+    Every line has the form 'import time: self [us] | cumulative | name',
+    with the name indented by nesting depth. Self times are summed per
+    top-level package, so each microsecond is counted exactly once.
+
+    Args:
+        output (str): The interpreter's stderr.
+
+    Returns:
+        list: (package, self seconds, modules) tuples, slowest first
+    """
+    packages = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # Header line
+        package = fields[2].strip().split(".")[0]
+        total, modules = packages.get(package, (0, 0))
+        packages[package] = (total + int(fields[0]), modules + 1)
+    rows = [(package, total / 1e6, modules) for package, (total, modules) in packages.items()]
+    return sorted(rows, key=lambda row: row[1], reverse=True)
+
+
+def profile_imports(modules=PROFILED_IMPORTS):
+    """
+    Import `modules` in a fresh interpreter and return the per-package breakdown.
+
+    A fresh process is used because the current one has already imported part
+    of the application. Modules that fail to import (e.g. an optional
+    dependency that is not installed) are skipped, and their errors returned.
+
+    Returns:
+        tuple: (rows of `parse_import_times`, wall seconds, list of errors)
+    """
+    script = (
+        "import importlib\n"
+        f"for name in {list(modules)!r}:\n"
+        "    try:\n"
+        "        importlib.import_module(name)\n"
+        "    except Exception as error:\n"
+        "        print(f'{name}: {type(error).__name__}: {error}')\n"
+    )
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        capture_output=True, text=True,
+    )
+    elapsed = time.perf_counter() - started
+    errors = [line for line in result.stdout.splitlines() if line.strip()]
+    return parse_import_times(result.stderr), elapsed, errors
+
+
+def profile_stages():
+    """
+    Time the startup stages of a single run in this process.
+
+    Stages run in the order of a real startup, so each one only pays for
+    what the previous stages have not loaded yet.
+
+    Returns:
+        list: (stage, seconds, error or None) tuples
+    """
+    from agents.registry import AGENT_REGISTRY, create_agent
+
+    stages = [
+        ("import autogen", lambda: importlib.import_module("autogen")),
+        ("import orchestrator", lambda: importlib.import_module("orchestrator.financial_advisor_orchestrator")),
+        ("import market data + indicators", lambda: (importlib.import_module("tools.market_data_tool"),
+                                                     importlib.import_module("tools.indicators"))),
+    ]
+    created = []
+    for name in AGENT_REGISTRY:
+        stages.append((f"create {name}", lambda name=name: created.append(create_agent(name))))
+
+    def create_orchestrator():
+        from orchestrator.financial_advisor_orchestrator import FinancialAdvisorOrchestrator
+        FinancialAdvisorOrchestrator(created, silent=True, tickers=[])
+
+    stages.append(("create orchestrator", create_orchestrator))
+
+    timings = []
+    for stage, run in stages:
+        started = time.perf_counter()
+        try:
+            run()
+            error = None
+        except Exception as failure:
+            error = f"{type(failure).__name__}: {failure}"
+        timings.append((stage, time.perf_counter() - started, error))
+    return timings
+
+
+def startup_report():
+    """
+    Render the startup profile as text.
+
+    The report has two parts:
+    1. Stage timings measured in this process (imports, agent and
+       orchestrator construction)
+    2. Import self time per top-level package, measured in a fresh interpreter
+
+    Returns:
+        str: The report
+    """
+    lines = ["Startup stages (this process):", f"{'stage':<44}{'seconds':>10}"]
+    total = 0.0
+    for stage, seconds, error in profile_stages():
+        total += seconds
+        lines.append(f"{stage:<44}{seconds:>10.3f}" + (f"  failed: {error}" if error else ""))
+    lines.append(f"{'total':<44}{total:>10.3f}")
+
+    rows, elapsed, errors = profile_imports()
+    lines += ["", f"Import time by package (fresh interpreter, {elapsed:.3f} s wall):",
+              f"{'package':<32}{'self s':>10}{'modules':>10}"]
+    for package, seconds, modules in rows[:TOP_PACKAGES]:
+        lines.append(f"{package:<32}{seconds:>10.3f}{modules:>10}")
+    lines += [f"import failed: {error}" for error in errors]
+    return "\n".join(lines)
@@ -0,0 +1,419 @@
+# ============================================================================
+# structured_output.py
+# Typed JSON contracts between the agents of the financial advisor
+# Schema-constrained generation, validation with cheap retries, and a report
+# rendered from the structured payloads instead of generated by the LLM
+# ============================================================================
+
+# Import json to parse and re-encode the payloads
+import json
+
+# Import re to strip Markdown code fences around JSON replies
+import re
+
+# Import the agent's reply loop, which also runs its tools, to check its answers
+from tools.agent_tools import reply_loop_config
+
+# Import the risk tiers of the deterministic scorer, which emits risk payloads too
+from tools.risk_scoring import TIERS
+
+# ============================================================================
+# Output schemas (JSON Schema subset) per specialist agent
+# ============================================================================
+
+# Risk tiers shared by the risk schema and the deterministic risk scorer
+RISK_TIERS = [str(tier) for tier in TIERS]
+
+# Market Analysis Agent: overall view, its drivers and per-asset trends
+MARKET_VIEW_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "outlook": {"type": "string", "enum": ["bullish", "neutral", "bearish"]},
+        "summary": {"type": "string"},
+        "drivers": {"type": "array", "items": {"type": "string"}, "maxItems": 5},
+        "assets": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "ticker": {"type": "string"},
+                    "trend": {"type": "string", "enum": ["up", "sideways", "down"]},
+                    "note": {"type": "string"},
+                },
+                "required": ["ticker", "trend"],
+            },
+        },
+    },
+    "required": ["outlook", "summary", "drivers"],
+}
+
+# Risk Assessment Agent: overall tier and a tier per asset
+RISK_ASSESSMENT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "overall": {"type": "string", "enum": RISK_TIERS},
+        "summary": {"type": "string"},
+        "assets": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "ticker": {"type": "string"},
+                    "tier": {"type": "string", "enum": RISK_TIERS},
+                    "score": {"type": ["number", "null"]},
+                    "reason": {"type": "string"},
+                },
+                "required": ["ticker", "tier"],
+            },
+        },
+        "key_risks": {"type": "array", "items": {"type": "string"}, "maxItems": 5},
+    },
+    "required": ["overall", "summary", "assets"],
+}
+
+# One allocation of the strategy schema (weight as a fraction of the portfolio)
+_ALLOCATION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "asset": {"type": "string"},
+        "weight": {"type": "number", "minimum": 0, "maximum": 1},
+        "rationale": {"type": "string"},
+    },
+    "required": ["asset", "weight", "rationale"],
+}
+
+# Investment Strategy Agent: short- and long-term allocations
+STRATEGY_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "risk_profile": {"type": "string", "enum": ["conservative", "moderate", "aggressive"]},
+        "short_term": {"type": "array", "items": _ALLOCATION_SCHEMA},
+        "long_term": {"type": "array", "items": _ALLOCATION_SCHEMA},
+        "summary": {"type": "string"},
+    },
+    "required": ["short_term", "long_term", "summary"],
+}
+
+# Schema of every agent that replies with a structured payload
+AGENT_SCHEMAS = {
+    "MarketAnalysisAgent": MARKET_VIEW_SCHEMA,
+    "RiskAssessmentAgent": RISK_ASSESSMENT_SCHEMA,
+    "InvestmentStrategyAgent": STRATEGY_SCHEMA,
+}
+
+# Corrective turns after a reply that does not match the schema
+DEFAULT_SCHEMA_RETRIES = 1
+
+# A JSON object inside a Markdown code fence
+_CODE_FENCE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL)
+
+# Python types accepted for every JSON Schema type
+_JSON_TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "number": (int, float),
+    "integer": int,
+    "boolean": bool,
+    "null": type(None),
+}
+
+
+# ============================================================================
+# Schemas: prompt shape, validation and parsing
+# ============================================================================
+
+def schema_shape(schema):
+    """
+    Render a compact example of the JSON shape described by `schema`.
+
+    Used in system messages, so servers without schema-constrained decoding
+    still know what to produce, at a fraction of the full schema's tokens.
+
+    Example:
+        >>> schema_shape({"type": "object", "properties": {"tier": {"type": "string", "enum": ["Low", "High"]}}})
+        '{"tier": "Low|High"}'
+    """
+    if "enum" in schema:
+        return '"' + "|".join(str(value) for value in schema["enum"]) + '"'
+    kind = schema.get("type")
+    if isinstance(kind, list):
+        kind = kind[0]
+    if kind == "object":
+        fields = ", ".join(f'"{name}": {schema_shape(field)}' for name, field in schema["properties"].items())
+        return "{" + fields + "}"
+    if kind == "array":
+        return "[" + schema_shape(schema["items"]) + ", ...]"
+    return kind
+
+
+def schema_instructions(schema):
+    """
+    Return the system message sentence asking for a reply in `schema`'s shape.
+    """
+    return f"Reply with a single JSON object and nothing else, shaped like: {schema_shape(schema)}"
+
+
+def validate_payload(payload, schema, path="$"):
+    """
+    Check a decoded payload against a schema (the subset used in this module).
+
+    Supports type (one or a list), enum, properties, required, items,
+    maxItems, minimum and maximum.
+
+    Args:
+        payload: Decoded JSON value.
+        schema (dict): The schema.
+        path (str): Location of `payload`, used in the error message.
+
+    Returns:
+        str | None: The first problem found, or None if the payload is valid
+    """
+    kinds = schema.get("type")
+    if kinds is not None:
+        kinds = kinds if isinstance(kinds, list) else [kinds]
+        # bool is a subclass of int in Python but not a JSON number
+        matches = any(
+            isinstance(payload, _JSON_TYPES[kind]) and not (isinstance(payload, bool) and kind in ("number", "integer"))
+            for kind in kinds
+        )
+        if not matches:
+            return f"{path} must be of type {' or '.join(kinds)}"
+    if "enum" in schema and payload not in schema["enum"]:
+        return f"{path} must be one of {', '.join(map(str, schema['enum']))}"
+
+    if isinstance(payload, dict):
+        for name in schema.get("required", []):
+            if name not in payload:
+                return f"{path}.{name} is required"
+        for name, field in schema.get("properties", {}).items():
+            if name in payload:
+                error = validate_payload(payload[name], field, f"{path}.{name}")
+                if error:
+                    return error
+    elif isinstance(payload, list):
+        if "maxItems" in schema and len(payload) > schema["maxItems"]:
+            return f"{path} must have at most {schema['maxItems']} items"
+        for position, item in enumerate(payload):
+            error = validate_payload(item, schema.get("items", {}), f"{path}[{position}]")
+            if error:
+                return error
+    elif isinstance(payload, (int, float)) and not isinstance(payload, bool):
+        if "minimum" in schema and payload < schema["minimum"]:
+            return f"{path} must be at least {schema['minimum']}"
+        if "maximum" in schema and payload > schema["maximum"]:
+            return f"{path} must be at most {schema['maximum']}"
+    return None
+
+
+def parse_payload(text, schema):
+    """
+    Extract and validate the JSON object of an agent's reply.
+
+    Tolerates a Markdown code fence or text around the object.
+
+    Returns:
+        tuple: (payload, error) - the payload and None, or None and the problem
+    """
+    if not isinstance(text, str) or not text.strip():
+        return None, "the reply is empty"
+    fenced = _CODE_FENCE.search(text)
+    candidate = fenced.group(1) if fenced else text
+    start, end = candidate.find("{"), candidate.rfind("}")
+    if start < 0 or end < start:
+        return None, "the reply contains no JSON object"
+    try:
+        payload = json.loads(candidate[start:end + 1])
+    except ValueError as error:
+        return None, f"the reply is not valid JSON ({error})"
+    error = validate_payload(payload, schema)
+    return (None, error) if error else (payload, None)
+
+
+def response_format(schema, name="agent_output"):
+    """
+    Build the `response_format` request parameter for schema-constrained output.
+
+    OpenAI-compatible servers, including Ollama, constrain decoding to the
+    schema, so the reply is valid JSON of the right shape.
+    """
+    return {"type": "json_schema", "json_schema": {"name": name, "schema": schema}}
+
+
+# ============================================================================
+# Structured replies
+# ============================================================================
+
+def schema_validator(schema):
+    """
+    Return an output check for the reply loop: text -> (compact JSON, error).
+
+    A reply matching `schema` is re-encoded as compact JSON (code fences and
+    surrounding text dropped); otherwise the result is (None, problem).
+    """
+    def validate(text):
+        payload, error = parse_payload(text, schema)
+        return (None, error) if error else (json.dumps(payload, separators=(",", ":")), None)
+    return validate
+
+
+def register_structured_output(agent, schema, retries=DEFAULT_SCHEMA_RETRIES):
+    """
+    Make `agent` reply with payloads matching `schema`.
+
+    Adds an output check to the agent's reply loop (tools/agent_tools.py),
+    the same loop that runs its tools. The loop then:
+    1. Lets agents with tools call them first; every later request is
+       constrained to the schema (JSON mode), and every request of agents
+       without tools
+    2. Validates the answer against the schema
+    3. On a schema failure, sends the problem back and asks again (at most
+       `retries` times); only the short correction is new
+    4. Returns the payload as compact JSON, or the last answer unchanged if
+       it never matched, so downstream agents can still read it as text
+
+    Reply functions registered later at the same position (e.g. the risk
+    fast path) still run first.
+
+    Args:
+        agent (ConversableAgent): The agent.
+        schema (dict): Schema of its replies (see AGENT_SCHEMAS).
+        retries (int): Corrective turns after a schema failure.
+    """
+    reply_loop_config(agent).update(
+        validate=schema_validator(schema),
+        request_options={"response_format": response_format(schema)},
+        retries=retries,
+        correction="Your reply does not match the required JSON: {error}. "
+                   "Reply again with only the corrected JSON object.",
+    )
+
+
+def collect_payloads(result):
+    """
+    Return the validated payload of every structured agent in a conversation.
+
+    Args:
+        result: A message list, the fan-out mode's {agent: output} dictionary
+                or a group chat ChatResult.
+
+    Returns:
+        dict: Agent name -> payload (dict), from each agent's latest message;
+              agents whose latest message does not match their schema are left out
+    """
+    if isinstance(result, dict):
+        messages = [{"name": name, "content": content} for name, content in result.items()]
+    else:
+        messages = getattr(result, "chat_history", result) or []
+
+    latest = {}
+    for message in messages:
+        if message.get("name") in AGENT_SCHEMAS and isinstance(message.get("content"), str):
+            latest[message["name"]] = message["content"]
+
+    payloads = {}
+    for name, content in latest.items():
+        payload, error = parse_payload(content, AGENT_SCHEMAS[name])
+        if error is None:
+            payloads[name] = payload
+    return payloads
+
+
+# ============================================================================
+# Template-rendered report
+# ============================================================================
+
+def _percent(weight):
+    return f"{weight:.0%}"
+
+
+def render_report(payloads):
+    """
+    Render the investment report from the specialists' payloads.
+
+    Produces the same sections the report agent is asked to write (market
+    overview, risk analysis, strategies and conclusion), without an LLM call.
+
+    Args:
+        payloads (dict): Agent name -> payload (see `collect_payloads`).
+
+    Returns:
+        str: The Markdown report
+    """
+    market = payloads.get("MarketAnalysisAgent")
+    risk = payloads.get("RiskAssessmentAgent")
+    strategy = payloads.get("InvestmentStrategyAgent")
+    lines = ["# Investment Report", ""]
+
+    # Market overview: outlook, drivers and per-asset trends
+    lines += ["## Market Overview", ""]
+    if market:
+        lines += [f"Outlook: {market['outlook'].capitalize()}. {market['summary']}", ""]
+        lines += [f"- {driver}" for driver in market["drivers"]]
+        lines += [
+            f"- {asset['ticker']}: {asset['trend']}" + (f" - {asset['note']}" if asset.get("note") else "")
+            for asset in market.get("assets", [])
+        ]
+    else:
+        lines.append("No market analysis was provided.")
+    lines.append("")
+
+    # Risk analysis: overall tier, tier per asset and key risks
+    lines += ["## Risk Analysis", ""]
+    if risk:
+        lines += [f"Overall risk: {risk['overall']}. {risk['summary']}", ""]
+        for asset in risk["assets"]:
+            score = f" (score {asset['score']:.2f})" if isinstance(asset.get("score"), (int, float)) else ""
+            reason = f": {asset['reason']}" if asset.get("reason") else ""
+            lines.append(f"- {asset['ticker']}: {asset['tier']}{score}{reason}")
+        if risk.get("key_risks"):
+            lines += ["", "Key risks:"] + [f"- {item}" for item in risk["key_risks"]]
+    else:
+        lines.append("No risk assessment was provided.")
+    lines.append("")
+
+    # Strategies: short- and long-term allocations
+    lines += ["## Strategies", ""]
+    if strategy:
+        if strategy.get("risk_profile"):
+            lines += [f"Risk profile: {strategy['risk_profile']}.", ""]
+        for key, title in (("short_term", "Short-Term Investments"), ("long_term", "Long-Term Investments")):
+            lines += [f"### {title}", ""]
+            lines += [
+                f"- {item['asset']} ({_percent(item['weight'])}): {item['rationale']}" for item in strategy[key]
+            ] or ["- None suggested"]
+            lines.append("")
+        lines.append(strategy["summary"])
+    else:
+        lines.append("No investment strategy was provided.")
+    lines.append("")
+
+    # Conclusion: the headline of every section in one paragraph
+    conclusion = []
+    if market:
+        conclusion.append(f"The market outlook is {market['outlook']}.")
+    if risk:
+        conclusion.append(f"Overall risk is {risk['overall']}.")
+    if strategy:
+        conclusion.append(strategy["summary"])
+    lines += ["## Conclusion", "", " ".join(conclusion) or "No analysis was provided.", ""]
+    return "\n".join(lines)
+
+
+def report_template_reply(recipient, messages=None, sender=None, config=None):
+    """
+    AutoGen reply function rendering the report from structured payloads.
+
+    The report is only rendered when every structured agent that took part
+    delivered a valid payload; if any of them replied in free text (e.g.
+    after failed retries), the report is left to the LLM as before.
+
+    Returns:
+        tuple: (True, report) or (False, None) to let the LLM write the report
+    """
+    messages = messages or []
+    payloads = collect_payloads(messages)
+    speakers = {message.get("name") for message in messages}
+    if not payloads or any(name in speakers and name not in payloads for name in AGENT_SCHEMAS):
+        return False, None
+    return True, render_report(payloads)
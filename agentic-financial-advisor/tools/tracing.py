@@ -0,0 +1,322 @@
+# ============================================================================
+# tracing.py
+# Lightweight span tracing for runs, agent replies, LLM calls and market data
+# Exports OpenTelemetry (OTLP JSON) compatible traces and a summary table
+# ============================================================================
+
+# Import json to write the trace file
+import json
+
+# Import os to generate random trace and span identifiers
+import os
+
+# Import threading to guard span attributes updated from worker threads
+import threading
+
+# Import time for wall-clock timestamps and durations
+import time
+
+# Import deque to keep a bounded number of finished spans in long-running services
+from collections import deque
+
+# Import contextmanager for the `span` and `Tracer.activate` helpers
+from contextlib import contextmanager
+
+# Import ContextVar so the active tracer and parent span follow the work into
+# every thread that copies the caller's context (e.g. the fan-out mode)
+from contextvars import ContextVar
+
+# Tracer receiving the spans of the current context (None = tracing disabled)
+_active_tracer = ContextVar("active_tracer", default=None)
+
+# Innermost open span of the current context, used as parent for new spans
+_current_span = ContextVar("current_span", default=None)
+
+# Numeric attributes that are summed up in the summary table
+SUMMARY_COLUMNS = ("prompt_tokens", "completion_tokens", "cache_hits", "retries", "queue_wait_s")
+
+
+class Span:
+    """
+    One timed operation with attributes.
+
+    Attributes:
+        name (str): Operation name (e.g. 'agent.reply', 'llm.completion')
+        trace_id (str): 32 hex characters shared by all spans of one run
+        span_id (str): 16 hex characters identifying this span
+        parent_id (str | None): span_id of the enclosing span
+        start_ns (int): Start time in nanoseconds since the epoch
+        end_ns (int | None): End time in nanoseconds since the epoch
+        attributes (dict): Recorded attributes (tokens, cache hits, retries, ...)
+        error (str | None): Error message if the operation raised
+    """
+
+    def __init__(self, name, parent=None, attributes=None):
+        self.name = name
+        self.trace_id = parent.trace_id if parent is not None else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent is not None else None
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = dict(attributes or {})
+        self.error = None
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def set(self, key, value):
+        """
+        Set an attribute.
+        """
+        with self._lock:
+            self.attributes[key] = value
+
+    def add(self, key, amount=1):
+        """
+        Add `amount` to a numeric attribute (safe from several threads).
+        """
+        with self._lock:
+            self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    @property
+    def duration_s(self):
+        # Wall time in seconds (until now if the span is still open)
+        if self.end_ns is None:
+            return time.perf_counter() - self._started
+        return (self.end_ns - self.start_ns) / 1e9
+
+    def finish(self):
+        self.end_ns = self.start_ns + int((time.perf_counter() - self._started) * 1e9)
+
+    def to_otlp(self):
+        """
+        Return the span in OTLP JSON form.
+        """
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.name,
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)}
+                for key, value in self.attributes.items() if value is not None
+            ],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+
+
+def _otlp_value(value):
+    # Typed OTLP attribute value
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Tracer:
+    """
+    Collects finished spans and exports them.
+
+    Spans are only recorded while the tracer is active in the calling context
+    (see `activate`); without an active tracer `span` costs next to nothing.
+    One tracer can be shared by many concurrent runs; every run gets its own
+    trace id.
+
+    Attributes:
+        service_name (str): Service name written to the trace file
+        spans (deque): Finished spans, oldest dropped beyond `max_spans`
+    """
+
+    def __init__(self, service_name="agentic-financial-advisor", max_spans=100_000):
+        self.service_name = service_name
+        self.spans = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def activate(self):
+        """
+        Record spans of the enclosed code (and of contexts copied from it).
+        """
+        token = _active_tracer.set(self)
+        try:
+            yield self
+        finally:
+            _active_tracer.reset(token)
+
+    def record(self, span):
+        with self._lock:
+            self.spans.append(span)
+
+    def to_otlp(self):
+        """
+        Return all finished spans as an OTLP JSON document.
+        """
+        with self._lock:
+            spans = [span.to_otlp() for span in self.spans]
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [
+                    {"key": "service.name", "value": {"stringValue": self.service_name}}
+                ]},
+                "scopeSpans": [{"scope": {"name": "financial-advisor"}, "spans": spans}],
+            }]
+        }
+
+    def export(self, path):
+        """
+        Write the trace as an OTLP JSON file (loadable by OpenTelemetry tooling).
+        """
+        with open(path, "w", encoding="utf-8") as trace_file:
+            json.dump(self.to_otlp(), trace_file, indent=2)
+
+    def summary(self):
+        """
+        Aggregate the spans per (operation, agent).
+
+        Returns:
+            list: One dict per group with calls, total/mean/max wall time and
+                  the sums of SUMMARY_COLUMNS, ordered by total wall time.
+        """
+        groups = {}
+        with self._lock:
+            spans = list(self.spans)
+        for span in spans:
+            key = (span.name, span.attributes.get("agent", ""))
+            row = groups.setdefault(key, dict(
+                {"span": key[0], "agent": key[1], "calls": 0, "total_s": 0.0, "max_s": 0.0},
+                **{column: 0 for column in SUMMARY_COLUMNS}
+            ))
+            row["calls"] += 1
+            row["total_s"] += span.duration_s
+            row["max_s"] = max(row["max_s"], span.duration_s)
+            for column in SUMMARY_COLUMNS:
+                row[column] += span.attributes.get(column) or 0
+        rows = sorted(groups.values(), key=lambda row: row["total_s"], reverse=True)
+        for row in rows:
+            row["mean_s"] = row["total_s"] / row["calls"]
+        return rows
+
+    def summary_table(self):
+        """
+        Render `summary()` as a fixed-width text table.
+        """
+        header = ("span", "agent", "calls", "total s", "mean s", "max s",
+                  "prompt tok", "compl tok", "cache hits", "retries", "queue s")
+        lines = [
+            f"{header[0]:<30}{header[1]:<26}" + "".join(f"{title:>11}" for title in header[2:])
+        ]
+        for row in self.summary():
+            values = (row["calls"], f"{row['total_s']:.3f}", f"{row['mean_s']:.3f}",
+                      f"{row['max_s']:.3f}", row["prompt_tokens"], row["completion_tokens"],
+                      row["cache_hits"], row["retries"], f"{row['queue_wait_s']:.3f}")
+            lines.append(
+                f"{row['span'][:29]:<30}{row['agent'][:25]:<26}"
+                + "".join(f"{value:>11}" for value in values)
+            )
+        return "\n".join(lines)
+
+
+@contextmanager
+def span(name, **attributes):
+    """
+    Time the enclosed code as a span of the active tracer.
+
+    Args:
+        name (str): Operation name.
+        **attributes: Initial attributes (e.g. agent=..., ticker=...).
+
+    Yields:
+        Span: The span, for recording more attributes while it runs. A span is
+              yielded even without an active tracer, it is just not recorded.
+
+    Example:
+        >>> with span("market_data.fetch_many", tickers=3) as current:
+        ...     current.add("retries")
+    """
+    tracer = _active_tracer.get()
+    current = Span(name, parent=_current_span.get(), attributes=attributes)
+    if tracer is None:
+        yield current
+        return
+
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as error:
+        current.error = f"{type(error).__name__}: {error}"
+        raise
+    finally:
+        _current_span.reset(token)
+        current.finish()
+        tracer.record(current)
+
+
+def is_tracing():
+    """
+    Return True when a tracer is active in the calling context.
+    """
+    return _active_tracer.get() is not None
+
+
+def _usage_tokens(usage_summary):
+    # Total tokens in an OpenAIWrapper usage summary ({model: {...}, "total_cost": x})
+    if not usage_summary:
+        return 0
+    return sum(entry.get("total_tokens", 0) for entry in usage_summary.values() if isinstance(entry, dict))
+
+
+def instrument_agent(agent, reply_spans=True):
+    """
+    Record an 'agent.reply' span per reply and an 'llm.completion' span per LLM call.
+
+    The wrappers are installed once per agent and only record while a tracer
+    is active, so they are safe on agents shared by several orchestrators.
+
+    Args:
+        agent (ConversableAgent): The agent to instrument.
+        reply_spans (bool): Also time whole replies (False for the
+                            GroupChatManager, whose reply is the entire chat).
+    """
+    if getattr(agent, "tracing_instrumented", False):
+        return
+    agent.tracing_instrumented = True
+
+    # Step 1: Time every reply of the agent (LLM, cache hit or fast path)
+    if reply_spans:
+        generate_reply = agent.generate_reply
+
+        def traced_generate_reply(*args, **kwargs):
+            if not is_tracing():
+                return generate_reply(*args, **kwargs)
+            with span("agent.reply", agent=agent.name):
+                return generate_reply(*args, **kwargs)
+
+        agent.generate_reply = traced_generate_reply
+
+    # Step 2: Time every LLM call and record its token usage
+    client = getattr(agent, "client", None)
+    if client is None:
+        return
+    create = client.create
+
+    def traced_create(**config):
+        if not is_tracing():
+            return create(**config)
+        with span("llm.completion", agent=agent.name) as current:
+            before = _usage_tokens(client.actual_usage_summary)
+            response = create(**config)
+            usage = getattr(response, "usage", None)
+            current.set("model", getattr(response, "model", None))
+            current.set("prompt_tokens", getattr(usage, "prompt_tokens", 0) or 0)
+            current.set("completion_tokens", getattr(usage, "completion_tokens", 0) or 0)
+            current.set("cost", float(getattr(response, "cost", 0) or 0))
+            # Cached responses are returned without updating the actual usage
+            current.set("cache_hits", int(_usage_tokens(client.actual_usage_summary) == before))
+            return response
+
+    client.create = traced_create